@@ -68,6 +68,24 @@ target_metadata = Base.metadata
 # ... etc.
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    """
+    Las columnas tsvector "busqueda" y sus índices GIN los crea la migración
+    e4b8a1c3d6f2 (columnas generadas); no están en los modelos y autogenerate
+    no debe proponer borrarlos.
+
+    Las particiones mensuales de historial_campanas y la tabla de archivo las
+    crean la migración d3a7f1b9e5c2 y services/particiones_historial.py.
+    """
+    if type_ == "column" and name == "busqueda":
+        return False
+    if type_ == "index" and name and name.endswith("_busqueda"):
+        return False
+    if type_ == "table" and reflected and name.startswith("historial_campanas_"):
+        return False
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -84,6 +102,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -105,7 +124,11 @@ def run_migrations_online() -> None:
     connectable = engine
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
@@ -0,0 +1,49 @@
+"""create project_export_jobs
+
+Revision ID: a3f1c9e2b7d4
+Revises: 797c70d5bfb5
+Create Date: 2026-10-18 09:12:41.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f1c9e2b7d4'
+down_revision: Union[str, Sequence[str], None] = '797c70d5bfb5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'project_export_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('tipo', sa.String(length=20), nullable=False),
+        sa.Column('implementacion_id', sa.Integer(), nullable=True),
+        sa.Column('estado', sa.String(length=20), nullable=False, server_default='pendiente'),
+        sa.Column('intentos', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('worker', sa.String(length=100), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('archivo_ruta', sa.String(), nullable=True),
+        sa.Column('archivo_nombre', sa.String(), nullable=True),
+        sa.Column('media_type', sa.String(), nullable=True),
+        sa.Column('tamano', sa.BigInteger(), nullable=True),
+        sa.Column('creado_en', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+        sa.Column('iniciado_en', sa.DateTime(), nullable=True),
+        sa.Column('finalizado_en', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_project_export_jobs_id'), 'project_export_jobs', ['id'], unique=False)
+    op.create_index('ix_project_export_jobs_estado_id', 'project_export_jobs', ['estado', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_project_export_jobs_estado_id', table_name='project_export_jobs')
+    op.drop_index(op.f('ix_project_export_jobs_id'), table_name='project_export_jobs')
+    op.drop_table('project_export_jobs')
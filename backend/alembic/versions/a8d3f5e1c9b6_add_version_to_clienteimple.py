@@ -0,0 +1,32 @@
+"""add version to project_implementaciones_clienteimple
+
+Revision ID: a8d3f5e1c9b6
+Revises: f2a6c8d4b1e7
+Create Date: 2026-10-18 14:05:18.920374
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d3f5e1c9b6'
+down_revision: Union[str, Sequence[str], None] = 'f2a6c8d4b1e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Las implementaciones existentes empiezan en la versión 1
+    op.add_column(
+        'project_implementaciones_clienteimple',
+        sa.Column('version', sa.Integer(), nullable=False, server_default='1'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('project_implementaciones_clienteimple', 'version')
@@ -0,0 +1,33 @@
+"""index entregas by implementacion and fecha_entrega
+
+Revision ID: b5e9c2f7a4d1
+Revises: a8d3f5e1c9b6
+Create Date: 2026-10-18 15:12:41.306158
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e9c2f7a4d1'
+down_revision: Union[str, Sequence[str], None] = 'a8d3f5e1c9b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_entregas_implementacion_fecha',
+        'project_entregaImplementaciones',
+        ['implementacion_id', 'fecha_entrega'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_entregas_implementacion_fecha', table_name='project_entregaImplementaciones')
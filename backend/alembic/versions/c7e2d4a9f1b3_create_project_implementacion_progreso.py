@@ -0,0 +1,45 @@
+"""create project_implementacion_progreso
+
+Revision ID: c7e2d4a9f1b3
+Revises: a3f1c9e2b7d4
+Create Date: 2026-10-18 11:03:27.114960
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e2d4a9f1b3'
+down_revision: Union[str, Sequence[str], None] = 'a3f1c9e2b7d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # El progreso de las implementaciones existentes lo genera
+    # generar_progreso_implementaciones.py (mientras tanto se calcula al leer)
+    op.create_table(
+        'project_implementacion_progreso',
+        sa.Column('cliente_implementacion_id', sa.Integer(), nullable=False),
+        sa.Column('seccion', sa.String(length=50), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('completados', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('en_proceso', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('porcentaje', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('actualizado_en', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+        sa.ForeignKeyConstraint(
+            ['cliente_implementacion_id'],
+            ['project_implementaciones_clienteimple.id'],
+            ondelete='CASCADE',
+        ),
+        sa.PrimaryKeyConstraint('cliente_implementacion_id', 'seccion'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('project_implementacion_progreso')
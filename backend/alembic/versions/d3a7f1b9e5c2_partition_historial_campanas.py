@@ -0,0 +1,167 @@
+"""partition historial_campanas by month and add archive table
+
+Revision ID: d3a7f1b9e5c2
+Revises: b5e9c2f7a4d1
+Create Date: 2026-10-18 17:04:22.518934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a7f1b9e5c2'
+down_revision: Union[str, Sequence[str], None] = 'b5e9c2f7a4d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Meses futuros con partición creada desde el inicio; los siguientes los crea
+# mantener_historial_campanas.py (services/particiones_historial.py)
+MESES_ADELANTE = 3
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('ALTER TABLE historial_campanas RENAME TO historial_campanas_sin_particionar')
+    # Tras un downgrade la clave primaria conserva este nombre; la tabla se
+    # borra al final de la copia
+    op.execute(
+        'ALTER TABLE historial_campanas_sin_particionar '
+        'DROP CONSTRAINT IF EXISTS historial_campanas_pkey'
+    )
+    # La clave primaria debe incluir la columna de partición
+    op.execute(
+        """
+        CREATE TABLE historial_campanas (
+            id integer NOT NULL,
+            "campaña_id" integer NOT NULL REFERENCES campanas_campanas (id),
+            usuario_id integer,
+            accion varchar NOT NULL,
+            cambios json,
+            fecha timestamp without time zone NOT NULL,
+            observaciones text,
+            CONSTRAINT historial_campanas_pkey PRIMARY KEY (id, fecha)
+        ) PARTITION BY RANGE (fecha)
+        """
+    )
+    op.execute(
+        'CREATE INDEX ix_historial_campanas_campana_fecha '
+        'ON historial_campanas ("campaña_id", fecha, id)'
+    )
+    # Se conserva la secuencia de ids de la tabla original
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            secuencia text := pg_get_serial_sequence('historial_campanas_sin_particionar', 'id');
+        BEGIN
+            EXECUTE format('ALTER TABLE historial_campanas ALTER COLUMN id SET DEFAULT nextval(%L)', secuencia);
+            EXECUTE format('ALTER SEQUENCE %s OWNED BY historial_campanas.id', secuencia);
+        END $$
+        """
+    )
+    op.execute('CREATE TABLE historial_campanas_default PARTITION OF historial_campanas DEFAULT')
+    # Una partición por mes desde la entrada más antigua hasta MESES_ADELANTE
+    # meses después del actual
+    op.execute(
+        f"""
+        DO $$
+        DECLARE
+            mes timestamp;
+        BEGIN
+            FOR mes IN
+                SELECT generate_series(
+                    date_trunc('month', coalesce(min(fecha), now())),
+                    date_trunc('month', now()) + interval '{MESES_ADELANTE} months',
+                    interval '1 month'
+                )
+                FROM historial_campanas_sin_particionar
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF historial_campanas FOR VALUES FROM (%L) TO (%L)',
+                    'historial_campanas_' || to_char(mes, 'YYYY_MM'),
+                    mes,
+                    mes + interval '1 month'
+                );
+            END LOOP;
+        END $$
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO historial_campanas
+            (id, "campaña_id", usuario_id, accion, cambios, fecha, observaciones)
+        SELECT id, "campaña_id", usuario_id, accion, cambios, fecha, observaciones
+        FROM historial_campanas_sin_particionar
+        """
+    )
+    op.execute('DROP TABLE historial_campanas_sin_particionar')
+
+    # Particiones que superan la retención (sin clave foránea: conserva el
+    # historial de campañas eliminadas)
+    op.execute(
+        """
+        CREATE TABLE historial_campanas_archivo (
+            LIKE historial_campanas INCLUDING DEFAULTS,
+            PRIMARY KEY (id, fecha)
+        ) PARTITION BY RANGE (fecha)
+        """
+    )
+    op.execute(
+        'CREATE INDEX ix_historial_campanas_archivo_campana_fecha '
+        'ON historial_campanas_archivo ("campaña_id", fecha, id)'
+    )
+    op.execute(
+        'CREATE TABLE historial_campanas_archivo_default '
+        'PARTITION OF historial_campanas_archivo DEFAULT'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('ALTER TABLE historial_campanas RENAME TO historial_campanas_particionada')
+    op.execute(
+        """
+        CREATE TABLE historial_campanas (
+            id integer NOT NULL,
+            "campaña_id" integer NOT NULL REFERENCES campanas_campanas (id),
+            usuario_id integer,
+            accion varchar NOT NULL,
+            cambios json,
+            fecha timestamp without time zone NOT NULL,
+            observaciones text,
+            CONSTRAINT historial_campanas_sin_particionar_pkey PRIMARY KEY (id)
+        )
+        """
+    )
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            secuencia text := pg_get_serial_sequence('historial_campanas_particionada', 'id');
+        BEGIN
+            EXECUTE format('ALTER TABLE historial_campanas ALTER COLUMN id SET DEFAULT nextval(%L)', secuencia);
+            EXECUTE format('ALTER SEQUENCE %s OWNED BY historial_campanas.id', secuencia);
+        END $$
+        """
+    )
+    # Las entradas archivadas de campañas que ya no existen no caben en la
+    # tabla original (clave foránea) y se descartan
+    op.execute(
+        """
+        INSERT INTO historial_campanas
+            (id, "campaña_id", usuario_id, accion, cambios, fecha, observaciones)
+        SELECT id, "campaña_id", usuario_id, accion, cambios, fecha, observaciones
+        FROM historial_campanas_particionada
+        UNION ALL
+        SELECT a.id, a."campaña_id", a.usuario_id, a.accion, a.cambios, a.fecha, a.observaciones
+        FROM historial_campanas_archivo a
+        JOIN campanas_campanas c ON c.id = a."campaña_id"
+        """
+    )
+    op.execute('DROP TABLE historial_campanas_particionada')
+    op.execute('DROP TABLE historial_campanas_archivo')
+    op.execute('ALTER TABLE historial_campanas RENAME CONSTRAINT historial_campanas_sin_particionar_pkey TO historial_campanas_pkey')
+    op.create_index('ix_historial_campanas_id', 'historial_campanas', ['id'], unique=False)
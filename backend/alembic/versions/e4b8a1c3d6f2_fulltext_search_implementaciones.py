@@ -0,0 +1,200 @@
+"""full-text search columns and indexes for implementaciones and entregas
+
+Revision ID: e4b8a1c3d6f2
+Revises: c7e2d4a9f1b3
+Create Date: 2026-10-18 12:26:53.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b8a1c3d6f2'
+down_revision: Union[str, Sequence[str], None] = 'c7e2d4a9f1b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CONFIGURACION = 'es_unaccent'
+
+# Columnas de texto de cada tabla que forman la columna busqueda (las mismas
+# que services/busqueda_implementaciones.py evalúa campo por campo)
+COLUMNAS_INDEXADAS = {
+    'project_implementacion_contractual': [
+        'modelo_contrato_seguimiento',
+        'modelo_contrato_responsable',
+        'modelo_contrato_notas',
+        'modelo_confidencialidad_seguimiento',
+        'modelo_confidencialidad_responsable',
+        'modelo_confidencialidad_notas',
+        'alcance_seguimiento',
+        'alcance_responsable',
+        'alcance_notas',
+        'fecha_inicio_seguimiento',
+        'fecha_inicio_responsable',
+        'fecha_inicio_notas',
+    ],
+    'project_implementacion_talentoHumano': [
+        'perfil_personal_seguimiento',
+        'perfil_personal_responsable',
+        'perfil_personal_notas',
+        'cantidad_asesores_seguimiento',
+        'cantidad_asesores_responsable',
+        'cantidad_asesores_notas',
+        'horarios_seguimiento',
+        'horarios_responsable',
+        'horarios_notas',
+        'formador_seguimiento',
+        'formador_responsable',
+        'formador_notas',
+        'capacitaciones_andes_seguimiento',
+        'capacitaciones_andes_responsable',
+        'capacitaciones_andes_notas',
+        'capacitaciones_cliente_seguimiento',
+        'capacitaciones_cliente_responsable',
+        'capacitaciones_cliente_notas',
+    ],
+    'project_implementacion_procesos': [
+        'responsable_cliente_seguimiento',
+        'responsable_cliente_responsable',
+        'responsable_cliente_notas',
+        'responsable_andes_seguimiento',
+        'responsable_andes_responsable',
+        'responsable_andes_notas',
+        'responsables_operacion_seguimiento',
+        'responsables_operacion_responsable',
+        'responsables_operacion_notas',
+        'listado_reportes_seguimiento',
+        'listado_reportes_responsable',
+        'listado_reportes_notas',
+        'protocolo_comunicaciones_seguimiento',
+        'protocolo_comunicaciones_responsable',
+        'protocolo_comunicaciones_notas',
+        'informacion_diaria_seguimiento',
+        'informacion_diaria_responsable',
+        'informacion_diaria_notas',
+        'seguimiento_periodico_seguimiento',
+        'seguimiento_periodico_responsable',
+        'seguimiento_periodico_notas',
+        'guiones_protocolos_seguimiento',
+        'guiones_protocolos_responsable',
+        'guiones_protocolos_notas',
+        'proceso_monitoreo_seguimiento',
+        'proceso_monitoreo_responsable',
+        'proceso_monitoreo_notas',
+        'cronograma_tecnologia_seguimiento',
+        'cronograma_tecnologia_responsable',
+        'cronograma_tecnologia_notas',
+        'cronograma_capacitaciones_seguimiento',
+        'cronograma_capacitaciones_responsable',
+        'cronograma_capacitaciones_notas',
+        'realizacion_pruebas_seguimiento',
+        'realizacion_pruebas_responsable',
+        'realizacion_pruebas_notas',
+    ],
+    'project_implementacion_tecnologia': [
+        'creacion_modulo_seguimiento',
+        'creacion_modulo_responsable',
+        'creacion_modulo_notas',
+        'tipificacion_interacciones_seguimiento',
+        'tipificacion_interacciones_responsable',
+        'tipificacion_interacciones_notas',
+        'aplicativos_proceso_seguimiento',
+        'aplicativos_proceso_responsable',
+        'aplicativos_proceso_notas',
+        'whatsapp_seguimiento',
+        'whatsapp_responsable',
+        'whatsapp_notas',
+        'correos_electronicos_seguimiento',
+        'correos_electronicos_responsable',
+        'correos_electronicos_notas',
+        'requisitos_grabacion_seguimiento',
+        'requisitos_grabacion_responsable',
+        'requisitos_grabacion_notas',
+    ],
+    'project_implementacion_subseccion_personalizada': [
+        'nombre_subsesion',
+        'seguimiento',
+        'responsable',
+        'notas',
+    ],
+    'project_subseccion_implementacion_talento_humano': [
+        'nombre_subsesion',
+        'seguimiento',
+        'responsable',
+        'notas',
+    ],
+    'project_subseccion_implementacion_procesos': [
+        'nombre_subsesion',
+        'seguimiento',
+        'responsable',
+        'notas',
+    ],
+    'project_subseccion_implementacion_tecnologia': [
+        'nombre_subsesion',
+        'seguimiento',
+        'responsable',
+        'notas',
+    ],
+    'project_entregaImplementaciones': [
+        'contrato',
+        'acuerdo_niveles_servicio',
+        'polizas',
+        'penalidades',
+        'alcance_servicio',
+        'unidades_facturacion',
+        'acuerdo_pago',
+        'incremento',
+        'mapa_aplicativos',
+        'internet',
+        'telefonia',
+        'whatsapp',
+        'integraciones',
+        'vpn',
+        'diseno_ivr',
+        'transferencia_llamadas',
+        'correos_electronicos',
+        'linea_018000',
+        'linea_entrada',
+        'sms',
+        'requisitos_grabacion',
+        'entrega_resguardo',
+        'encuesta_satisfaccion',
+        'listado_reportes',
+        'proceso_monitoreo_calidad',
+    ],
+}
+
+
+def _nombre_indice(tabla: str) -> str:
+    nombre = tabla.replace('talentoHumano', 'talento_humano').replace('entregaImplementaciones', 'entrega_implementaciones')
+    return f'ix_{nombre}_busqueda'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Configuración de búsqueda en español que ignora tildes (requiere la extensión unaccent)
+    op.execute('CREATE EXTENSION IF NOT EXISTS unaccent')
+    op.execute(f'CREATE TEXT SEARCH CONFIGURATION {CONFIGURACION} (COPY = pg_catalog.spanish)')
+    op.execute(
+        f'ALTER TEXT SEARCH CONFIGURATION {CONFIGURACION} '
+        'ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem'
+    )
+
+    # Columna tsvector generada: PostgreSQL la recalcula en cada INSERT/UPDATE
+    for tabla, columnas in COLUMNAS_INDEXADAS.items():
+        concatenado = " || ' ' || ".join(f"coalesce({columna}, '')" for columna in columnas)
+        op.execute(
+            f'ALTER TABLE "{tabla}" ADD COLUMN busqueda tsvector '
+            f"GENERATED ALWAYS AS (to_tsvector('{CONFIGURACION}'::regconfig, {concatenado})) STORED"
+        )
+        op.execute(f'CREATE INDEX {_nombre_indice(tabla)} ON "{tabla}" USING gin (busqueda)')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for tabla in COLUMNAS_INDEXADAS:
+        op.execute(f'ALTER TABLE "{tabla}" DROP COLUMN IF EXISTS busqueda')
+    op.execute(f'DROP TEXT SEARCH CONFIGURATION IF EXISTS {CONFIGURACION}')
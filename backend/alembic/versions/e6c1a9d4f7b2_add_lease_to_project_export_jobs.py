@@ -0,0 +1,32 @@
+"""add lease_hasta to project_export_jobs
+
+Revision ID: e6c1a9d4f7b2
+Revises: d3a7f1b9e5c2
+Create Date: 2026-10-18 18:52:41.307615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6c1a9d4f7b2'
+down_revision: Union[str, Sequence[str], None] = 'd3a7f1b9e5c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Los trabajos en proceso sin lease se recuperan por iniciado_en
+    op.add_column(
+        'project_export_jobs',
+        sa.Column('lease_hasta', sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('project_export_jobs', 'lease_hasta')
@@ -0,0 +1,71 @@
+"""create project_implementacion_historial and project_implementacion_snapshot
+
+Revision ID: f2a6c8d4b1e7
+Revises: e4b8a1c3d6f2
+Create Date: 2026-10-18 13:12:40.581203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a6c8d4b1e7'
+down_revision: Union[str, Sequence[str], None] = 'e4b8a1c3d6f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Las implementaciones existentes empiezan su historial (versión "inicial")
+    # la primera vez que se modifican
+    op.create_table(
+        'project_implementacion_historial',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('cliente_implementacion_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('accion', sa.String(length=20), nullable=False),
+        sa.Column('usuario_id', sa.Integer(), nullable=True),
+        sa.Column('fecha', sa.DateTime(), nullable=False),
+        sa.Column('cambios', sa.JSON(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ['cliente_implementacion_id'],
+            ['project_implementaciones_clienteimple.id'],
+            ondelete='CASCADE',
+        ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'cliente_implementacion_id', 'version', name='uq_implementacion_historial_version'
+        ),
+    )
+    op.create_index(
+        op.f('ix_project_implementacion_historial_id'),
+        'project_implementacion_historial',
+        ['id'],
+        unique=False,
+    )
+    op.create_table(
+        'project_implementacion_snapshot',
+        sa.Column('cliente_implementacion_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('documento', sa.JSON(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ['cliente_implementacion_id'],
+            ['project_implementaciones_clienteimple.id'],
+            ondelete='CASCADE',
+        ),
+        sa.PrimaryKeyConstraint('cliente_implementacion_id', 'version'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('project_implementacion_snapshot')
+    op.drop_index(
+        op.f('ix_project_implementacion_historial_id'),
+        table_name='project_implementacion_historial',
+    )
+    op.drop_table('project_implementacion_historial')
@@ -1,4 +1,15 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON
+from sqlalchemy import (
+    DDL,
+    Column,
+    Integer,
+    String,
+    Text,
+    DateTime,
+    ForeignKey,
+    Index,
+    JSON,
+    event,
+)
 from sqlalchemy.orm import relationship
 from core.database import Base
 from datetime import datetime
@@ -6,14 +17,32 @@ from datetime import datetime
 
 class HistorialCampaña(Base):
     __tablename__ = "historial_campanas"
+    # Particionada por mes (ver services/particiones_historial.py); la fecha
+    # forma parte de la clave primaria porque PostgreSQL lo exige
+    __table_args__ = (
+        # Historial de una campaña paginado por (fecha, id)
+        Index("ix_historial_campanas_campana_fecha", "campaña_id", "fecha", "id"),
+        {"postgresql_partition_by": "RANGE (fecha)"},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     campaña_id = Column(Integer, ForeignKey("campanas_campanas.id"), nullable=False)
     usuario_id = Column(Integer, nullable=True)  # Quien hizo el cambio
     accion = Column(String, nullable=False)  # "creada", "actualizada", "eliminada"
     cambios = Column(JSON, nullable=True)  # JSON con los campos que cambiaron
-    fecha = Column(DateTime, default=datetime.utcnow, nullable=False)
+    fecha = Column(DateTime, default=datetime.utcnow, nullable=False, primary_key=True)
     observaciones = Column(Text, nullable=True)
 
     # Relación con campaña
     campaña = relationship("Campaña", back_populates="historial")
+
+
+# Partición por defecto para las fechas que todavía no tienen partición mensual
+event.listen(
+    HistorialCampaña.__table__,
+    "after_create",
+    DDL(
+        "CREATE TABLE IF NOT EXISTS historial_campanas_default "
+        "PARTITION OF historial_campanas DEFAULT"
+    ).execute_if(dialect="postgresql"),
+)
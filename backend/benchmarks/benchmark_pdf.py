@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark del PDF de entrega: tiempo por render de la implementación
+anterior (HTML con estilos en línea, logo leído en cada render) frente al
+módulo services/pdf_implementaciones (plantillas Jinja2 compiladas, recursos
+precargados y CSS compartido). No necesita base de datos.
+
+Uso (desde backend/):
+    python -m benchmarks.benchmark_pdf [--renders N]
+"""
+import argparse
+import contextlib
+import io
+import logging
+import statistics
+import time
+from types import SimpleNamespace
+
+from benchmarks import pdf_anterior
+from models.project_entregaImplementaciones import ProjectEntregaImplementaciones
+from services import pdf_implementaciones
+
+# xhtml2pdf advierte por cada propiedad CSS que no implementa
+logging.disable(logging.WARNING)
+
+
+def _datos_ejemplo():
+    imp = SimpleNamespace(id=1, cliente="Cliente Benchmark S.A.S.", proceso="SAC")
+    entrega = ProjectEntregaImplementaciones(id=1, implementacion_id=1)
+    for columna in entrega.__table__.columns:
+        if columna.key not in ("id", "implementacion_id", "fecha_entrega"):
+            setattr(entrega, columna.key, f"Observación de {columna.key}. " * 4)
+    return imp, entrega
+
+
+def medir(renderizadores, imp, entrega, renders):
+    """
+    Alterna los renderizadores en cada vuelta para que el ruido de la máquina
+    afecte a todos por igual.
+
+    Returns:
+        {nombre: (tiempos en ms, tamaño del PDF en bytes)}
+    """
+    resultados = {nombre: ([], 0) for nombre in renderizadores}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for renderizar in renderizadores.values():
+            renderizar(imp, entrega)  # calentamiento
+        for _ in range(renders):
+            for nombre, renderizar in renderizadores.items():
+                inicio = time.perf_counter()
+                contenido = renderizar(imp, entrega)
+                tiempos, _ = resultados[nombre]
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+                resultados[nombre] = (tiempos, len(contenido))
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del PDF de entrega")
+    parser.add_argument("--renders", type=int, default=20)
+    args = parser.parse_args()
+
+    imp, entrega = _datos_ejemplo()
+
+    print(f"📄 Benchmark PDF de entrega ({args.renders} renders)")
+    print("-" * 70)
+    resultados = medir(
+        {
+            "Anterior": pdf_anterior.renderizar_pdf,
+            "Plantillas": pdf_implementaciones.renderizar_pdf,
+        },
+        imp,
+        entrega,
+        args.renders,
+    )
+    for nombre, (tiempos, tamano) in resultados.items():
+        print(
+            f"{nombre:<12} mediana {statistics.median(tiempos):7.1f} ms | "
+            f"mín {min(tiempos):7.1f} ms | máx {max(tiempos):7.1f} ms | "
+            f"{tamano / 1024:.1f} KB"
+        )
+    antes = statistics.median(resultados["Anterior"][0])
+    despues = statistics.median(resultados["Plantillas"][0])
+    print("-" * 70)
+    print(f"⚡ Mejora: {(1 - despues / antes) * 100:.1f}% por render")
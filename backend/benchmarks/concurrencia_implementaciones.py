@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Prueba de concurrencia de la edición de implementaciones contra un servidor
+en marcha (crea sus propias implementaciones de prueba).
+
+1. Contención: varios hilos hacen leer-modificar-escribir (GET + PUT del
+   documento completo, como el frontend) sobre la misma implementación,
+   incrementando un contador guardado en un campo. Sin If-Match se pierden
+   actualizaciones (el contador final es menor que los PUT exitosos); con
+   If-Match cada 409 se reintenta releyendo y no se pierde ninguna.
+2. Throughput: cada hilo edita su propia implementación (sin conflictos),
+   con y sin If-Match, para comprobar que el UPDATE condicional no cuesta
+   más que la escritura sin control.
+
+Uso (desde backend/, con el servidor en marcha):
+    python -m benchmarks.concurrencia_implementaciones [--url http://localhost:8000]
+        [--hilos 8] [--escrituras 25]
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+CAMPO = ("contractual", "modeloContrato", "notas")
+
+DOCUMENTO_BASE = {
+    "cliente": "Benchmark concurrencia",
+    "proceso": "SAC",
+    "estado": "En Proceso",
+    "contractual": {"modeloContrato": {"notas": "0"}},
+    "talento_humano": {},
+    "procesos": {},
+    "tecnologia": {},
+}
+
+
+def _contador(documento) -> int:
+    seccion, campo, atributo = CAMPO
+    return int(documento[seccion][campo][atributo] or 0)
+
+
+def _payload(documento, valor: int):
+    claves = ("cliente", "proceso", "estado", "contractual", "talento_humano", "procesos", "tecnologia")
+    payload = {clave: documento[clave] for clave in claves}
+    seccion, campo, atributo = CAMPO
+    payload[seccion][campo][atributo] = str(valor)
+    return payload
+
+
+def crear_implementacion(cliente: httpx.Client) -> int:
+    respuesta = cliente.post("/implementaciones/", json=DOCUMENTO_BASE)
+    respuesta.raise_for_status()
+    return respuesta.json()["id"]
+
+
+def incrementar(cliente: httpx.Client, id_: int, con_if_match: bool, stats: dict, lock):
+    """Un incremento leer-modificar-escribir; con If-Match reintenta ante 409"""
+    while True:
+        respuesta = cliente.get(f"/implementaciones/{id_}")
+        respuesta.raise_for_status()
+        documento = respuesta.json()
+        cabeceras = {"If-Match": respuesta.headers["ETag"]} if con_if_match else {}
+        respuesta = cliente.put(
+            f"/implementaciones/{id_}",
+            json=_payload(documento, _contador(documento) + 1),
+            headers=cabeceras,
+        )
+        with lock:
+            stats["peticiones"] += 2
+        if respuesta.status_code == 409:
+            with lock:
+                stats["conflictos"] += 1
+            continue
+        respuesta.raise_for_status()
+        with lock:
+            stats["exitosas"] += 1
+        return
+
+
+def ejecutar(url: str, ids, hilos: int, escrituras: int, con_if_match: bool) -> dict:
+    """
+    Cada hilo hace `escrituras` incrementos sobre ids[hilo % len(ids)].
+
+    Returns:
+        Estadísticas: exitosas, conflictos, peticiones, segundos y el valor
+        final del contador de cada implementación
+    """
+    stats = {"exitosas": 0, "conflictos": 0, "peticiones": 0}
+    lock = threading.Lock()
+    iniciales = {}
+    with httpx.Client(base_url=url, timeout=60) as cliente:
+        for id_ in ids:
+            iniciales[id_] = _contador(cliente.get(f"/implementaciones/{id_}").json())
+
+    def trabajador(numero: int):
+        with httpx.Client(base_url=url, timeout=60) as cliente:
+            id_ = ids[numero % len(ids)]
+            for _ in range(escrituras):
+                incrementar(cliente, id_, con_if_match, stats, lock)
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        list(pool.map(trabajador, range(hilos)))
+    stats["segundos"] = time.perf_counter() - inicio
+
+    with httpx.Client(base_url=url, timeout=60) as cliente:
+        stats["incrementos_guardados"] = sum(
+            _contador(cliente.get(f"/implementaciones/{id_}").json()) - iniciales[id_]
+            for id_ in ids
+        )
+    stats["perdidas"] = stats["exitosas"] - stats["incrementos_guardados"]
+    return stats
+
+
+def _imprimir(titulo: str, stats: dict):
+    print(
+        f"{titulo:<34} {stats['exitosas']:>6} PUT ok {stats['conflictos']:>6} conflictos "
+        f"{stats['perdidas']:>6} perdidas {stats['exitosas'] / stats['segundos']:>8.1f} escrituras/s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrencia en la edición de implementaciones")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--hilos", type=int, default=8)
+    parser.add_argument("--escrituras", type=int, default=25, help="Incrementos por hilo")
+    args = parser.parse_args()
+
+    with httpx.Client(base_url=args.url, timeout=60) as cliente:
+        compartida = [crear_implementacion(cliente)]
+        propias = [crear_implementacion(cliente) for _ in range(args.hilos)]
+
+    print(f"{args.hilos} hilos x {args.escrituras} escrituras\n")
+    print("Contención (una implementación compartida):")
+    _imprimir("  sin If-Match", ejecutar(args.url, compartida, args.hilos, args.escrituras, False))
+    con_control = ejecutar(args.url, compartida, args.hilos, args.escrituras, True)
+    _imprimir("  con If-Match (reintenta ante 409)", con_control)
+
+    print("\nThroughput (una implementación por hilo):")
+    # Se alterna el orden para que el calentamiento no favorezca a ninguno
+    resultados = {"sin If-Match": [], "con If-Match": []}
+    for ronda in range(2):
+        for con_if_match in ((False, True) if ronda == 0 else (True, False)):
+            stats = ejecutar(args.url, propias, args.hilos, args.escrituras, con_if_match)
+            resultados["con If-Match" if con_if_match else "sin If-Match"].append(stats)
+    for titulo, rondas in resultados.items():
+        exitosas = sum(stats["exitosas"] for stats in rondas)
+        segundos = sum(stats["segundos"] for stats in rondas)
+        perdidas = sum(stats["perdidas"] for stats in rondas)
+        print(f"  {titulo:<32} {exitosas / segundos:>8.1f} escrituras/s, {perdidas} perdidas")
+
+    if con_control["perdidas"]:
+        raise SystemExit(f"❌ Se perdieron {con_control['perdidas']} actualizaciones con If-Match")
+    print("\n✅ Ninguna actualización perdida con If-Match")
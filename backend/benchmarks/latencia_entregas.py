@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga de /entregas contra un servidor en marcha (crea su propia
+implementación y entregas de prueba).
+
+Varios lectores concurrentes consultan sin pausa el health check (/) y el
+detalle de una entrega mientras, en una segunda fase, otros clientes crean y
+actualizan entregas con textos largos. Se reportan los percentiles de
+latencia de las lecturas en reposo y durante las escrituras: con acceso
+bloqueante a la base de datos dentro de endpoints async def, cada escritura
+detiene el event loop y el p99 de todas las peticiones se dispara; con la
+sesión asíncrona debe mantenerse cerca del valor en reposo.
+
+Uso (desde backend/, con el servidor en marcha con un solo worker):
+    python -m benchmarks.latencia_entregas [--url http://localhost:8000]
+        [--lectores 16] [--escritores 4] [--segundos 10]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+TEXTO = "Detalle de la entrega con información contractual y técnica. " * 40
+
+DATOS_ENTREGA = {
+    "contractual": {
+        campo: TEXTO
+        for campo in ("contrato", "acuerdoNivelesServicio", "polizas", "penalidades")
+    },
+    "tecnologia": {
+        campo: TEXTO for campo in ("mapaAplicativos", "internet", "telefonia", "vpn")
+    },
+    "procesos": {"listadoReportes": TEXTO},
+}
+
+
+async def preparar(cliente: httpx.AsyncClient) -> dict:
+    """Crea la implementación y una entrega que leen los lectores"""
+    respuesta = await cliente.post(
+        "/implementaciones/",
+        json={
+            "cliente": "Benchmark entregas",
+            "proceso": "SAC",
+            "estado": "En Proceso",
+            "contractual": {},
+            "talento_humano": {},
+            "procesos": {},
+            "tecnologia": {},
+        },
+    )
+    respuesta.raise_for_status()
+    implementacion_id = respuesta.json()["id"]
+    respuesta = await cliente.post(
+        "/entregas/",
+        json={"implementacion_id": implementacion_id, "datos_entrega": DATOS_ENTREGA},
+    )
+    respuesta.raise_for_status()
+    return {"implementacion_id": implementacion_id, "entrega_id": respuesta.json()["id"]}
+
+
+async def lector(cliente: httpx.AsyncClient, ruta: str, fin: float, latencias: list):
+    while time.perf_counter() < fin:
+        inicio = time.perf_counter()
+        respuesta = await cliente.get(ruta)
+        respuesta.raise_for_status()
+        latencias.append((time.perf_counter() - inicio) * 1000)
+
+
+async def escritor(cliente: httpx.AsyncClient, implementacion_id: int, fin: float, stats: dict):
+    """Crea una entrega y la actualiza, en bucle"""
+    payload = {"implementacion_id": implementacion_id, "datos_entrega": DATOS_ENTREGA}
+    while time.perf_counter() < fin:
+        respuesta = await cliente.post("/entregas/", json=payload)
+        respuesta.raise_for_status()
+        entrega_id = respuesta.json()["id"]
+        respuesta = await cliente.put(f"/entregas/{entrega_id}", json=payload)
+        respuesta.raise_for_status()
+        stats["escrituras"] += 2
+
+
+async def fase(url: str, datos: dict, lectores: int, escritores: int, segundos: float) -> dict:
+    rutas = ["/", f"/entregas/{datos['entrega_id']}"]
+    latencias = {ruta: [] for ruta in rutas}
+    stats = {"escrituras": 0}
+    limites = httpx.Limits(max_connections=lectores + escritores)
+    async with httpx.AsyncClient(base_url=url, timeout=60, limits=limites) as cliente:
+        fin = time.perf_counter() + segundos
+        tareas = [
+            lector(cliente, rutas[numero % len(rutas)], fin, latencias[rutas[numero % len(rutas)]])
+            for numero in range(lectores)
+        ]
+        tareas += [
+            escritor(cliente, datos["implementacion_id"], fin, stats)
+            for _ in range(escritores)
+        ]
+        await asyncio.gather(*tareas)
+    stats["latencias"] = latencias
+    stats["segundos"] = segundos
+    return stats
+
+
+def _percentil(valores: list, p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+
+def _imprimir(titulo: str, stats: dict):
+    print(f"{titulo} ({stats['escrituras'] / stats['segundos']:.1f} escrituras/s)")
+    for ruta, valores in stats["latencias"].items():
+        print(
+            f"  GET {ruta:<20} {len(valores):>6} peticiones  "
+            f"p50 {statistics.median(valores):>7.1f} ms  "
+            f"p95 {_percentil(valores, 95):>7.1f} ms  "
+            f"p99 {_percentil(valores, 99):>7.1f} ms  "
+            f"máx {max(valores):>7.1f} ms"
+        )
+
+
+async def main(args):
+    async with httpx.AsyncClient(base_url=args.url, timeout=60) as cliente:
+        datos = await preparar(cliente)
+
+    print(f"{args.lectores} lectores, {args.escritores} escritores, {args.segundos} s por fase\n")
+    reposo = await fase(args.url, datos, args.lectores, 0, args.segundos)
+    _imprimir("Solo lecturas", reposo)
+    carga = await fase(args.url, datos, args.lectores, args.escritores, args.segundos)
+    _imprimir("\nLecturas mientras se escriben entregas", carga)
+
+    print()
+    for ruta in reposo["latencias"]:
+        p99_reposo = _percentil(reposo["latencias"][ruta], 99)
+        p99_carga = _percentil(carga["latencias"][ruta], 99)
+        print(f"p99 GET {ruta}: x{p99_carga / p99_reposo:.1f} respecto de las lecturas solas")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latencia de /entregas con escrituras concurrentes")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--lectores", type=int, default=16)
+    parser.add_argument("--escritores", type=int, default=4)
+    parser.add_argument("--segundos", type=float, default=10)
+    asyncio.run(main(parser.parse_args()))
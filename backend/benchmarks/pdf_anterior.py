@@ -0,0 +1,316 @@
+"""
+Implementación anterior del PDF de entrega (HTML armado a mano con estilos en
+línea y el logo leído del disco en cada render). Se conserva solo como
+referencia para benchmark_pdf.py.
+"""
+import base64
+import io
+import os
+from datetime import datetime
+
+from xhtml2pdf import pisa
+
+LOGO_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "static", "img", "logo-andesbpo.png"
+)
+
+
+def cargar_logo() -> str:
+    """Logo en base64 listo para usar como src de <img>"""
+    try:
+        with open(LOGO_PATH, "rb") as f:
+            return "data:image/png;base64," + base64.b64encode(f.read()).decode(
+                "utf-8"
+            )
+    except Exception as e:
+        print(f"⚠️ No se pudo cargar el logo: {e}")
+        return ""
+
+
+def safe_text(text) -> str:
+    """Sanitiza texto para insertarlo en el HTML"""
+    if not text:
+        return "&nbsp;"
+    return str(text).replace('"', "'").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def nombre_archivo_pdf(imp) -> str:
+    fecha_actual = datetime.now().strftime("%d/%m/%Y")
+    cliente = safe_text(imp.cliente) if imp.cliente else "&nbsp;"
+    return f"entrega_{cliente.replace(' ', '_').replace('&nbsp;', '')}_{fecha_actual.replace('/', '-')}.pdf"
+
+
+def construir_html(imp, entrega) -> str:
+    """HTML del formato de entrega con los datos de la implementación y la entrega"""
+    fecha_actual = datetime.now().strftime("%d/%m/%Y")
+    logo_base64 = cargar_logo()
+
+    # Datos sanitizados
+    cliente = safe_text(imp.cliente) if imp.cliente else "&nbsp;"
+    proceso = safe_text(imp.proceso) if imp.proceso else "&nbsp;"
+
+    # Estilos inline directos optimizados para mejor uso del espacio
+    style_header = "background:#000; color:#fff; padding:3px 2px; text-align:center; vertical-align:middle; font-size:8pt; font-weight:bold; border:1px solid #000; font-family:Roboto, Arial, sans-serif; line-height:1.2;"
+    style_header_proceso = "background:#000; color:#fff; padding:3px 2px; text-align:center; vertical-align:middle; font-size:8pt; font-weight:bold; border:1px solid #000; width:16%; font-family:Roboto, Arial, sans-serif; line-height:1.2;"
+    style_header_concepto = "background:#000; color:#fff; padding:3px 2px; text-align:center; vertical-align:middle; font-size:8pt; font-weight:bold; border:1px solid #000; width:37%; font-family:Roboto, Arial, sans-serif; line-height:1.2;"
+    style_header_observacion = "background:#000; color:#fff; padding:3px 2px; text-align:center; vertical-align:middle; font-size:8pt; font-weight:bold; border:1px solid #000; width:47%; font-family:Roboto, Arial, sans-serif; line-height:1.2;"
+    style_proceso = "padding:3px 2px; font-size:8pt; border:1px solid #444; vertical-align:top; text-align:center; font-family:Roboto, Arial, sans-serif; line-height:1.3;"
+    style_concepto = "padding:3px 2px; font-size:8pt; border:1px solid #444; vertical-align:top; text-align:left; font-family:Roboto, Arial, sans-serif; line-height:1.3;"
+    style_observacion = "padding:3px 2px; font-size:8pt; border:1px solid #444; vertical-align:top; text-align:left; font-family:Roboto, Arial, sans-serif; line-height:1.3; word-wrap:break-word;"
+
+    # HTML con maquetación optimizada para mejor uso del espacio
+    html_content = f"""<!doctype html>
+    <html lang="es">
+    <head>
+    <meta charset="utf-8"/>
+    <title>Formato Entrega Campañas</title>
+    <style>
+    @page {{ 
+        size: A4; 
+        margin: 12mm 10mm 12mm 10mm;
+    }}
+    body {{ 
+        font-family: 'Roboto', Arial, sans-serif; 
+        margin: 0; 
+        padding: 0; 
+        font-size: 8pt;
+        line-height: 1.3;
+    }}
+    table {{ 
+        width: 100%; 
+        border-collapse: collapse; 
+        font-family: 'Roboto', Arial, sans-serif;
+        table-layout: fixed;
+    }}
+    .info-table {{
+        margin-bottom: 8px;
+    }}
+    .data-table {{
+        page-break-inside: auto;
+    }}
+    .data-table thead {{
+        display: table-header-group;
+    }}
+    .data-table tbody tr {{
+        page-break-inside: avoid;
+    }}
+    td {{
+        word-wrap: break-word;
+        overflow-wrap: break-word;
+    }}
+    </style>
+    </head>
+    <body>
+
+    <!-- Header con título centrado y logo a la derecha -->
+    <table style="width:100%; margin-bottom:8px; border:none; border-collapse:collapse;">
+        <tr>
+            <td style="width:15%; border:none; padding:0;"></td>
+            <td style="width:55%; text-align:center; border:none; padding:0; vertical-align:bottom;">
+                <h1 style="font-size:10pt; margin:0; font-family:Roboto, Arial, sans-serif; font-weight:bold;">FORMATO ENTREGA CAMPAÑAS</h1>
+            </td>
+            <td style="width:30%; text-align:right; border:none; padding:0; vertical-align:bottom;">
+                <img src="{logo_base64}" style="height:60px; width:auto; display:block; margin-left:auto;" alt="AndesBPO" />
+            </td>
+        </tr>
+    </table>
+
+    <!-- Tabla de información del cliente -->
+    <table class="info-table">
+    <tr>
+    <td style="width:35%; padding:2px 4px; border:1px solid #444; background:#f0f0f0; font-weight:bold; vertical-align:middle; text-align:left; font-size:8pt; font-family:Roboto, Arial, sans-serif;">NOMBRE DEL CLIENTE</td>
+    <td style="padding:2px 4px; border:1px solid #444; text-align:left; vertical-align:middle; font-size:8pt; font-family:Roboto, Arial, sans-serif;">{cliente}</td>
+    </tr>
+    <tr>
+    <td style="padding:2px 4px; border:1px solid #444; background:#f0f0f0; font-weight:bold; vertical-align:middle; text-align:left; font-size:8pt; font-family:Roboto, Arial, sans-serif;">TIPO DE SERVICIO</td>
+    <td style="padding:2px 4px; border:1px solid #444; text-align:left; vertical-align:middle; font-size:8pt; font-family:Roboto, Arial, sans-serif;">{proceso}</td>
+    </tr>
+    <tr>
+    <td style="padding:2px 4px; border:1px solid #444; background:#f0f0f0; font-weight:bold; vertical-align:middle; text-align:left; font-size:8pt; font-family:Roboto, Arial, sans-serif;">FECHA DE INICIO SERVICIO</td>
+    <td style="padding:2px 4px; border:1px solid #444; text-align:left; vertical-align:middle; font-size:8pt; font-family:Roboto, Arial, sans-serif;">{fecha_actual}</td>
+    </tr>
+    <tr>
+    <td style="padding:2px 4px; border:1px solid #444; background:#f0f0f0; font-weight:bold; vertical-align:middle; text-align:left; font-size:8pt; font-family:Roboto, Arial, sans-serif;">FECHA DE ENTREGA</td>
+    <td style="padding:2px 4px; border:1px solid #444; text-align:left; vertical-align:middle; font-size:8pt; font-family:Roboto, Arial, sans-serif;">{fecha_actual}</td>
+    </tr>
+    </table>
+
+    <!-- Tabla de tres columnas con encabezado repetido -->
+    <table class="data-table" style="margin-top:8px; width:100%;">
+    <!-- Encabezados que se repiten en cada página -->
+    <thead>
+    <tr>
+    <td style="{style_header_proceso}">PROCESO</td>
+    <td style="{style_header_concepto}">CONCEPTO</td>
+    <td style="{style_header_observacion}">OBSERVACION</td>
+    </tr>
+    </thead>
+    <tbody>
+
+    <!-- CONTRACTUAL -->
+    <tr>
+    <td rowspan="8" style="{style_proceso}">CONTRACTUAL</td>
+    <td style="{style_concepto}">Contrato</td>
+    <td style="{style_observacion}">{safe_text(entrega.contrato)}</td>
+    </tr>
+    <tr>
+    <td style="{style_concepto}">Acuerdos de Niveles de Servicio</td>
+    <td style="{style_observacion}">{safe_text(entrega.acuerdo_niveles_servicio)}</td>
+    </tr>
+    <tr>
+    <td style="{style_concepto}">Pólizas</td>
+    <td style="{style_observacion}">{safe_text(entrega.polizas)}</td>
+    </tr>
+    <tr>
+    <td style="{style_concepto}">Penalidades</td>
+    <td style="{style_observacion}">{safe_text(entrega.penalidades)}</td>
+    </tr>
+    <tr>
+    <td style="{style_concepto}">Alcance del Servicio</td>
+    <td style="{style_observacion}">{safe_text(entrega.alcance_servicio)}</td>
+    </tr>
+    <tr>
+    <td style="{style_concepto}">Unidades de Facturación</td>
+    <td style="{style_observacion}">{safe_text(entrega.unidades_facturacion)}</td>
+    </tr>
+    <tr>
+    <td style="{style_concepto}">Acuerdo de Pago</td>
+    <td style="{style_observacion}">{safe_text(entrega.acuerdo_pago)}</td>
+    </tr>
+    <tr>
+    <td style="{style_concepto}">Incremento</td>
+    <td style="{style_observacion}">{safe_text(entrega.incremento)}</td>
+    </tr>
+
+    <!-- TECNOLOGIA -->
+    <tr>
+    <td rowspan="14" style="{style_proceso}">TECNOLOGIA</td>
+    <td style="{style_concepto}">Mapa de Aplicativos a utilizarse (Nombres, alcances, requerimientos técnicos, funcionalidades)</td>
+    <td style="{style_observacion}">{safe_text(entrega.mapa_aplicativos)}</td>
+    </tr>
+    <tr>
+    <td style="{style_concepto}">Internet</td>
+    <td style="{style_observacion}">{safe_text(entrega.internet)}</td>
+    </tr>
+    <tr>
+    <td style="{style_concepto}">Telefonía</td>
+    <td style="{style_observacion}">{safe_text(entrega.telefonia)}</td>
+    </tr>
+    <tr>
+    <td style="{style_concepto}">Whatsapp</td>
+    <td style="{style_observacion}">{safe_text(entrega.whatsapp)}</td>
+    </tr>
+    <tr>
+    <td style="{style_concepto}">Integraciones</td>
+    <td style="{style_observacion}">{safe_text(entrega.integraciones)}</td>
+    </tr>
+    <tr>
+    <td style="{style_concepto}">VPN</td>
+    <td style="{style_observacion}">{safe_text(entrega.vpn)}</td>
+    </tr>
+    <tr>
+    <td style="{style_concepto}">Diseño del IVR</td>
+    <td style="{style_observacion}">{safe_text(entrega.diseno_ivr)}</td>
+    </tr>
+    <tr>
+    <td style="{style_concepto}">Transferencia de llamadas entre empresas: Lineas Telefónicas, Volumen de Llamadas</td>
+    <td style="{style_observacion}">{safe_text(entrega.transferencia_llamadas)}</td>
+    </tr>
+    <tr>
+    <td style="{style_concepto}">Correos Electrónicos (Condiciones de Uso, capacidades)</td>
+    <td style="{style_observacion}">{safe_text(entrega.correos_electronicos)}</td>
+    </tr>
+    <tr>
+    <td style="{style_concepto}">Línea 018000</td>
+    <td style="{style_observacion}">{safe_text(entrega.linea_018000)}</td>
+    </tr>
+    <tr>
+    <td style="{style_concepto}">Línea de Entrada</td>
+    <td style="{style_observacion}">{safe_text(entrega.linea_entrada)}</td>
+    </tr>
+    <tr>
+    <td style="{style_concepto}">SMS (Caracteristicas)</td>
+    <td style="{style_observacion}">{safe_text(entrega.sms)}</td>
+    </tr>
+    <tr>
+    <td style="{style_concepto}">Requisitos Grabación de llamada, entrega y resguardo de las mismas</td>
+    <td style="{style_observacion}">{safe_text(entrega.requisitos_grabacion)}</td>
+    </tr>
+    <tr>
+    <td style="{style_concepto}">Encuestas de satisfacción</td>
+    <td style="{style_observacion}">{safe_text(entrega.encuesta_satisfaccion)}</td>
+    </tr>
+
+    <!-- PROCESOS -->
+    <tr>
+    <td rowspan="2" style="{style_proceso}">PROCESOS</td>
+    <td style="{style_concepto}">Listado Reportes Esperados</td>
+    <td style="{style_observacion}">{safe_text(entrega.listado_reportes)}</td>
+    </tr>
+    <tr>
+    <td style="{style_concepto}">Proceso Monitoreo y Calidad Andes BPO</td>
+    <td style="{style_observacion}">{safe_text(entrega.proceso_monitoreo_calidad)}</td>
+    </tr>
+    </tbody>
+    </table>
+
+    <!-- Firmas - con espacio para firmar -->
+    <div style="margin-top:25px; page-break-inside:avoid;">
+    <table style="width:100%; border:none; border-collapse:collapse;">
+    <tr>
+    <td style="width:50%; padding:8px 10px; border:none; vertical-align:top;">
+    <p style="margin:0 0 3px 0; font-weight:bold; font-size:9pt; font-family:Roboto, Arial, sans-serif;">Ejecutivo Campaña</p>
+    <div style="height:38px; margin-top:5px;">
+        <div style="display:block; border-bottom:2px solid #000; width:90%; height:1px;">&nbsp;</div>
+    </div>
+    </td>
+    <td style="width:50%; padding:8px 10px; border:none; vertical-align:top;">
+    <p style="margin:0 0 3px 0; font-weight:bold; font-size:9pt; font-family:Roboto, Arial, sans-serif;">Líder Campaña</p>
+    <div style="height:38px; margin-top:5px;">
+        <div style="display:block; border-bottom:2px solid #000; width:90%; height:1px;">&nbsp;</div>
+    </div>
+    </td>
+    </tr>
+    <tr>
+    <td style="padding:15px 10px 8px 10px; border:none; vertical-align:top;">
+    <p style="margin:0 0 3px 0; font-weight:bold; font-size:9pt; font-family:Roboto, Arial, sans-serif;">Auxiliar Administrativo</p>
+    <div style="height:38px; margin-top:5px;">
+        <div style="display:block; border-bottom:2px solid #000; width:90%; height:1px;">&nbsp;</div>
+    </div>
+    </td>
+    <td style="padding:15px 10px 8px 10px; border:none; vertical-align:top;">
+    <p style="margin:0 0 3px 0; font-weight:bold; font-size:9pt; font-family:Roboto, Arial, sans-serif;">Ejecutivo Comercial</p>
+    <div style="height:38px; margin-top:5px;">
+        <div style="display:block; border-bottom:2px solid #000; width:90%; height:1px;">&nbsp;</div>
+    </div>
+    </td>
+    </tr>
+        <tr>
+        <td colspan="2" style="padding:15px 10px 8px 10px; border:none; vertical-align:top;">
+        <p style="margin:0 0 3px 0; font-weight:bold; font-size:9pt; font-family:Roboto, Arial, sans-serif;">Líder Implementación</p>
+            <!-- Nested table with line on the left: 50% line | 50% empty -->
+            <table style="width:100%; border:none; border-collapse:collapse; margin-top:35px;">
+                <tr>
+                    <td style="width:48.5%; border:none; padding:0; vertical-align:bottom;">
+                        <div style="border-bottom:2px solid #000; width:100%; height:1px;">&nbsp;</div>
+                    </td>
+                    <td style="width:50%; border:none; padding:0;">&nbsp;</td>
+                </tr>
+            </table>
+        </td>
+        </tr>
+    </table>
+    </div>
+
+    </body>
+    </html>
+    """
+
+    return html_content
+
+
+def renderizar_pdf(imp, entrega) -> bytes:
+    html_content = construir_html(imp, entrega)
+    pdf_buffer = io.BytesIO()
+    pisa.CreatePDF(html_content.encode("utf-8"), dest=pdf_buffer)
+    return pdf_buffer.getvalue()
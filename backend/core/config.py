@@ -14,3 +14,30 @@ DATABASE_URL = os.getenv(
 SECRET_KEY = os.getenv("SECRET_KEY", "supersecretkey_cambiar_en_produccion_por_valor_seguro_de_al_menos_32_caracteres")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60))
+
+# Directorio donde el worker de exportaciones guarda los archivos generados.
+# Debe ser compartido entre la API y el worker.
+EXPORTS_DIR = os.getenv("EXPORTS_DIR", str(BASE_DIR / "exports"))
+EXPORT_WORKER_PROCESOS = int(os.getenv("EXPORT_WORKER_PROCESOS", 2))
+# Horas que se conservan los trabajos terminados y sus archivos; después el
+# worker los borra
+EXPORTS_RETENCION_HORAS = float(os.getenv("EXPORTS_RETENCION_HORAS", 72))
+
+# Caché en disco de PDFs de entrega renderizados
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", str(BASE_DIR / "cache_pdf"))
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+
+# Segundos que un worker reutiliza las estadísticas del tablero de campañas
+# (las escrituras de ese mismo worker las invalidan antes)
+ESTADISTICAS_CACHE_TTL = float(os.getenv("ESTADISTICAS_CACHE_TTL", 60))
+
+# Particiones mensuales del historial de campañas: meses que se crean por
+# adelantado y meses que se conservan antes de pasar al archivo
+HISTORIAL_CAMPANAS_MESES_ADELANTE = int(os.getenv("HISTORIAL_CAMPANAS_MESES_ADELANTE", 3))
+HISTORIAL_CAMPANAS_RETENCION_MESES = int(os.getenv("HISTORIAL_CAMPANAS_RETENCION_MESES", 24))
+
+# Filas (rango de ids) por lote en las tareas de mantenimiento de campañas
+MANTENIMIENTO_TAMANO_LOTE = int(os.getenv("MANTENIMIENTO_TAMANO_LOTE", 5000))
+
+# Segundos que un worker reutiliza el resumen de facturación de campañas
+FACTURACION_CACHE_TTL = float(os.getenv("FACTURACION_CACHE_TTL", 300))
@@ -1,4 +1,7 @@
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from core.config import DATABASE_URL
@@ -7,6 +10,52 @@ engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Motor asíncrono (psycopg 3) para los endpoints async def: las consultas no
+# bloquean el event loop de uvicorn. Usa la misma base que DATABASE_URL. Solo
+# existe con PostgreSQL; con otros motores get_async_db usa SesionEnHilos.
+async_engine = None
+AsyncSessionLocal = None
+_url = make_url(DATABASE_URL)
+if _url.get_backend_name() == "postgresql":
+    async_engine = create_async_engine(_url.set(drivername="postgresql+psycopg"))
+    # expire_on_commit=False: tras el commit los objetos se siguen leyendo sin
+    # volver a consultar (en async no hay carga implícita de atributos)
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
+
+class SesionEnHilos:
+    """
+    Sesión síncrona con la interfaz de AsyncSession que usan los endpoints
+    async def, para motores sin driver asíncrono: cada operación con la base de
+    datos se ejecuta en el threadpool.
+    """
+
+    def __init__(self, db):
+        self._db = db
+
+    def add(self, instancia):
+        self._db.add(instancia)
+
+    async def execute(self, *args, **kwargs):
+        return await run_in_threadpool(self._db.execute, *args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        return await run_in_threadpool(self._db.get, *args, **kwargs)
+
+    async def delete(self, instancia):
+        await run_in_threadpool(self._db.delete, instancia)
+
+    async def commit(self):
+        await run_in_threadpool(self._db.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self._db.rollback)
+
+    async def run_sync(self, funcion, *args, **kwargs):
+        return await run_in_threadpool(funcion, self._db, *args, **kwargs)
+
 
 # Este método debe estar aquí:
 def get_db():
@@ -15,3 +64,17 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependencia con una AsyncSession para los endpoints async def"""
+    if AsyncSessionLocal is None:
+        db = SessionLocal()
+        try:
+            yield SesionEnHilos(db)
+        finally:
+            db.close()
+        return
+
+    async with AsyncSessionLocal() as db:
+        yield db
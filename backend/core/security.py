@@ -52,6 +52,7 @@
 #     except JWTError:
 #         raise HTTPException(status_code=401, detail="Token inválido")
 from datetime import datetime, timedelta
+from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
@@ -157,6 +158,27 @@ def get_current_user(
     return usuario
 
 
+# Mismo esquema pero sin responder 401 cuando no viene el token
+oauth2_scheme_opcional = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
+
+
+def get_current_user_opcional(
+    token: Optional[str] = Depends(oauth2_scheme_opcional), db: Session = Depends(get_db)
+) -> Optional[Usuario]:
+    """
+    Usuario del token si viene uno válido; None en caso contrario. Para
+    endpoints que no exigen autenticación pero registran quién hizo el cambio.
+    """
+    if not token:
+        return None
+    try:
+        payload = decodificar_token(token)
+        user_id = int(payload.get("sub"))
+    except (JWTError, ValueError, TypeError, AttributeError):
+        return None
+    return db.query(Usuario).filter(Usuario.id == user_id).first()
+
+
 # Si prefieres usar solo el token (sin consultar la BD), puedes crear una función aparte:
 def get_current_user_from_token(token: str = Depends(oauth2_scheme)) -> UserInDB:
     try:
@@ -0,0 +1,98 @@
+from sqlalchemy import Text, case, select, tuple_
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional, Tuple
+from models.project_entregaImplementaciones import ProjectEntregaImplementaciones
+from models.project_implementaciones_clienteimple import (
+    ProjectImplementacionesClienteImple,
+)
+
+# Campos de texto libre de una entrega (contractuales, tecnológicos y de procesos)
+CAMPOS_ENTREGA = tuple(
+    columna.key
+    for columna in ProjectEntregaImplementaciones.__table__.columns
+    if isinstance(columna.type, Text)
+)
+
+
+def _campos_completos():
+    """Expresión SQL con la cantidad de campos de texto no vacíos de la entrega"""
+    tabla = ProjectEntregaImplementaciones.__table__
+    expresion = None
+    for campo in CAMPOS_ENTREGA:
+        # NULL <> '' es NULL, así que los nulos también cuentan como vacíos
+        termino = case((tabla.c[campo] != "", 1), else_=0)
+        expresion = termino if expresion is None else expresion + termino
+    return expresion.label("campos_completos")
+
+
+def listar_resumen_entregas(
+    db: Session,
+    limit: int,
+    cursor: Optional[int] = None,
+    implementacion_id: Optional[int] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """
+    Devuelve una página del listado liviano de entregas: datos de la
+    implementación, fecha, estado y completitud (campos de texto llenos sobre
+    el total), sin los textos. Se ordena de la más reciente a la más antigua
+    (keyset por fecha_entrega, id); el índice ix_entregas_implementacion_fecha
+    resuelve el filtro por implementación y el orden.
+
+    cursor es el id de la última entrega recibida; la completitud se calcula
+    en la base de datos, así que los textos nunca salen de PostgreSQL.
+
+    Raises:
+        ValueError: si la entrega del cursor no existe
+
+    Returns:
+        (items, next_cursor). next_cursor es None cuando no hay más páginas.
+    """
+    entrega = ProjectEntregaImplementaciones
+    implementacion = ProjectImplementacionesClienteImple
+    consulta = (
+        select(
+            entrega.id,
+            entrega.implementacion_id,
+            implementacion.cliente,
+            implementacion.proceso,
+            entrega.fecha_entrega,
+            entrega.estado_entrega,
+            _campos_completos(),
+        )
+        .join(implementacion, implementacion.id == entrega.implementacion_id)
+        .order_by(entrega.fecha_entrega.desc(), entrega.id.desc())
+        .limit(limit + 1)
+    )
+    if implementacion_id is not None:
+        consulta = consulta.where(entrega.implementacion_id == implementacion_id)
+    if cursor is not None:
+        fecha_cursor = db.execute(
+            select(entrega.fecha_entrega).where(entrega.id == cursor)
+        ).scalar_one_or_none()
+        if fecha_cursor is None:
+            raise ValueError(f"Cursor no válido: la entrega {cursor} no existe")
+        consulta = consulta.where(
+            tuple_(entrega.fecha_entrega, entrega.id) < tuple_(fecha_cursor, cursor)
+        )
+
+    filas = db.execute(consulta).all()
+    hay_mas = len(filas) > limit
+    filas = filas[:limit]
+
+    total = len(CAMPOS_ENTREGA)
+    items = [
+        {
+            "id": fila.id,
+            "implementacion_id": fila.implementacion_id,
+            "cliente": fila.cliente,
+            "proceso": fila.proceso,
+            "fecha_entrega": fila.fecha_entrega,
+            "estado_entrega": fila.estado_entrega,
+            "campos_completos": fila.campos_completos,
+            "campos_totales": total,
+            "completitud": round(fila.campos_completos * 100 / total, 1),
+        }
+        for fila in filas
+    ]
+    next_cursor = filas[-1].id if hay_mas and filas else None
+    return items, next_cursor
@@ -0,0 +1,383 @@
+"""
+Historial de cambios de las campañas (creación, edición, productos y
+facturación).
+
+registrar_cambio_campaña agrega la fila de historial a la sesión sin hacer
+commit: el endpoint la confirma junto con la modificación en una sola
+transacción. El nombre que aparece en el mensaje legible se toma de una caché
+con vencimiento (NOMBRES_TTL segundos) en lugar de consultar Usuario en cada
+cambio, y los cambios se convierten a tipos JSON en una sola pasada.
+
+listar_historial_campaña pagina por keyset sobre (campaña_id, fecha, id) con
+el índice ix_historial_campanas_campana_fecha. El cursor incluye la fecha, así
+que PostgreSQL solo recorre las particiones mensuales necesarias y las páginas
+recientes cuestan lo mismo sin importar el tamaño de la tabla.
+"""
+import datetime
+import enum
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+
+from app.models.historial_campana import HistorialCampaña
+from app.models.usuario import Usuario
+
+NOMBRES_TTL = 300
+NOMBRE_POR_DEFECTO = "Usuario"
+
+
+class CacheNombresUsuario:
+    """Nombre para mostrar de cada usuario, válido NOMBRES_TTL segundos"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._nombres: Dict[int, Tuple[str, float]] = {}
+
+    def obtener(self, db: Session, usuario_id: Optional[int]) -> str:
+        if not usuario_id:
+            return NOMBRE_POR_DEFECTO
+        ahora = time.monotonic()
+        with self._lock:
+            guardado = self._nombres.get(usuario_id)
+        if guardado and guardado[1] > ahora:
+            return guardado[0]
+
+        nombre = NOMBRE_POR_DEFECTO
+        usuario = (
+            db.query(Usuario.nombre, Usuario.apellido)
+            .filter(Usuario.id == usuario_id)
+            .first()
+        )
+        if usuario:
+            # Evitar nombres duplicados
+            if usuario.nombre == usuario.apellido:
+                nombre = usuario.nombre
+            else:
+                nombre = f"{usuario.nombre} {usuario.apellido}".strip()
+        with self._lock:
+            self._nombres[usuario_id] = (nombre, ahora + self.ttl)
+        return nombre
+
+    def invalidar(self, usuario_id: Optional[int] = None):
+        """Olvida el nombre de un usuario (o todos si no se indica)"""
+        with self._lock:
+            if usuario_id is None:
+                self._nombres.clear()
+            else:
+                self._nombres.pop(usuario_id, None)
+
+
+cache_nombres = CacheNombresUsuario(NOMBRES_TTL)
+
+
+def serializar_cambios(valor: Any) -> Any:
+    """Convierte fechas y enums a tipos JSON recorriendo el valor una sola vez"""
+    if isinstance(valor, dict):
+        return {clave: serializar_cambios(v) for clave, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [serializar_cambios(v) for v in valor]
+    if isinstance(valor, enum.Enum):
+        return valor.value
+    if isinstance(valor, (datetime.date, datetime.datetime)):
+        return valor.isoformat()
+    return valor
+
+
+def registrar_cambio_campaña(
+    db: Session,
+    campaña_id: int,
+    accion: str,
+    cambios: dict = None,
+    usuario_id: int = None,
+    observaciones: str = None,
+) -> HistorialCampaña:
+    """
+    Agrega a la sesión la entrada de historial del cambio (sin commit; se
+    confirma con la transacción de quien llama)
+    """
+    cambios_json = serializar_cambios(cambios) if cambios is not None else None
+    mensaje_legible = generar_mensaje_historial(
+        accion, cambios_json, cache_nombres.obtener(db, usuario_id)
+    )
+
+    entrada_historial = HistorialCampaña(
+        campaña_id=campaña_id,
+        usuario_id=usuario_id,
+        accion=accion,
+        cambios=cambios_json,
+        observaciones=mensaje_legible or observaciones,
+    )
+    db.add(entrada_historial)
+    return entrada_historial
+
+
+def _codificar_cursor(entrada: HistorialCampaña) -> str:
+    return f"{entrada.fecha.isoformat()}_{entrada.id}"
+
+
+def _decodificar_cursor(cursor: str) -> Tuple[datetime.datetime, int]:
+    try:
+        fecha, id_ = cursor.rsplit("_", 1)
+        return datetime.datetime.fromisoformat(fecha), int(id_)
+    except ValueError:
+        raise ValueError(f"Cursor no válido: {cursor}")
+
+
+def listar_historial_campaña(
+    db: Session,
+    campaña_id: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    accion: Optional[str] = None,
+    usuario_id: Optional[int] = None,
+) -> Tuple[List[HistorialCampaña], Optional[str]]:
+    """
+    Devuelve una página del historial de la campaña, de la entrada más
+    reciente a la más antigua (keyset por fecha, id), filtrada opcionalmente
+    por acción y por usuario.
+
+    cursor es el next_cursor de la página anterior ("<fecha ISO>_<id>").
+
+    Raises:
+        ValueError: si el cursor no tiene el formato esperado
+
+    Returns:
+        (entradas, next_cursor). next_cursor es None cuando no hay más páginas.
+    """
+    consulta = (
+        select(HistorialCampaña)
+        .where(HistorialCampaña.campaña_id == campaña_id)
+        .order_by(HistorialCampaña.fecha.desc(), HistorialCampaña.id.desc())
+        .limit(limit + 1)
+    )
+    if accion is not None:
+        consulta = consulta.where(HistorialCampaña.accion == accion)
+    if usuario_id is not None:
+        consulta = consulta.where(HistorialCampaña.usuario_id == usuario_id)
+    if cursor is not None:
+        fecha_cursor, id_cursor = _decodificar_cursor(cursor)
+        consulta = consulta.where(
+            tuple_(HistorialCampaña.fecha, HistorialCampaña.id)
+            < tuple_(fecha_cursor, id_cursor)
+        )
+
+    entradas = db.execute(consulta).scalars().all()
+    hay_mas = len(entradas) > limit
+    entradas = entradas[:limit]
+    next_cursor = _codificar_cursor(entradas[-1]) if hay_mas and entradas else None
+    return entradas, next_cursor
+
+
+def generar_mensaje_historial(accion: str, cambios: dict, usuario_nombre: str) -> str:
+    """Generar mensaje legible para el historial"""
+    if accion == "producto_agregado":
+        producto_servicio = cambios.get("producto_servicio", "producto")
+        cantidad = cambios.get("cantidad", 1)
+        tipo = cambios.get("tipo", "Producto")
+        proveedor = cambios.get("proveedor", "")
+
+        mensaje_base = f"{usuario_nombre} agregó {tipo.lower()}: {producto_servicio}"
+        if cantidad > 1:
+            mensaje_base += f" (cantidad: {cantidad})"
+        if proveedor:
+            mensaje_base += f" - Proveedor: {proveedor}"
+
+        return mensaje_base
+
+    elif accion == "producto_actualizado":
+        anterior = cambios.get("anterior", {})
+        nuevo = cambios.get("nuevo", {})
+
+        # Obtener el contexto del producto para ser más específico
+        producto_contexto = nuevo.get("producto_servicio") or anterior.get(
+            "producto_servicio", "producto"
+        )
+
+        # Mostrar todos los cambios de manera clara
+        cambios_texto = []
+
+        if anterior.get("producto_servicio") != nuevo.get("producto_servicio"):
+            cambios_texto.append(
+                f"nombre de '{anterior.get('producto_servicio', '')}' a '{nuevo.get('producto_servicio', '')}'"
+            )
+
+        if anterior.get("cantidad") != nuevo.get("cantidad"):
+            cambios_texto.append(
+                f"cantidad de {producto_contexto} de {anterior.get('cantidad', 0)} a {nuevo.get('cantidad', 0)} unidades"
+            )
+
+        if anterior.get("proveedor") != nuevo.get("proveedor"):
+            cambios_texto.append(
+                f"proveedor de {producto_contexto} de '{anterior.get('proveedor', '')}' a '{nuevo.get('proveedor', '')}'"
+            )
+
+        if anterior.get("tipo") != nuevo.get("tipo"):
+            cambios_texto.append(
+                f"tipo de {producto_contexto} de '{anterior.get('tipo', '')}' a '{nuevo.get('tipo', '')}'"
+            )
+
+        if anterior.get("propiedad") != nuevo.get("propiedad"):
+            cambios_texto.append(
+                f"propiedad de {producto_contexto} de '{anterior.get('propiedad', '')}' a '{nuevo.get('propiedad', '')}'"
+            )
+
+        if cambios_texto:
+            return f"{usuario_nombre} modificó {', '.join(cambios_texto)}"
+        else:
+            return f"{usuario_nombre} modificó {producto_contexto}"
+
+    elif accion == "producto_eliminado":
+        producto_servicio = cambios.get("producto_servicio", "producto")
+        cantidad = cambios.get("cantidad", 1)
+        tipo = cambios.get("tipo", "producto")
+
+        mensaje = f"{usuario_nombre} eliminó {tipo.lower()}: {producto_servicio}"
+        if cantidad > 1:
+            mensaje += f" (cantidad: {cantidad})"
+
+        return mensaje
+
+    elif accion == "facturacion_eliminada":
+        unidad = cambios.get("unidad", "unidad")
+        valor = cambios.get("valor", 0)
+
+        mensaje = f"{usuario_nombre} eliminó facturación: {unidad}"
+        if valor > 0:
+            mensaje += f" (valor: ${valor:,.0f})"
+
+        return mensaje
+
+    elif accion == "facturacion_agregada":
+        unidad = cambios.get("unidad", "unidad")
+        cantidad = cambios.get("cantidad", 1)
+        valor = cambios.get("valor", 0)
+        periodicidad = cambios.get("periodicidad", "")
+
+        mensaje = f"{usuario_nombre} agregó facturación: {unidad}"
+        if cantidad > 1:
+            mensaje += f" (cantidad: {cantidad})"
+        if valor > 0:
+            mensaje += f" - Valor: ${valor:,.0f}"
+        if periodicidad:
+            mensaje += f" - Periodicidad: {periodicidad}"
+
+        return mensaje
+
+    elif accion == "facturacion_actualizada":
+        anterior = cambios.get("anterior", {})
+        nuevo = cambios.get("nuevo", {})
+
+        # Obtener el contexto del producto/servicio para ser más específicos
+        unidad_contexto = nuevo.get("unidad") or anterior.get("unidad", "unidad")
+
+        # Mostrar todos los cambios de manera clara
+        cambios_texto = []
+
+        if anterior.get("unidad") != nuevo.get("unidad"):
+            cambios_texto.append(
+                f"unidad de facturación de '{anterior.get('unidad', '')}' a '{nuevo.get('unidad', '')}'"
+            )
+
+        if anterior.get("cantidad") != nuevo.get("cantidad"):
+            cambios_texto.append(
+                f"cantidad de {unidad_contexto} de {anterior.get('cantidad', 0)} a {nuevo.get('cantidad', 0)} unidades"
+            )
+
+        if anterior.get("valor") != nuevo.get("valor"):
+            cambios_texto.append(
+                f"valor de {unidad_contexto} de ${anterior.get('valor', 0):,.0f} a ${nuevo.get('valor', 0):,.0f}"
+            )
+
+        if anterior.get("periodicidad") != nuevo.get("periodicidad"):
+            cambios_texto.append(
+                f"periodicidad de {unidad_contexto} de '{anterior.get('periodicidad', '')}' a '{nuevo.get('periodicidad', '')}'"
+            )
+
+        if cambios_texto:
+            return f"{usuario_nombre} modificó {', '.join(cambios_texto)}"
+        else:
+            return f"{usuario_nombre} modificó facturación de {unidad_contexto}"
+
+    elif accion == "actualizada":
+        # Manejar actualizaciones de campaña con mensajes específicos
+        if not cambios:
+            return f"{usuario_nombre} actualizó la campaña"
+
+        cambios_texto = []
+        for campo, valores in cambios.items():
+            if (
+                isinstance(valores, dict)
+                and "anterior" in valores
+                and "nuevo" in valores
+            ):
+                anterior = valores["anterior"]
+                nuevo = valores["nuevo"]
+
+                # Traducir nombres de campos al español y manejar casos especiales
+                if campo == "nombre":
+                    cambios_texto.append(f"nombre de '{anterior}' a '{nuevo}'")
+                elif campo == "tipo":
+                    cambios_texto.append(f"tipo de campaña de '{anterior}' a '{nuevo}'")
+                elif campo == "ejecutivo":
+                    cambios_texto.append(f"ejecutivo de '{anterior}' a '{nuevo}'")
+                elif campo == "lider_de_campaña":
+                    cambios_texto.append(
+                        f"líder de campaña de '{anterior}' a '{nuevo}'"
+                    )
+                elif campo == "estado":
+                    cambios_texto.append(f"estado de '{anterior}' a '{nuevo}'")
+                elif campo == "fecha_de_produccion":
+                    anterior_fecha = anterior if anterior else "sin fecha"
+                    nuevo_fecha = nuevo if nuevo else "sin fecha"
+                    cambios_texto.append(
+                        f"fecha de producción de '{anterior_fecha}' a '{nuevo_fecha}'"
+                    )
+                elif campo == "cliente_corporativo_id":
+                    # Aquí podrías obtener el nombre del cliente en lugar del ID
+                    cambios_texto.append(
+                        f"cliente corporativo (ID: {anterior} → {nuevo})"
+                    )
+                elif campo == "contacto_id":
+                    # Aquí podrías obtener el nombre del contacto en lugar del ID
+                    cambios_texto.append(f"contacto (ID: {anterior} → {nuevo})")
+                elif campo == "presupuesto":
+                    anterior_presup = (
+                        f"${anterior:,.0f}" if anterior else "sin presupuesto"
+                    )
+                    nuevo_presup = f"${nuevo:,.0f}" if nuevo else "sin presupuesto"
+                    cambios_texto.append(
+                        f"presupuesto de {anterior_presup} a {nuevo_presup}"
+                    )
+                elif campo == "observaciones":
+                    anterior_obs = (
+                        anterior[:50] + "..."
+                        if anterior and len(anterior) > 50
+                        else anterior or "sin observaciones"
+                    )
+                    nuevo_obs = (
+                        nuevo[:50] + "..."
+                        if nuevo and len(nuevo) > 50
+                        else nuevo or "sin observaciones"
+                    )
+                    cambios_texto.append(
+                        f"observaciones de '{anterior_obs}' a '{nuevo_obs}'"
+                    )
+                else:
+                    # Para campos no específicos, usar nombre genérico
+                    campo_esp = campo.replace("_", " ")
+                    cambios_texto.append(f"{campo_esp} de '{anterior}' a '{nuevo}'")
+
+        if cambios_texto:
+            if len(cambios_texto) == 1:
+                return f"{usuario_nombre} actualizó {cambios_texto[0]} de la campaña"
+            else:
+                return f"{usuario_nombre} actualizó: {', '.join(cambios_texto)}"
+        else:
+            return f"{usuario_nombre} actualizó la campaña"
+
+    else:
+        return f"{usuario_nombre} realizó acción {accion}"
@@ -0,0 +1,460 @@
+"""
+Historial versionado de implementaciones.
+
+Cada escritura guarda una versión con solo los cambios a nivel de campo
+(sección, campo, atributo, anterior -> nuevo), el usuario y la fecha (UTC).
+El número de versión es el de la columna version de la implementación (su
+ETag) después de la escritura; las escrituras sin cambios no se registran.
+Cada vez que la versión pasa un múltiplo de SNAPSHOT_CADA se guarda además el
+documento completo, de modo que reconstruir una versión pasada lee un
+snapshot y como mucho SNAPSHOT_CADA versiones, sin recorrer todo el historial.
+
+Las implementaciones creadas antes del historial empiezan con una versión
+"inicial" (con snapshot del estado previo) la primera vez que se modifican.
+Ninguna función hace commit: las filas se agregan a la transacción de quien
+escribe la implementación.
+"""
+import copy
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from app.models.usuario import Usuario
+from crud.implementaciones import (
+    ATRIBUTOS,
+    CAMPOS_BASICOS,
+    CODECS,
+    SECCIONES,
+    cargar_secciones,
+)
+from models.project_implementacion_historial import ProjectImplementacionHistorial
+from models.project_implementacion_snapshot import ProjectImplementacionSnapshot
+
+SNAPSHOT_CADA = 20
+
+ACCION_INICIAL = "inicial"
+ACCION_CREADA = "creada"
+ACCION_ACTUALIZADA = "actualizada"
+
+
+def _texto(valor) -> str:
+    return "" if valor is None else str(valor)
+
+
+def documento_versionado(documento: Dict[str, Any]) -> Dict[str, Any]:
+    """Parte del documento que se versiona: campos básicos y las cuatro secciones"""
+    versionado = {campo: documento.get(campo) for campo in CAMPOS_BASICOS}
+    for seccion in SECCIONES:
+        versionado[seccion] = copy.deepcopy(documento.get(seccion) or {})
+    return versionado
+
+
+def documento_creado(datos: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Documento tal como queda guardado al crear una implementación con `datos`
+    (el mismo que devolvería obtener_implementacion_documento), sin releerlo.
+    """
+    documento = {campo: datos.get(campo) for campo in CAMPOS_BASICOS}
+    for seccion in SECCIONES:
+        codec = CODECS[seccion]
+        fila = dict.fromkeys(codec.columnas)
+        fila.update(codec.codificar(datos.get(seccion)))
+        seccion_doc = {
+            campo: {atributo: _texto(valor) for atributo, valor in valores.items()}
+            for campo, valores in codec.decodificar_dict(fila).items()
+        }
+        for nombre, valor in (datos.get(seccion) or {}).items():
+            if nombre not in codec.predefinidos and isinstance(valor, dict):
+                seccion_doc[nombre] = {
+                    atributo: _texto(valor.get(atributo)) for atributo in ATRIBUTOS
+                }
+        documento[seccion] = seccion_doc
+    return documento
+
+
+def _cambio(seccion, campo, atributo, anterior, nuevo) -> Dict[str, Any]:
+    return {
+        "seccion": seccion,
+        "campo": campo,
+        "atributo": atributo,
+        "anterior": anterior,
+        "nuevo": nuevo,
+    }
+
+
+def calcular_cambios(antes: Dict[str, Any], despues: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Diferencias a nivel de campo entre dos documentos.
+
+    Los campos básicos tienen seccion None. Un campo que aparece o desaparece
+    de una sección (subsección agregada o eliminada) se registra con atributo
+    None y el objeto completo como valor anterior o nuevo.
+    """
+    cambios = []
+    for campo in CAMPOS_BASICOS:
+        if antes.get(campo) != despues.get(campo):
+            cambios.append(_cambio(None, campo, None, antes.get(campo), despues.get(campo)))
+
+    for seccion in SECCIONES:
+        datos_antes = antes.get(seccion) or {}
+        datos_despues = despues.get(seccion) or {}
+        for campo, valor_antes in datos_antes.items():
+            valor_despues = datos_despues.get(campo)
+            if valor_despues is None:
+                cambios.append(_cambio(seccion, campo, None, valor_antes, None))
+                continue
+            for atributo in ATRIBUTOS:
+                anterior = valor_antes.get(atributo, "")
+                nuevo = valor_despues.get(atributo, "")
+                if anterior != nuevo:
+                    cambios.append(_cambio(seccion, campo, atributo, anterior, nuevo))
+        for campo, valor_despues in datos_despues.items():
+            if campo not in datos_antes:
+                cambios.append(_cambio(seccion, campo, None, None, valor_despues))
+    return cambios
+
+
+def aplicar_cambios(documento: Dict[str, Any], cambios: Iterable[Dict[str, Any]]):
+    """Aplica (hacia adelante) los cambios de una versión sobre el documento, en el lugar"""
+    for cambio in cambios:
+        seccion, campo, atributo = cambio["seccion"], cambio["campo"], cambio["atributo"]
+        if seccion is None:
+            documento[campo] = cambio["nuevo"]
+        elif atributo is None:
+            if cambio["nuevo"] is None:
+                documento[seccion].pop(campo, None)
+            else:
+                documento[seccion][campo] = copy.deepcopy(cambio["nuevo"])
+        else:
+            documento[seccion].setdefault(campo, {})[atributo] = cambio["nuevo"]
+
+
+def registrar_version(
+    db: Session,
+    implementacion_id: int,
+    antes: Dict[str, Any],
+    despues: Dict[str, Any],
+    version: int,
+    usuario_id: Optional[int] = None,
+) -> bool:
+    """
+    Registra la versión resultante de una escritura. Quien llama debe haber
+    reservado la versión (reservar_version, que bloquea la fila) antes de
+    leer `antes`.
+
+    Args:
+        antes: Documento antes de la escritura
+        despues: Documento después de la escritura (ya enviada con flush)
+        version: Versión reservada para esta escritura
+
+    Returns:
+        False si la escritura no cambió nada (no se registra)
+    """
+    antes = documento_versionado(antes)
+    despues = documento_versionado(despues)
+    cambios = calcular_cambios(antes, despues)
+    if not cambios:
+        return False
+
+    ultima = (
+        db.query(func.max(ProjectImplementacionHistorial.version))
+        .filter_by(cliente_implementacion_id=implementacion_id)
+        .scalar()
+    )
+    ahora = datetime.utcnow()
+    if ultima is None:
+        # Primera modificación de una implementación anterior al historial
+        ultima = version - 1
+        db.add(
+            ProjectImplementacionHistorial(
+                cliente_implementacion_id=implementacion_id,
+                version=ultima,
+                accion=ACCION_INICIAL,
+                fecha=ahora,
+                cambios=[],
+            )
+        )
+        db.add(
+            ProjectImplementacionSnapshot(
+                cliente_implementacion_id=implementacion_id, version=ultima, documento=antes
+            )
+        )
+
+    db.add(
+        ProjectImplementacionHistorial(
+            cliente_implementacion_id=implementacion_id,
+            version=version,
+            accion=ACCION_ACTUALIZADA,
+            usuario_id=usuario_id,
+            fecha=ahora,
+            cambios=cambios,
+        )
+    )
+    if version // SNAPSHOT_CADA > ultima // SNAPSHOT_CADA:
+        db.add(
+            ProjectImplementacionSnapshot(
+                cliente_implementacion_id=implementacion_id, version=version, documento=despues
+            )
+        )
+    return True
+
+
+def registrar_creaciones(
+    db: Session,
+    ids: List[int],
+    datos: List[Dict[str, Any]],
+    usuario_id: Optional[int] = None,
+):
+    """
+    Registra la versión 1 ("creada", con snapshot) de implementaciones recién
+    creadas con crear_implementaciones: un INSERT multi-fila por tabla.
+    """
+    if not ids:
+        return
+    ahora = datetime.utcnow()
+    db.execute(
+        insert(ProjectImplementacionHistorial),
+        [
+            {
+                "cliente_implementacion_id": id_,
+                "version": 1,
+                "accion": ACCION_CREADA,
+                "usuario_id": usuario_id,
+                "fecha": ahora,
+                "cambios": [],
+            }
+            for id_ in ids
+        ],
+    )
+    db.execute(
+        insert(ProjectImplementacionSnapshot),
+        [
+            {"cliente_implementacion_id": id_, "version": 1, "documento": documento_creado(d)}
+            for id_, d in zip(ids, datos)
+        ],
+    )
+
+
+def registrar_versiones_lote(
+    db: Session,
+    filas: List[Any],
+    campos: Iterable[str],
+    usuario_id: Optional[int] = None,
+):
+    """
+    Registra la versión de cada implementación actualizada con
+    actualizar_basicos_lote (filas con los valores nuevos, <campo>_anterior
+    y la versión ya incrementada) con un INSERT multi-fila por tabla. Solo se
+    leen las secciones de las implementaciones que necesitan snapshot.
+    """
+    if not filas:
+        return
+    campos = tuple(campos)
+    ultimas = dict(
+        db.query(
+            ProjectImplementacionHistorial.cliente_implementacion_id,
+            func.max(ProjectImplementacionHistorial.version),
+        )
+        .filter(
+            ProjectImplementacionHistorial.cliente_implementacion_id.in_(
+                [fila.id for fila in filas]
+            )
+        )
+        .group_by(ProjectImplementacionHistorial.cliente_implementacion_id)
+    )
+    sin_historial = [fila for fila in filas if fila.id not in ultimas]
+    con_snapshot = [
+        fila
+        for fila in filas
+        if fila.version // SNAPSHOT_CADA
+        > ultimas.get(fila.id, fila.version - 1) // SNAPSHOT_CADA
+    ]
+    secciones = cargar_secciones(
+        db, list({fila.id for fila in sin_historial + con_snapshot})
+    )
+
+    def documento(fila, anterior: bool) -> Dict[str, Any]:
+        datos = {campo: getattr(fila, campo) for campo in CAMPOS_BASICOS}
+        if anterior:
+            datos.update({campo: getattr(fila, f"{campo}_anterior") for campo in campos})
+        datos.update(secciones[fila.id])
+        return documento_versionado(datos)
+
+    ahora = datetime.utcnow()
+    versiones = [
+        {
+            "cliente_implementacion_id": fila.id,
+            "version": fila.version - 1,
+            "accion": ACCION_INICIAL,
+            "usuario_id": None,
+            "fecha": ahora,
+            "cambios": [],
+        }
+        for fila in sin_historial
+    ]
+    versiones += [
+        {
+            "cliente_implementacion_id": fila.id,
+            "version": fila.version,
+            "accion": ACCION_ACTUALIZADA,
+            "usuario_id": usuario_id,
+            "fecha": ahora,
+            "cambios": [
+                _cambio(None, campo, None, getattr(fila, f"{campo}_anterior"), getattr(fila, campo))
+                for campo in campos
+                if getattr(fila, f"{campo}_anterior") != getattr(fila, campo)
+            ],
+        }
+        for fila in filas
+    ]
+    snapshots = [
+        {
+            "cliente_implementacion_id": fila.id,
+            "version": fila.version - 1,
+            "documento": documento(fila, anterior=True),
+        }
+        for fila in sin_historial
+    ]
+    snapshots += [
+        {
+            "cliente_implementacion_id": fila.id,
+            "version": fila.version,
+            "documento": documento(fila, anterior=False),
+        }
+        for fila in con_snapshot
+    ]
+    db.execute(insert(ProjectImplementacionHistorial), versiones)
+    if snapshots:
+        db.execute(insert(ProjectImplementacionSnapshot), snapshots)
+
+
+def registrar_cambio_basico(
+    db: Session,
+    implementacion: Any,
+    campo: str,
+    anterior: Any,
+    version: int,
+    usuario_id: Optional[int] = None,
+):
+    """
+    Registra la versión de una escritura que solo cambió un campo básico
+    (estado o comentario de producción) con ese único cambio. Las secciones
+    solo se leen si la versión necesita snapshot.
+    """
+    fila = SimpleNamespace(
+        id=implementacion.id,
+        version=version,
+        **{campo_basico: getattr(implementacion, campo_basico) for campo_basico in CAMPOS_BASICOS},
+        **{f"{campo}_anterior": anterior},
+    )
+    registrar_versiones_lote(db, [fila], [campo], usuario_id)
+
+
+def _nombres_usuarios(db: Session, ids: Iterable[Optional[int]]) -> Dict[int, str]:
+    ids = {id_ for id_ in ids if id_ is not None}
+    if not ids:
+        return {}
+    return {
+        usuario.id: f"{usuario.nombre} {usuario.apellido}".strip()
+        if usuario.nombre != usuario.apellido
+        else usuario.nombre
+        for usuario in db.query(Usuario.id, Usuario.nombre, Usuario.apellido).filter(
+            Usuario.id.in_(ids)
+        )
+    }
+
+
+def listar_historial(
+    db: Session, implementacion_id: int, limit: int, cursor: Optional[int] = None
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """
+    Página del historial, de la versión más reciente a la más antigua
+    (paginación keyset por versión).
+
+    Returns:
+        (items, next_cursor). next_cursor es None cuando no hay más páginas.
+    """
+    consulta = db.query(ProjectImplementacionHistorial).filter_by(
+        cliente_implementacion_id=implementacion_id
+    )
+    if cursor is not None:
+        consulta = consulta.filter(ProjectImplementacionHistorial.version < cursor)
+    filas = (
+        consulta.order_by(ProjectImplementacionHistorial.version.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    hay_mas = len(filas) > limit
+    filas = filas[:limit]
+    nombres = _nombres_usuarios(db, (fila.usuario_id for fila in filas))
+
+    items = [
+        {
+            "version": fila.version,
+            "accion": fila.accion,
+            "usuario_id": fila.usuario_id,
+            "usuario": nombres.get(fila.usuario_id),
+            "fecha": fila.fecha,
+            "cambios": fila.cambios,
+        }
+        for fila in filas
+    ]
+    next_cursor = filas[-1].version if hay_mas and filas else None
+    return items, next_cursor
+
+
+def reconstruir_version(
+    db: Session,
+    implementacion_id: int,
+    fecha: Optional[datetime] = None,
+    version: Optional[int] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Reconstruye la implementación tal como estaba en una fecha (UTC) o en una
+    versión: parte del snapshot más cercano anterior y aplica solo las
+    versiones posteriores a él (3 consultas).
+
+    Returns:
+        {"version", "fecha", "documento"} o None si no hay historial para esa
+        fecha/versión
+    """
+    consulta = db.query(
+        ProjectImplementacionHistorial.version, ProjectImplementacionHistorial.fecha
+    ).filter_by(cliente_implementacion_id=implementacion_id)
+    if version is not None:
+        consulta = consulta.filter(ProjectImplementacionHistorial.version <= version)
+    if fecha is not None:
+        consulta = consulta.filter(ProjectImplementacionHistorial.fecha <= fecha)
+    objetivo = consulta.order_by(ProjectImplementacionHistorial.version.desc()).first()
+    if objetivo is None:
+        return None
+
+    snapshot = (
+        db.query(ProjectImplementacionSnapshot)
+        .filter(
+            ProjectImplementacionSnapshot.cliente_implementacion_id == implementacion_id,
+            ProjectImplementacionSnapshot.version <= objetivo.version,
+        )
+        .order_by(ProjectImplementacionSnapshot.version.desc())
+        .first()
+    )
+    if snapshot is None:
+        return None
+
+    documento = copy.deepcopy(snapshot.documento)
+    posteriores = (
+        db.query(ProjectImplementacionHistorial.cambios)
+        .filter(
+            ProjectImplementacionHistorial.cliente_implementacion_id == implementacion_id,
+            ProjectImplementacionHistorial.version > snapshot.version,
+            ProjectImplementacionHistorial.version <= objetivo.version,
+        )
+        .order_by(ProjectImplementacionHistorial.version)
+    )
+    for (cambios,) in posteriores:
+        aplicar_cambios(documento, cambios)
+
+    return {"version": objetivo.version, "fecha": objetivo.fecha, "documento": documento}
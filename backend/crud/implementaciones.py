@@ -0,0 +1,1249 @@
+import io
+from sqlalchemy import func, insert, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from operator import attrgetter, itemgetter
+from typing import Collection, Dict, Any, Iterable, List, NamedTuple, Optional, Tuple
+from models.project_implementaciones_clienteimple import (
+    ProjectImplementacionesClienteImple,
+)
+from models.project_implementacion_contractual import ProjectImplementacionContractual
+from models.project_implementacion_progreso import ProjectImplementacionProgreso
+from models.project_implementacion_talentoHumano import (
+    ProjectImplementacionTalentoHumano,
+)
+from models.project_implementacion_procesos import ProjectImplementacionProcesos
+from models.project_implementacion_tecnologia import ProjectImplementacionTecnologia
+from models.project_implementacion_subseccion_personalizada import (
+    ProjectImplementacionSubseccionPersonalizada,
+)
+from models.project_subseccion_implementacion_talentoHumano import (
+    ProjectSubseccionImplementacionTalentoHumano,
+)
+from models.project_subseccion_implementacion_procesos import (
+    ProjectSubseccionImplementacionProcesos,
+)
+from models.project_subseccion_implementacion_tecnologia import (
+    ProjectSubseccionImplementacionTecnologia,
+)
+
+# Atributos que tiene cada campo de una sección (columnas <campo>_<atributo>)
+ATRIBUTOS = ("seguimiento", "estado", "responsable", "notas")
+
+# Tabla principal de cada sección
+MODELOS_SECCION = {
+    "contractual": ProjectImplementacionContractual,
+    "talento_humano": ProjectImplementacionTalentoHumano,
+    "procesos": ProjectImplementacionProcesos,
+    "tecnologia": ProjectImplementacionTecnologia,
+}
+
+# Tabla de subsecciones personalizadas de cada sección.
+# Contractual usa la tabla universal filtrando por la columna "seccion".
+MODELOS_SUBSECCION = {
+    "contractual": ProjectImplementacionSubseccionPersonalizada,
+    "talento_humano": ProjectSubseccionImplementacionTalentoHumano,
+    "procesos": ProjectSubseccionImplementacionProcesos,
+    "tecnologia": ProjectSubseccionImplementacionTecnologia,
+}
+
+SECCIONES = tuple(MODELOS_SECCION.keys())
+
+class CampoSeccion(NamedTuple):
+    """
+    Campo predefinido de una sección. Se guarda en la tabla de la sección en
+    las columnas <campo_en_snake_case>_<atributo>; `columnas` se completa al
+    importar el módulo en el orden de ATRIBUTOS.
+
+    Los campos `legado` tienen columnas pero el frontend los envía como
+    subsecciones personalizadas: se leen de la tabla y nunca se escriben.
+    """
+
+    campo: str
+    etiqueta: str
+    legado: bool = False
+    columnas: Tuple[str, ...] = ()
+
+
+# Registro declarativo de los campos de cada sección (clave del payload y nombre legible)
+REGISTRO_CAMPOS = {
+    "contractual": (
+        CampoSeccion("modeloContrato", "Modelo Contrato"),
+        CampoSeccion("modeloConfidencialidad", "Modelo Confidencialidad"),
+        CampoSeccion("alcance", "Alcance"),
+        CampoSeccion("fechaInicio", "Fecha Inicio"),
+    ),
+    "talento_humano": (
+        CampoSeccion("perfilPersonal", "Perfil Personal"),
+        CampoSeccion("cantidadAsesores", "Cantidad Asesores"),
+        CampoSeccion("horarios", "Horarios"),
+        CampoSeccion("formador", "Formador"),
+        CampoSeccion("capacitacionesAndes", "Capacitaciones Andes"),
+        CampoSeccion("capacitacionesCliente", "Capacitaciones Cliente"),
+    ),
+    "procesos": (
+        CampoSeccion("responsableCliente", "Responsable Cliente"),
+        CampoSeccion("responsableAndes", "Responsable Andes"),
+        CampoSeccion("responsablesOperacion", "Responsables Operación"),
+        CampoSeccion("listadoReportes", "Listado Reportes"),
+        CampoSeccion("protocoloComunicaciones", "Protocolo Comunicaciones"),
+        CampoSeccion("informacionDiaria", "Información Diaria"),
+        CampoSeccion("seguimientoPeriodico", "Seguimiento Periódico"),
+        CampoSeccion("guionesProtocolos", "Guiones Protocolos"),
+        CampoSeccion("procesoMonitoreo", "Proceso Monitoreo"),
+        CampoSeccion("cronogramaTecnologia", "Cronograma Tecnología", legado=True),
+        CampoSeccion("cronogramaCapacitaciones", "Cronograma Capacitaciones", legado=True),
+        CampoSeccion("realizacionPruebas", "Realización Pruebas", legado=True),
+    ),
+    "tecnologia": (
+        CampoSeccion("creacionModulo", "Creación Módulo"),
+        CampoSeccion("tipificacionInteracciones", "Tipificación Interacciones"),
+        CampoSeccion("aplicativosProceso", "Aplicativos Proceso"),
+        CampoSeccion("whatsapp", "WhatsApp"),
+        CampoSeccion("correosElectronicos", "Correos Electrónicos"),
+        CampoSeccion("requisitosGrabacion", "Requisitos Grabación"),
+    ),
+}
+
+
+def _snake_case(nombre: str) -> str:
+    return "".join(f"_{letra.lower()}" if letra.isupper() else letra for letra in nombre)
+
+
+def _completar_registro():
+    """
+    Calcula las columnas de cada campo y verifica contra los modelos que el
+    registro cubre exactamente las columnas <campo>_<atributo> de cada tabla.
+    """
+    for seccion, campos in REGISTRO_CAMPOS.items():
+        columnas_modelo = {
+            columna.key
+            for columna in MODELOS_SECCION[seccion].__table__.columns
+            if columna.key.endswith(tuple(f"_{atributo}" for atributo in ATRIBUTOS))
+        }
+        completos = []
+        for campo in campos:
+            columnas = tuple(
+                f"{_snake_case(campo.campo)}_{atributo}" for atributo in ATRIBUTOS
+            )
+            faltantes = set(columnas) - columnas_modelo
+            if faltantes:
+                raise RuntimeError(
+                    f"{seccion}.{campo.campo}: columnas inexistentes {sorted(faltantes)}"
+                )
+            columnas_modelo -= set(columnas)
+            completos.append(campo._replace(columnas=columnas))
+        if columnas_modelo:
+            raise RuntimeError(
+                f"Columnas de {seccion} sin campo en el registro: {sorted(columnas_modelo)}"
+            )
+        REGISTRO_CAMPOS[seccion] = tuple(completos)
+
+
+_completar_registro()
+
+# Campos predefinidos para cada sección (no son personalizados)
+CAMPOS_PREDEFINIDOS = {
+    seccion: [campo.campo for campo in campos if not campo.legado]
+    for seccion, campos in REGISTRO_CAMPOS.items()
+}
+
+# sección -> {(campo, atributo): columna}
+COLUMNA_POR_CAMPO = {
+    seccion: {
+        (campo.campo, atributo): columna
+        for campo in campos
+        for atributo, columna in zip(ATRIBUTOS, campo.columnas)
+    }
+    for seccion, campos in REGISTRO_CAMPOS.items()
+}
+
+
+class CodecSeccion:
+    """
+    Conversión entre el formato del frontend {campo: {seguimiento, estado,
+    responsable, notas}} y las columnas de la tabla de una sección. Las tablas
+    de (campo, columnas) y los getters se arman una vez al importar, de modo
+    que cada conversión es una copia dirigida por tabla.
+    """
+
+    def __init__(self, seccion: str):
+        campos = REGISTRO_CAMPOS[seccion]
+        self.seccion = seccion
+        self.predefinidos = frozenset(CAMPOS_PREDEFINIDOS[seccion])
+        self.columnas = tuple(
+            columna for campo in campos for columna in campo.columnas
+        )
+        # Solo los campos no legados se escriben
+        self._escritura = tuple(
+            (campo.campo, tuple(zip(ATRIBUTOS, campo.columnas)))
+            for campo in campos
+            if not campo.legado
+        )
+        self._lectura = tuple(
+            (campo.campo, slice(posicion * len(ATRIBUTOS), (posicion + 1) * len(ATRIBUTOS)))
+            for posicion, campo in enumerate(campos)
+        )
+        self._leer_registro = attrgetter(*self.columnas)
+        self._leer_dict = itemgetter(*self.columnas)
+
+    def codificar(
+        self, datos: Optional[Dict[str, Any]], parcial: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Convierte el payload de la sección en {columna: valor}.
+
+        Args:
+            datos: Datos de la sección (las subsecciones personalizadas se ignoran)
+            parcial: Si es True solo se incluyen los campos presentes en `datos`
+                (PUT); si no, los ausentes quedan vacíos (creación)
+        """
+        datos = datos or {}
+        fila = {}
+        for campo, pares in self._escritura:
+            valor = datos.get(campo)
+            if not isinstance(valor, dict):
+                if parcial:
+                    continue
+                valor = {}
+            for atributo, columna in pares:
+                fila[columna] = valor.get(atributo, "")
+        return fila
+
+    def valores(self, registro) -> Tuple[Any, ...]:
+        """Valores de todas las columnas del registro en el orden de `columnas`"""
+        return self._leer_registro(registro)
+
+    def _decodificar_valores(self, valores) -> Dict[str, Dict[str, str]]:
+        return {
+            campo: dict(zip(ATRIBUTOS, (valor or "" for valor in valores[rango])))
+            for campo, rango in self._lectura
+        }
+
+    def decodificar(self, registro) -> Dict[str, Dict[str, str]]:
+        """Registro ORM de la sección -> {campo: {atributo: valor}}"""
+        if registro is None:
+            return {}
+        return self._decodificar_valores(self._leer_registro(registro))
+
+    def decodificar_dict(self, datos: Optional[Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
+        """Igual que decodificar a partir de la fila convertida en dict (JSON)"""
+        if not datos:
+            return {}
+        return self._decodificar_valores(self._leer_dict(datos))
+
+
+CODECS = {seccion: CodecSeccion(seccion) for seccion in SECCIONES}
+
+
+def serializar_seccion(seccion: str, registro) -> Dict[str, Any]:
+    """
+    Convierte un registro de la tabla de una sección al formato del frontend
+    {campo: {seguimiento, estado, responsable, notas}}.
+    """
+    return CODECS[seccion].decodificar(registro)
+
+
+def serializar_seccion_dict(seccion: str, datos: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Igual que serializar_seccion pero a partir de la fila ya convertida en dict (JSON)."""
+    return CODECS[seccion].decodificar_dict(datos)
+
+
+def serializar_subseccion(subseccion) -> Dict[str, str]:
+    return {
+        "seguimiento": subseccion.seguimiento or "",
+        "estado": subseccion.estado or "",
+        "responsable": subseccion.responsable or "",
+        "notas": subseccion.notas or "",
+    }
+
+
+def parsear_secciones(secciones: Optional[str]) -> Tuple[str, ...]:
+    """
+    Convierte el parámetro "sections" (separado por comas) en una tupla de secciones.
+    Sin valor se devuelven las cuatro secciones y con "none" ninguna.
+
+    Raises:
+        ValueError: si alguna sección no existe
+    """
+    if not secciones:
+        return SECCIONES
+    if secciones.strip().lower() == "none":
+        return ()
+    solicitadas = tuple(s.strip() for s in secciones.split(",") if s.strip())
+    desconocidas = [s for s in solicitadas if s not in MODELOS_SECCION]
+    if desconocidas:
+        raise ValueError(
+            f"Secciones no válidas: {', '.join(desconocidas)}. "
+            f"Valores permitidos: {', '.join(SECCIONES)}"
+        )
+    return solicitadas
+
+
+def cargar_secciones(
+    db: Session, ids: List[int], secciones: Iterable[str] = SECCIONES
+) -> Dict[int, Dict[str, Dict[str, Any]]]:
+    """
+    Carga las secciones y subsecciones de varias implementaciones con una
+    consulta IN por tabla (2 consultas por sección), en lugar de 8 por implementación.
+
+    Args:
+        db: Sesión de base de datos
+        ids: IDs de las implementaciones
+        secciones: Secciones a cargar
+
+    Returns:
+        Diccionario {implementacion_id: {seccion: {campo: {...}}}}
+    """
+    resultado = {id_: {} for id_ in ids}
+    if not ids:
+        return resultado
+
+    for seccion in secciones:
+        for datos in resultado.values():
+            datos[seccion] = {}
+
+        modelo = MODELOS_SECCION[seccion]
+        registros = (
+            db.query(modelo)
+            .filter(modelo.cliente_implementacion_id.in_(ids))
+            .order_by(modelo.id)
+            .all()
+        )
+        vistos = set()
+        for registro in registros:
+            # Igual que .first(): si hubiera más de un registro se usa el primero
+            if registro.cliente_implementacion_id in vistos:
+                continue
+            vistos.add(registro.cliente_implementacion_id)
+            resultado[registro.cliente_implementacion_id][seccion] = (
+                serializar_seccion(seccion, registro)
+            )
+
+        modelo_sub = MODELOS_SUBSECCION[seccion]
+        consulta = db.query(modelo_sub).filter(
+            modelo_sub.cliente_implementacion_id.in_(ids)
+        )
+        if modelo_sub is ProjectImplementacionSubseccionPersonalizada:
+            consulta = consulta.filter(modelo_sub.seccion == seccion)
+        for subseccion in consulta.order_by(modelo_sub.id).all():
+            resultado[subseccion.cliente_implementacion_id][seccion][
+                subseccion.nombre_subsesion
+            ] = serializar_subseccion(subseccion)
+
+    return resultado
+
+
+def listar_implementaciones_pagina(
+    db: Session,
+    limit: int,
+    cursor: Optional[int] = None,
+    secciones: Iterable[str] = SECCIONES,
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """
+    Devuelve una página de implementaciones (paginación keyset por id) con sus
+    secciones ya hidratadas.
+
+    Returns:
+        (items, next_cursor). next_cursor es None cuando no hay más páginas.
+    """
+    consulta = db.query(ProjectImplementacionesClienteImple)
+    if cursor is not None:
+        consulta = consulta.filter(ProjectImplementacionesClienteImple.id > cursor)
+    filas = (
+        consulta.order_by(ProjectImplementacionesClienteImple.id)
+        .limit(limit + 1)
+        .all()
+    )
+
+    hay_mas = len(filas) > limit
+    filas = filas[:limit]
+    secciones = tuple(secciones)
+    ids = [imp.id for imp in filas]
+    datos = cargar_secciones(db, ids, secciones)
+    progreso = obtener_progreso(db, ids)
+
+    items = []
+    for imp in filas:
+        item = {
+            "id": imp.id,
+            "cliente": imp.cliente,
+            "proceso": imp.proceso,
+            "estado": imp.estado,
+            "comentario_produccion": imp.comentario_produccion,
+            "version": imp.version,
+            "progreso": progreso[imp.id],
+        }
+        for seccion in SECCIONES:
+            item[seccion] = datos[imp.id].get(seccion)
+        items.append(item)
+
+    next_cursor = filas[-1].id if hay_mas and filas else None
+    return items, next_cursor
+
+
+def _construir_sql_detalle() -> str:
+    """
+    Construye la consulta de detalle: la fila principal más cada sección como
+    row_to_json y cada grupo de subsecciones como json_agg, todo en un solo SELECT.
+    """
+    columnas = [
+        "i.id",
+        "i.cliente",
+        "i.proceso",
+        "i.estado",
+        "i.comentario_produccion",
+        "i.version",
+    ]
+    for seccion in SECCIONES:
+        tabla = MODELOS_SECCION[seccion].__tablename__
+        columnas.append(
+            f'(SELECT row_to_json(s) FROM "{tabla}" s '
+            f"WHERE s.cliente_implementacion_id = i.id "
+            f'ORDER BY s.id LIMIT 1) AS "{seccion}"'
+        )
+
+        modelo_sub = MODELOS_SUBSECCION[seccion]
+        filtro = ""
+        if modelo_sub is ProjectImplementacionSubseccionPersonalizada:
+            filtro = f" AND ss.seccion = '{seccion}'"
+        campos = ", ".join(f"'{a}', ss.{a}" for a in ATRIBUTOS)
+        columnas.append(
+            f"(SELECT json_agg(json_build_object('nombre', ss.nombre_subsesion, {campos}) "
+            f'ORDER BY ss.id) FROM "{modelo_sub.__tablename__}" ss '
+            f"WHERE ss.cliente_implementacion_id = i.id{filtro}) "
+            f'AS "subsecciones_{seccion}"'
+        )
+
+    return (
+        "SELECT "
+        + ",\n       ".join(columnas)
+        + f'\nFROM "{ProjectImplementacionesClienteImple.__tablename__}" i'
+        + "\nWHERE i.id = :id"
+    )
+
+
+# Consulta precompilada al importar el módulo
+SQL_DETALLE = text(_construir_sql_detalle())
+
+
+def obtener_implementacion_documento(
+    db: Session, implementacion_id: int
+) -> Optional[Dict[str, Any]]:
+    """
+    Obtiene una implementación con sus cuatro secciones y subsecciones.
+
+    En PostgreSQL se resuelve en un único round trip (SQL_DETALLE). Con otros
+    motores se usa la carga por lotes de cargar_secciones.
+
+    Returns:
+        Diccionario con el formato de ImplementacionOut o None si no existe
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        imp = (
+            db.query(ProjectImplementacionesClienteImple)
+            .filter_by(id=implementacion_id)
+            .first()
+        )
+        if not imp:
+            return None
+        documento = {
+            "id": imp.id,
+            "cliente": imp.cliente,
+            "proceso": imp.proceso,
+            "estado": imp.estado,
+            "comentario_produccion": imp.comentario_produccion,
+            "version": imp.version,
+        }
+        documento.update(cargar_secciones(db, [imp.id])[imp.id])
+        return documento
+
+    fila = db.execute(SQL_DETALLE, {"id": implementacion_id}).mappings().first()
+    if not fila:
+        return None
+
+    documento = {
+        "id": fila["id"],
+        "cliente": fila["cliente"],
+        "proceso": fila["proceso"],
+        "estado": fila["estado"],
+        "comentario_produccion": fila["comentario_produccion"],
+        "version": fila["version"],
+    }
+    for seccion in SECCIONES:
+        datos = serializar_seccion_dict(seccion, fila[seccion])
+        for subseccion in fila[f"subsecciones_{seccion}"] or []:
+            datos[subseccion["nombre"]] = {
+                atributo: subseccion.get(atributo) or "" for atributo in ATRIBUTOS
+            }
+        documento[seccion] = datos
+    return documento
+
+
+def _valores_subseccion(valor: Dict[str, Any]) -> Dict[str, Any]:
+    return {atributo: valor.get(atributo, "") for atributo in ATRIBUTOS}
+
+
+def _normalizar(valor) -> str:
+    return "" if valor is None else str(valor)
+
+
+def sincronizar_subsecciones(
+    db: Session,
+    implementacion_id: int,
+    seccion: str,
+    datos: Optional[Dict[str, Any]],
+) -> Tuple[int, int, int]:
+    """
+    Sincroniza las subsecciones personalizadas de una sección con el payload
+    recibido comparando contra lo guardado: solo inserta las nuevas, actualiza
+    las que cambiaron y elimina las que ya no vienen, con una sentencia por
+    operación. No hace commit; lo hace quien llama, una sola vez.
+
+    Args:
+        db: Sesión de base de datos
+        implementacion_id: ID de la implementación principal
+        seccion: Sección (contractual, talento_humano, procesos, tecnologia)
+        datos: Datos de la sección (predefinidos + personalizados)
+
+    Returns:
+        (insertadas, actualizadas, eliminadas)
+    """
+    predefinidos = CODECS[seccion].predefinidos
+    deseadas = {
+        nombre: _valores_subseccion(valor)
+        for nombre, valor in (datos or {}).items()
+        if nombre not in predefinidos and isinstance(valor, dict)
+    }
+
+    modelo_sub = MODELOS_SUBSECCION[seccion]
+    consulta = db.query(
+        modelo_sub.id,
+        modelo_sub.nombre_subsesion,
+        *(getattr(modelo_sub, atributo) for atributo in ATRIBUTOS),
+    ).filter(modelo_sub.cliente_implementacion_id == implementacion_id)
+    if modelo_sub is ProjectImplementacionSubseccionPersonalizada:
+        consulta = consulta.filter(modelo_sub.seccion == seccion)
+
+    existentes = {}
+    eliminar = []
+    for fila in consulta.order_by(modelo_sub.id):
+        if fila.nombre_subsesion in existentes or fila.nombre_subsesion not in deseadas:
+            # Ya no viene en el payload (o es un duplicado antiguo)
+            eliminar.append(fila.id)
+        else:
+            existentes[fila.nombre_subsesion] = fila
+
+    insertar = []
+    actualizar = []
+    for nombre, valores in deseadas.items():
+        fila = existentes.get(nombre)
+        if fila is None:
+            insertar.append(
+                {
+                    "cliente_implementacion_id": implementacion_id,
+                    "seccion": seccion,
+                    "nombre_subsesion": nombre,
+                    **valores,
+                }
+            )
+        elif any(
+            _normalizar(getattr(fila, atributo)) != _normalizar(valores[atributo])
+            for atributo in ATRIBUTOS
+        ):
+            actualizar.append({"id": fila.id, **valores})
+
+    if eliminar:
+        db.query(modelo_sub).filter(modelo_sub.id.in_(eliminar)).delete(
+            synchronize_session=False
+        )
+    if actualizar:
+        db.execute(update(modelo_sub), actualizar)
+    if insertar:
+        db.execute(insert(modelo_sub), insertar)
+
+    return len(insertar), len(actualizar), len(eliminar)
+
+
+# ============================================================================
+# PROGRESO POR SECCIÓN
+# ============================================================================
+
+# Peso de cada estado en el avance (mismo criterio que el frontend); el resto vale 0
+PESOS_ESTADO = {"ok": 100, "cancelado": 100, "en proceso": 50}
+
+# sección -> ((campo, columna de estado), ...) de todos los campos con columnas
+_COLUMNAS_ESTADO = {
+    seccion: tuple((campo.campo, campo.columnas[ATRIBUTOS.index("estado")]) for campo in campos)
+    for seccion, campos in REGISTRO_CAMPOS.items()
+}
+
+
+def _resumir_estados(estados: Iterable[Optional[str]]) -> Dict[str, int]:
+    total = completados = en_proceso = peso_total = 0
+    for estado in estados:
+        peso = PESOS_ESTADO.get(estado, 0)
+        total += 1
+        peso_total += peso
+        if peso == 100:
+            completados += 1
+        elif peso:
+            en_proceso += 1
+    # Redondeo como Math.round: (peso / total) redondeado al entero más cercano
+    porcentaje = (2 * peso_total + total) // (2 * total) if total else 0
+    return {
+        "total": total,
+        "completados": completados,
+        "en_proceso": en_proceso,
+        "porcentaje": porcentaje,
+    }
+
+
+def _estados_documento(seccion: str, datos: Optional[Dict[str, Any]]) -> Iterable[Optional[str]]:
+    """
+    Estados de una sección tal como quedará guardada al crearla: todos los
+    campos con columnas (los legados quedan vacíos) más las subsecciones.
+    """
+    datos = datos or {}
+    predefinidos = CODECS[seccion].predefinidos
+    estados = {
+        campo: (datos.get(campo) or {}).get("estado") if campo in predefinidos else None
+        for campo, _ in _COLUMNAS_ESTADO[seccion]
+    }
+    for nombre, valor in datos.items():
+        if nombre not in predefinidos and isinstance(valor, dict):
+            estados[nombre] = valor.get("estado")
+    return estados.values()
+
+
+def calcular_progreso(
+    db: Session, ids: List[int], secciones: Iterable[str] = SECCIONES
+) -> Dict[int, Dict[str, Dict[str, int]]]:
+    """
+    Calcula (sin guardar) el progreso de las secciones indicadas de varias
+    implementaciones. Solo lee la columna de estado de cada campo y de cada
+    subsección.
+
+    Returns:
+        {implementacion_id: {seccion: {total, completados, en_proceso, porcentaje}}}
+    """
+    resultado: Dict[int, Dict[str, Dict[str, int]]] = {id_: {} for id_ in ids}
+    if not ids:
+        return resultado
+
+    for seccion in secciones:
+        modelo = MODELOS_SECCION[seccion]
+        columnas_estado = _COLUMNAS_ESTADO[seccion]
+        estados: Dict[int, Dict[str, Optional[str]]] = {id_: {} for id_ in ids}
+
+        registros = (
+            db.query(
+                modelo.cliente_implementacion_id,
+                *(getattr(modelo, columna) for _, columna in columnas_estado),
+            )
+            .filter(modelo.cliente_implementacion_id.in_(ids))
+            .order_by(modelo.id)
+        )
+        vistos = set()
+        for id_, *valores in registros:
+            # Igual que la lectura del documento: se usa el primer registro
+            if id_ in vistos:
+                continue
+            vistos.add(id_)
+            estados[id_] = {campo: valor for (campo, _), valor in zip(columnas_estado, valores)}
+
+        modelo_sub = MODELOS_SUBSECCION[seccion]
+        consulta = db.query(
+            modelo_sub.cliente_implementacion_id,
+            modelo_sub.nombre_subsesion,
+            modelo_sub.estado,
+        ).filter(modelo_sub.cliente_implementacion_id.in_(ids))
+        if modelo_sub is ProjectImplementacionSubseccionPersonalizada:
+            consulta = consulta.filter(modelo_sub.seccion == seccion)
+        for id_, nombre, estado in consulta.order_by(modelo_sub.id):
+            estados[id_][nombre] = estado
+
+        for id_ in ids:
+            resultado[id_][seccion] = _resumir_estados(estados[id_].values())
+    return resultado
+
+
+def guardar_progreso(db: Session, progreso: Dict[int, Dict[str, Dict[str, int]]]):
+    """
+    Guarda el progreso calculado (upsert en PostgreSQL; con otros motores se
+    borran y se vuelven a insertar las filas). No hace commit.
+    """
+    filas = [
+        {"cliente_implementacion_id": id_, "seccion": seccion, **resumen}
+        for id_, secciones in progreso.items()
+        for seccion, resumen in secciones.items()
+    ]
+    if not filas:
+        return
+
+    if db.get_bind().dialect.name != "postgresql":
+        for id_, secciones in progreso.items():
+            db.query(ProjectImplementacionProgreso).filter(
+                ProjectImplementacionProgreso.cliente_implementacion_id == id_,
+                ProjectImplementacionProgreso.seccion.in_(list(secciones)),
+            ).delete(synchronize_session=False)
+        db.execute(insert(ProjectImplementacionProgreso), filas)
+        return
+
+    sentencia = pg_insert(ProjectImplementacionProgreso)
+    db.execute(
+        sentencia.on_conflict_do_update(
+            index_elements=["cliente_implementacion_id", "seccion"],
+            set_={
+                "total": sentencia.excluded.total,
+                "completados": sentencia.excluded.completados,
+                "en_proceso": sentencia.excluded.en_proceso,
+                "porcentaje": sentencia.excluded.porcentaje,
+                "actualizado_en": func.now(),
+            },
+        ),
+        filas,
+    )
+
+
+def recalcular_progreso(
+    db: Session, ids: List[int], secciones: Iterable[str] = SECCIONES
+) -> Dict[int, Dict[str, Dict[str, int]]]:
+    """
+    Recalcula y guarda el progreso de las secciones indicadas de varias
+    implementaciones. No hace commit: se llama dentro de la transacción que
+    modificó los datos (hacer flush antes si hay cambios ORM pendientes).
+    """
+    progreso = calcular_progreso(db, ids, secciones)
+    guardar_progreso(db, progreso)
+    return progreso
+
+
+def ids_sin_progreso(db: Session, desde: int, limite: int) -> List[int]:
+    """
+    Ids (mayores que desde, hasta limite) de las implementaciones a las que
+    les falta el progreso de alguna sección
+    """
+    completas = (
+        db.query(ProjectImplementacionProgreso.cliente_implementacion_id)
+        .group_by(ProjectImplementacionProgreso.cliente_implementacion_id)
+        .having(func.count() >= len(SECCIONES))
+    )
+    return [
+        id_
+        for (id_,) in db.query(ProjectImplementacionesClienteImple.id)
+        .filter(
+            ProjectImplementacionesClienteImple.id > desde,
+            ProjectImplementacionesClienteImple.id.notin_(completas),
+        )
+        .order_by(ProjectImplementacionesClienteImple.id)
+        .limit(limite)
+    ]
+
+
+def obtener_progreso(db: Session, ids: List[int]) -> Dict[int, Dict[str, Dict[str, int]]]:
+    """
+    Lee el progreso guardado de varias implementaciones (una consulta). Las que
+    aún no lo tienen (creadas antes de existir la tabla y sin pasar por
+    generar_progreso_implementaciones.py) se calculan en memoria: la lectura no
+    escribe en la base.
+    """
+    resultado: Dict[int, Dict[str, Dict[str, int]]] = {id_: {} for id_ in ids}
+    if not ids:
+        return resultado
+
+    for fila in db.query(ProjectImplementacionProgreso).filter(
+        ProjectImplementacionProgreso.cliente_implementacion_id.in_(ids)
+    ):
+        resultado[fila.cliente_implementacion_id][fila.seccion] = {
+            "total": fila.total,
+            "completados": fila.completados,
+            "en_proceso": fila.en_proceso,
+            "porcentaje": fila.porcentaje,
+        }
+
+    faltantes = [id_ for id_, progreso in resultado.items() if len(progreso) < len(SECCIONES)]
+    if faltantes:
+        resultado.update(calcular_progreso(db, faltantes))
+    return resultado
+
+
+# A partir de este número de filas se usa COPY en lugar de INSERT multi-fila
+UMBRAL_COPY = 200
+
+
+def _valor_copy(valor) -> str:
+    # En COPY ... CSV un campo vacío sin comillas es NULL y "" es texto vacío
+    if valor is None:
+        return ""
+    return '"' + str(valor).replace('"', '""') + '"'
+
+
+def insertar_filas(db: Session, modelo, filas: List[Dict[str, Any]]):
+    """
+    Inserta filas (todas con las mismas claves) en la tabla del modelo. Con
+    psycopg2 y muchas filas usa COPY FROM STDIN, varias veces más rápido que
+    el INSERT multi-fila; en otro caso usa insert() con executemany.
+    """
+    if not filas:
+        return
+    bind = db.get_bind()
+    if len(filas) < UMBRAL_COPY or bind.dialect.driver != "psycopg2":
+        db.execute(insert(modelo), filas)
+        return
+
+    tabla = modelo.__table__
+    claves = list(filas[0])
+    preparador = bind.dialect.identifier_preparer
+    columnas = ", ".join(preparador.quote(tabla.c[clave].name) for clave in claves)
+    buffer = io.StringIO()
+    for fila in filas:
+        buffer.write(",".join(_valor_copy(fila[clave]) for clave in claves))
+        buffer.write("\n")
+    buffer.seek(0)
+
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {preparador.format_table(tabla)} ({columnas}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+def crear_implementaciones(db: Session, documentos: List[Dict[str, Any]]) -> List[int]:
+    """
+    Crea varias implementaciones con sus secciones y subsecciones personalizadas
+    con un INSERT multi-fila (o COPY, ver insertar_filas) por tabla: 9
+    sentencias sin importar cuántas sean.
+    No hace commit: quien llama confirma todo en una sola transacción.
+
+    Args:
+        db: Sesión de base de datos
+        documentos: Documentos con cliente, proceso, estado y las cuatro secciones
+
+    Returns:
+        IDs creados, en el mismo orden que `documentos`
+    """
+    if not documentos:
+        return []
+
+    ids = list(
+        db.scalars(
+            insert(ProjectImplementacionesClienteImple).returning(
+                ProjectImplementacionesClienteImple.id, sort_by_parameter_order=True
+            ),
+            [
+                {
+                    "cliente": documento["cliente"],
+                    "proceso": documento["proceso"],
+                    "estado": documento.get("estado"),
+                }
+                for documento in documentos
+            ],
+        )
+    )
+
+    for seccion in SECCIONES:
+        codec = CODECS[seccion]
+        insertar_filas(
+            db,
+            MODELOS_SECCION[seccion],
+            [
+                {"cliente_implementacion_id": id_, **codec.codificar(documento.get(seccion))}
+                for id_, documento in zip(ids, documentos)
+            ],
+        )
+
+        subsecciones = [
+            {
+                "cliente_implementacion_id": id_,
+                "seccion": seccion,
+                "nombre_subsesion": nombre,
+                **_valores_subseccion(valor),
+            }
+            for id_, documento in zip(ids, documentos)
+            for nombre, valor in (documento.get(seccion) or {}).items()
+            if nombre not in codec.predefinidos and isinstance(valor, dict)
+        ]
+        insertar_filas(db, MODELOS_SUBSECCION[seccion], subsecciones)
+
+    # El progreso se calcula del propio documento: las filas son nuevas, no hace falta releerlas
+    insertar_filas(
+        db,
+        ProjectImplementacionProgreso,
+        [
+            {
+                "cliente_implementacion_id": id_,
+                "seccion": seccion,
+                **_resumir_estados(_estados_documento(seccion, documento.get(seccion))),
+            }
+            for id_, documento in zip(ids, documentos)
+            for seccion in SECCIONES
+        ],
+    )
+    return ids
+
+
+# ============================================================================
+# PATCH: JSON Patch (RFC 6902) y JSON Merge Patch (RFC 7396)
+# ============================================================================
+
+# Columnas de clienteimple que se pueden modificar con PATCH
+CAMPOS_BASICOS = ("cliente", "proceso", "estado", "comentario_produccion")
+CAMPOS_BASICOS_OBLIGATORIOS = ("cliente", "proceso")
+
+
+class ErrorPatch(ValueError):
+    """Operación o ruta de un PATCH que no se puede aplicar"""
+
+
+def parsear_ruta(ruta: str) -> Tuple[str, ...]:
+    """
+    Convierte una ruta JSON Pointer ("/procesos/listadoReportes/estado") o con
+    puntos ("procesos.listadoReportes.estado") en una tupla de partes.
+    """
+    if not isinstance(ruta, str) or not ruta:
+        raise ErrorPatch("Ruta vacía")
+    if ruta.startswith("/"):
+        partes = [
+            parte.replace("~1", "/").replace("~0", "~") for parte in ruta[1:].split("/")
+        ]
+    else:
+        partes = ruta.split(".")
+    if any(not parte for parte in partes):
+        raise ErrorPatch(f"Ruta no válida: {ruta}")
+    return tuple(partes)
+
+
+def cambios_json_patch(operaciones: List[Dict[str, Any]]) -> List[Tuple[Tuple[str, ...], Any, bool]]:
+    """
+    Convierte operaciones JSON Patch en cambios (ruta, valor, eliminar).
+    Se admiten add, replace y remove; add y replace son equivalentes porque
+    todas las rutas existen en el documento.
+    """
+    cambios = []
+    for indice, operacion in enumerate(operaciones):
+        if not isinstance(operacion, dict):
+            raise ErrorPatch(f"Operación {indice}: se esperaba un objeto")
+        op = operacion.get("op")
+        ruta = parsear_ruta(operacion.get("path"))
+        if op in ("add", "replace"):
+            if "value" not in operacion:
+                raise ErrorPatch(f"Operación {indice}: falta 'value'")
+            cambios.append((ruta, operacion["value"], False))
+        elif op == "remove":
+            cambios.append((ruta, None, True))
+        else:
+            raise ErrorPatch(
+                f"Operación {indice}: op '{op}' no soportada (add, replace, remove)"
+            )
+    return cambios
+
+
+def cambios_merge_patch(
+    documento: Dict[str, Any], prefijo: Tuple[str, ...] = ()
+) -> List[Tuple[Tuple[str, ...], Any, bool]]:
+    """
+    Convierte un JSON Merge Patch en cambios (ruta, valor, eliminar): los
+    objetos se recorren hasta el nivel de atributo y null elimina.
+    """
+    cambios = []
+    for clave, valor in documento.items():
+        ruta = prefijo + (clave,)
+        if valor is None:
+            cambios.append((ruta, None, True))
+        elif isinstance(valor, dict) and len(ruta) < 3:
+            cambios.extend(cambios_merge_patch(valor, ruta))
+        else:
+            cambios.append((ruta, valor, False))
+    return cambios
+
+
+def _valor_atributo(ruta: Tuple[str, ...], valor) -> str:
+    if isinstance(valor, (dict, list)):
+        raise ErrorPatch(f"{'.'.join(ruta)}: se esperaba un valor de texto")
+    return _normalizar(valor)
+
+
+def _resolver_cambios(cambios) -> Dict[str, Any]:
+    """
+    Agrupa los cambios por fila destino:
+    - basicos: {columna: valor} de clienteimple
+    - secciones: {seccion: {columna: valor}} de la tabla de la sección
+    - subsecciones: {seccion: {nombre: {"eliminar", "completa", "valores"}}}
+    Los cambios se aplican en orden: uno posterior sobre la misma ruta gana.
+    """
+    basicos: Dict[str, Any] = {}
+    secciones: Dict[str, Dict[str, Any]] = {}
+    subsecciones: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    for ruta, valor, eliminar in cambios:
+        destino = ".".join(ruta)
+
+        if len(ruta) == 1:
+            campo = ruta[0]
+            if campo not in CAMPOS_BASICOS:
+                raise ErrorPatch(f"Ruta no soportada: {destino}")
+            if eliminar and campo in CAMPOS_BASICOS_OBLIGATORIOS:
+                raise ErrorPatch(f"El campo {campo} es obligatorio")
+            basicos[campo] = None if eliminar else _valor_atributo(ruta, valor)
+            continue
+
+        seccion, campo = ruta[0], ruta[1]
+        if seccion not in MODELOS_SECCION or len(ruta) > 3:
+            raise ErrorPatch(f"Ruta no soportada: {destino}")
+
+        if len(ruta) == 3:
+            if ruta[2] not in ATRIBUTOS:
+                raise ErrorPatch(
+                    f"Atributo no válido en {destino}. "
+                    f"Valores permitidos: {', '.join(ATRIBUTOS)}"
+                )
+            valores = {ruta[2]: "" if eliminar else _valor_atributo(ruta, valor)}
+            completa = False
+        elif eliminar:
+            valores = None
+            completa = True
+        else:
+            # Reemplazo del campo completo: los atributos que no vienen quedan vacíos
+            if not isinstance(valor, dict):
+                raise ErrorPatch(f"{destino}: se esperaba un objeto con {', '.join(ATRIBUTOS)}")
+            desconocidos = [atributo for atributo in valor if atributo not in ATRIBUTOS]
+            if desconocidos:
+                raise ErrorPatch(f"Atributos no válidos en {destino}: {', '.join(desconocidos)}")
+            valores = {
+                atributo: _valor_atributo(ruta + (atributo,), valor.get(atributo))
+                for atributo in ATRIBUTOS
+            }
+            completa = True
+
+        if campo in CODECS[seccion].predefinidos:
+            columnas = secciones.setdefault(seccion, {})
+            for atributo in ATRIBUTOS:
+                if valores is None or atributo in valores:
+                    columna = COLUMNA_POR_CAMPO[seccion][(campo, atributo)]
+                    columnas[columna] = "" if valores is None else valores[atributo]
+            continue
+
+        actual = subsecciones.setdefault(seccion, {}).get(campo)
+        if valores is None:
+            subsecciones[seccion][campo] = {"eliminar": True, "completa": True, "valores": {}}
+        elif completa or actual is None or actual["eliminar"]:
+            # Tras eliminar, volver a escribir la subsección la crea desde cero
+            subsecciones[seccion][campo] = {
+                "eliminar": False,
+                "completa": completa or (actual is not None and actual["eliminar"]),
+                "valores": valores,
+            }
+        else:
+            actual["valores"].update(valores)
+
+    return {"basicos": basicos, "secciones": secciones, "subsecciones": subsecciones}
+
+
+def aplicar_patch(
+    db: Session, implementacion_id: int, cambios: List[Tuple[Tuple[str, ...], Any, bool]]
+) -> int:
+    """
+    Aplica cambios de PATCH con el mínimo de sentencias: un UPDATE por fila
+    afectada con solo las columnas modificadas (INSERT si la fila aún no
+    existe, DELETE al eliminar una subsección personalizada). No hace commit.
+
+    Raises:
+        ErrorPatch: si alguna ruta, operación o valor no es válido
+
+    Returns:
+        Número de filas modificadas
+    """
+    resueltos = _resolver_cambios(cambios)
+    filas = 0
+
+    if resueltos["basicos"]:
+        filas += (
+            db.query(ProjectImplementacionesClienteImple)
+            .filter(ProjectImplementacionesClienteImple.id == implementacion_id)
+            .update(resueltos["basicos"], synchronize_session=False)
+        )
+
+    for seccion, columnas in resueltos["secciones"].items():
+        modelo = MODELOS_SECCION[seccion]
+        # Si hubiera más de un registro se modifica el primero, el que se lee
+        registro_id = db.query(func.min(modelo.id)).filter(
+            modelo.cliente_implementacion_id == implementacion_id
+        ).scalar()
+        if registro_id is None:
+            db.execute(
+                insert(modelo),
+                [{"cliente_implementacion_id": implementacion_id, **columnas}],
+            )
+        else:
+            db.execute(update(modelo).where(modelo.id == registro_id).values(**columnas))
+        filas += 1
+
+    for seccion, cambios_seccion in resueltos["subsecciones"].items():
+        modelo_sub = MODELOS_SUBSECCION[seccion]
+        condiciones = [modelo_sub.cliente_implementacion_id == implementacion_id]
+        if modelo_sub is ProjectImplementacionSubseccionPersonalizada:
+            condiciones.append(modelo_sub.seccion == seccion)
+
+        for nombre, cambio in cambios_seccion.items():
+            filtro = (*condiciones, modelo_sub.nombre_subsesion == nombre)
+            if cambio["eliminar"]:
+                filas += db.query(modelo_sub).filter(*filtro).delete(
+                    synchronize_session=False
+                )
+                continue
+
+            valores = cambio["valores"]
+            if cambio["completa"]:
+                valores = _valores_subseccion(valores)
+            actualizadas = db.execute(
+                update(modelo_sub).where(*filtro).values(**valores)
+            ).rowcount
+            if not actualizadas:
+                db.execute(
+                    insert(modelo_sub),
+                    [
+                        {
+                            "cliente_implementacion_id": implementacion_id,
+                            "seccion": seccion,
+                            "nombre_subsesion": nombre,
+                            **_valores_subseccion(valores),
+                        }
+                    ],
+                )
+                actualizadas = 1
+            filas += actualizadas
+
+    secciones = set(resueltos["secciones"]) | set(resueltos["subsecciones"])
+    if secciones:
+        recalcular_progreso(db, [implementacion_id], [s for s in SECCIONES if s in secciones])
+    return filas
+
+
+# ============================================================================
+# CONCURRENCIA OPTIMISTA
+# ============================================================================
+
+
+class ConflictoVersion(Exception):
+    """La implementación cambió desde la versión que tenía quien escribe"""
+
+    def __init__(self, version_actual: int):
+        super().__init__(
+            "La implementación fue modificada por otro usuario "
+            f"(versión actual: {version_actual}). Recargue y vuelva a intentar."
+        )
+        self.version_actual = version_actual
+
+
+def reservar_version(
+    db: Session, implementacion_id: int, esperadas: Optional[Collection[int]] = None
+) -> Optional[int]:
+    """
+    Bloquea la implementación (SELECT ... FOR UPDATE) y comprueba su versión
+    si se indican las esperadas. Debe ser lo primero que hace una escritura:
+    la fila queda bloqueada hasta el commit, así que las escrituras
+    concurrentes se serializan y la que llega con una versión vieja falla en
+    vez de sobrescribir. No hace commit.
+
+    La versión no se incrementa aquí: la escritura llama a confirmar_version
+    solo si cambió algo, así que guardar sin cambios no invalida el ETag que
+    tienen los demás clientes.
+
+    Args:
+        esperadas: Versiones aceptadas (If-Match); None para no comprobar
+
+    Returns:
+        La versión que tendrá la implementación si la escritura cambia algo
+        (actual + 1), o None si la implementación no existe
+
+    Raises:
+        ConflictoVersion: si la versión actual no es ninguna de las esperadas
+    """
+    tabla = ProjectImplementacionesClienteImple
+    actual = db.scalar(
+        select(tabla.version).where(tabla.id == implementacion_id).with_for_update()
+    )
+    if actual is None:
+        return None
+    if esperadas is not None and actual not in set(esperadas):
+        raise ConflictoVersion(actual)
+    return actual + 1
+
+
+def confirmar_version(db: Session, implementacion_id: int, version: int):
+    """Aplica la versión reservada con reservar_version (la fila ya está bloqueada). No hace commit."""
+    tabla = ProjectImplementacionesClienteImple
+    db.execute(update(tabla).where(tabla.id == implementacion_id).values(version=version))
+
+
+# ============================================================================
+# ACTUALIZACIÓN EN LOTE DE ESTADO Y COMENTARIO
+# ============================================================================
+
+CAMPOS_LOTE = ("estado", "comentario_produccion")
+
+
+def actualizar_basicos_lote(
+    db: Session,
+    valores: Dict[str, Any],
+    ids: Optional[List[int]] = None,
+    estado: Optional[str] = None,
+    cliente: Optional[str] = None,
+    proceso: Optional[str] = None,
+) -> List[Any]:
+    """
+    Aplica `valores` (estado y/o comentario_produccion) a las implementaciones
+    seleccionadas por ids y/o filtros con un único UPDATE ... FROM ...
+    RETURNING. Solo se tocan (y se les incrementa la versión) las filas en las
+    que algún valor cambia. Los valores anteriores se leen en la misma
+    sentencia, de una subconsulta que bloquea las filas (FOR UPDATE).
+    No hace commit.
+
+    Args:
+        valores: {campo: nuevo valor} con campos de CAMPOS_LOTE
+        ids: IDs a actualizar
+        estado, proceso: Filtros por igualdad; cliente: filtro parcial (ilike)
+
+    Returns:
+        Filas actualizadas con id, cliente, proceso, estado,
+        comentario_produccion, version y <campo>_anterior por cada campo de
+        `valores`, ordenadas por id
+    """
+    tabla = ProjectImplementacionesClienteImple.__table__
+    condiciones = [
+        or_(*(tabla.c[campo].is_distinct_from(valor) for campo, valor in valores.items()))
+    ]
+    if ids is not None:
+        condiciones.append(tabla.c.id.in_(ids))
+    if estado is not None:
+        condiciones.append(tabla.c.estado == estado)
+    if proceso is not None:
+        condiciones.append(tabla.c.proceso == proceso)
+    if cliente is not None:
+        condiciones.append(tabla.c.cliente.ilike(f"%{cliente}%"))
+
+    anteriores = (
+        select(tabla.c.id, *(tabla.c[campo].label(f"{campo}_anterior") for campo in valores))
+        .where(*condiciones)
+        .with_for_update()
+        .subquery("anteriores")
+    )
+    sentencia = (
+        update(tabla)
+        .where(tabla.c.id == anteriores.c.id)
+        .values(**valores, version=tabla.c.version + 1)
+        .returning(
+            tabla.c.id,
+            tabla.c.cliente,
+            tabla.c.proceso,
+            tabla.c.estado,
+            tabla.c.comentario_produccion,
+            tabla.c.version,
+            *(anteriores.c[f"{campo}_anterior"] for campo in valores),
+        )
+    )
+    return sorted(db.execute(sentencia).all(), key=attrgetter("id"))
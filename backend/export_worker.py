@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Worker de exportaciones (Excel y PDF).
+
+Consume la cola project_export_jobs. Se pueden levantar varias instancias:
+cada trabajo se reclama con FOR UPDATE SKIP LOCKED.
+
+Uso:
+    python export_worker.py [--procesos N]
+"""
+import argparse
+
+from core.config import EXPORT_WORKER_PROCESOS
+from services.exportaciones import ejecutar_worker
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Worker de exportaciones")
+    parser.add_argument(
+        "--procesos",
+        type=int,
+        default=EXPORT_WORKER_PROCESOS,
+        help="Tamaño del pool de procesos que generan los archivos",
+    )
+    args = parser.parse_args()
+
+    try:
+        ejecutar_worker(args.procesos)
+    except KeyboardInterrupt:
+        print("\n👋 Worker detenido")
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Genera el progreso por sección (project_implementacion_progreso) de las
+implementaciones que todavía no lo tienen, por ejemplo las creadas antes de
+existir la tabla. Hasta entonces los listados lo calculan en cada lectura.
+
+Procesa las implementaciones por lotes de ids con un commit por lote, así que
+se puede interrumpir y volver a ejecutar.
+
+Uso:
+    python generar_progreso_implementaciones.py [--lote N]
+"""
+import argparse
+import time
+
+from core.config import MANTENIMIENTO_TAMANO_LOTE
+from core.database import SessionLocal
+from crud.implementaciones import ids_sin_progreso, recalcular_progreso
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Progreso de implementaciones")
+    parser.add_argument(
+        "--lote",
+        type=int,
+        default=MANTENIMIENTO_TAMANO_LOTE,
+        help="Implementaciones procesadas por lote (un commit por lote)",
+    )
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    inicio = time.perf_counter()
+    total = 0
+    ultimo_id = 0
+    try:
+        while True:
+            ids = ids_sin_progreso(db, ultimo_id, args.lote)
+            if not ids:
+                break
+            recalcular_progreso(db, ids)
+            db.commit()
+            total += len(ids)
+            ultimo_id = ids[-1]
+            print(f"🔄 Progreso: {total} implementaciones (hasta id {ultimo_id})")
+        print(f"✅ Progreso generado para {total} implementaciones en {time.perf_counter() - inicio:.1f} s")
+    except KeyboardInterrupt:
+        print("\n👋 Interrumpido: los lotes confirmados se conservan")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error: {e}")
+        raise
+    finally:
+        db.close()
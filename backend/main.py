@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -15,12 +17,27 @@ from routers.estados import router as estados_router
 from routers.prioridades import router as prioridades_router
 from routers.implementaciones import router as implementaciones_router
 from routers.entregas import router as entregas_router
+from routers.exportaciones import router as exportaciones_router
+from routers.busqueda import router as busqueda_router
+from core.database import async_engine
+from services.pdf_implementaciones import precargar_recursos
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Logo, plantillas y CSS de los PDF se cargan una vez por worker
+    precargar_recursos()
+    yield
+    if async_engine is not None:
+        await async_engine.dispose()
+
 
 # Crear aplicación FastAPI
 app = FastAPI(
     title="API Campañas",
     version="1.0.0",
-    description="Sistema de Gestión de Campañas, Proyectos e Implementaciones"
+    description="Sistema de Gestión de Campañas, Proyectos e Implementaciones",
+    lifespan=lifespan,
 )
 
 # Configurar CORS
@@ -37,6 +54,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cursor de la siguiente página del historial de campañas
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Health check endpoint
@@ -58,6 +77,8 @@ app.include_router(estados_router)
 app.include_router(prioridades_router)
 app.include_router(implementaciones_router)
 app.include_router(entregas_router)
+app.include_router(exportaciones_router)
+app.include_router(busqueda_router)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Mantenimiento de las particiones del historial de campañas.
+
+Crea las particiones mensuales de los próximos meses y pasa al archivo las
+que superan la retención. Se programa una vez al mes (cron); ejecutarlo más
+seguido no tiene efecto.
+
+Uso:
+    python mantener_historial_campanas.py [--meses-adelante N] [--retencion N]
+"""
+import argparse
+
+from core.config import (
+    HISTORIAL_CAMPANAS_MESES_ADELANTE,
+    HISTORIAL_CAMPANAS_RETENCION_MESES,
+)
+from core.database import SessionLocal
+from services.particiones_historial import archivar_particiones, crear_particiones
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Particiones del historial de campañas")
+    parser.add_argument(
+        "--meses-adelante",
+        type=int,
+        default=HISTORIAL_CAMPANAS_MESES_ADELANTE,
+        help="Meses futuros que deben tener su partición",
+    )
+    parser.add_argument(
+        "--retencion",
+        type=int,
+        default=HISTORIAL_CAMPANAS_RETENCION_MESES,
+        help="Meses que se conservan en historial_campanas antes de archivarse",
+    )
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        creadas = crear_particiones(db, args.meses_adelante)
+        archivadas = archivar_particiones(db, args.retencion)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error en el mantenimiento del historial: {e}")
+        raise
+    finally:
+        db.close()
+
+    print(f"✅ Particiones creadas: {', '.join(creadas) or 'ninguna'}")
+    print(f"📦 Particiones archivadas: {', '.join(archivadas) or 'ninguna'}")
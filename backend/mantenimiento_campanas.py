@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tareas de mantenimiento de los datos de campañas (services/mantenimiento_campanas.py).
+
+Uso:
+    python mantenimiento_campanas.py historial-inicial [--lote N]
+    python mantenimiento_campanas.py huerfanos [--lote N]
+    python mantenimiento_campanas.py compactar-historial [--lote N]
+    python mantenimiento_campanas.py todo [--lote N]
+"""
+import argparse
+
+from core.config import MANTENIMIENTO_TAMANO_LOTE
+from core.database import SessionLocal
+from services.mantenimiento_campanas import (
+    compactar_historial,
+    generar_historial_inicial,
+    limpiar_huerfanos,
+)
+
+TAREAS = {
+    "historial-inicial": [generar_historial_inicial],
+    "huerfanos": [limpiar_huerfanos],
+    "compactar-historial": [compactar_historial],
+    "todo": [limpiar_huerfanos, generar_historial_inicial, compactar_historial],
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mantenimiento de campañas")
+    parser.add_argument("tarea", choices=TAREAS)
+    parser.add_argument(
+        "--lote",
+        type=int,
+        default=MANTENIMIENTO_TAMANO_LOTE,
+        help="Ids procesados por lote (un commit por lote)",
+    )
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        for tarea in TAREAS[args.tarea]:
+            tarea(db, args.lote)
+    except KeyboardInterrupt:
+        print("\n👋 Interrumpido: los lotes confirmados se conservan")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        raise
+    finally:
+        db.close()
@@ -4,5 +4,9 @@ from .project_implementacion_talentoHumano import ProjectImplementacionTalentoHu
 from .project_implementacion_procesos import ProjectImplementacionProcesos
 from .project_implementacion_tecnologia import ProjectImplementacionTecnologia
 from .project_entregaImplementaciones import ProjectEntregaImplementaciones
+from .project_export_jobs import ProjectExportJob
+from .project_implementacion_progreso import ProjectImplementacionProgreso
+from .project_implementacion_historial import ProjectImplementacionHistorial
+from .project_implementacion_snapshot import ProjectImplementacionSnapshot
 
 # Agrega aquí los imports de otros modelos si los creas en el futuro
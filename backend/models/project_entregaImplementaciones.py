@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from core.database import Base
@@ -6,6 +6,10 @@ from core.database import Base
 
 class ProjectEntregaImplementaciones(Base):
     __tablename__ = "project_entregaImplementaciones"
+    __table_args__ = (
+        # Listado de entregas por implementación ordenado por fecha
+        Index("ix_entregas_implementacion_fecha", "implementacion_id", "fecha_entrega"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     implementacion_id = Column(
@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Text, Index
+from sqlalchemy.sql import func
+from core.database import Base
+
+
+class ProjectExportJob(Base):
+    """
+    Trabajo de exportación (Excel o PDF) procesado por el worker de exportaciones.
+
+    Estados: pendiente -> en_proceso -> completado | error
+    """
+
+    __tablename__ = "project_export_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    tipo = Column(String(20), nullable=False)  # "excel" | "pdf"
+    implementacion_id = Column(Integer, nullable=True)  # Solo para tipo "pdf"
+    estado = Column(String(20), nullable=False, default="pendiente")
+    intentos = Column(Integer, nullable=False, default=0)
+    worker = Column(String(100), nullable=True)
+    error = Column(Text, nullable=True)
+
+    # Artefacto generado
+    archivo_ruta = Column(String, nullable=True)
+    archivo_nombre = Column(String, nullable=True)
+    media_type = Column(String, nullable=True)
+    tamano = Column(BigInteger, nullable=True)
+
+    creado_en = Column(DateTime, nullable=False, default=func.now())
+    iniciado_en = Column(DateTime, nullable=True)
+    # El worker que procesa el trabajo la renueva periódicamente; vencida, el
+    # trabajo se considera abandonado
+    lease_hasta = Column(DateTime, nullable=True)
+    finalizado_en = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # El worker busca siempre el pendiente más antiguo
+        Index("ix_project_export_jobs_estado_id", "estado", "id"),
+    )
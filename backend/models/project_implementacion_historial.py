@@ -0,0 +1,30 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, UniqueConstraint
+from core.database import Base
+
+
+class ProjectImplementacionHistorial(Base):
+    """
+    Una versión de una implementación: solo los cambios a nivel de campo de
+    esa escritura (sección, campo, atributo, valor anterior -> nuevo).
+    """
+
+    __tablename__ = "project_implementacion_historial"
+    __table_args__ = (
+        UniqueConstraint(
+            "cliente_implementacion_id", "version", name="uq_implementacion_historial_version"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    cliente_implementacion_id = Column(
+        Integer,
+        ForeignKey("project_implementaciones_clienteimple.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    version = Column(Integer, nullable=False)
+    accion = Column(String(20), nullable=False)  # "creada", "actualizada", "inicial"
+    usuario_id = Column(Integer, nullable=True)  # Quien hizo el cambio (si se conoce)
+    fecha = Column(DateTime, default=datetime.utcnow, nullable=False)  # UTC
+    # [{"seccion", "campo", "atributo", "anterior", "nuevo"}]
+    cambios = Column(JSON, nullable=False, default=list)
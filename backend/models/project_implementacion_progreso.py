@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from core.database import Base
+
+
+class ProjectImplementacionProgreso(Base):
+    """
+    Resumen de avance de una implementación por sección (campos predefinidos +
+    subsecciones personalizadas). Lo mantienen los endpoints de escritura para
+    que los listados no tengan que leer las tablas de cada sección.
+    """
+
+    __tablename__ = "project_implementacion_progreso"
+
+    cliente_implementacion_id = Column(
+        Integer,
+        ForeignKey("project_implementaciones_clienteimple.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    seccion = Column(String(50), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    completados = Column(Integer, nullable=False, default=0)  # estado ok o cancelado
+    en_proceso = Column(Integer, nullable=False, default=0)
+    porcentaje = Column(Integer, nullable=False, default=0)
+    actualizado_en = Column(
+        DateTime, nullable=False, server_default=func.now(), onupdate=func.now()
+    )
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, ForeignKey, JSON
+from core.database import Base
+
+
+class ProjectImplementacionSnapshot(Base):
+    """
+    Documento completo de una implementación en una versión. Se guarda cada
+    cierto número de versiones para que reconstruir una versión pasada solo
+    tenga que aplicar los cambios posteriores al snapshot más cercano.
+    """
+
+    __tablename__ = "project_implementacion_snapshot"
+
+    cliente_implementacion_id = Column(
+        Integer,
+        ForeignKey("project_implementaciones_clienteimple.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    version = Column(Integer, primary_key=True)
+    documento = Column(JSON, nullable=False)
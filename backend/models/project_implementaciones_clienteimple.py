@@ -10,6 +10,8 @@ class ProjectImplementacionesClienteImple(Base):
     proceso = Column(String, nullable=False)
     estado = Column(String, nullable=True)
     comentario_produccion = Column(String, nullable=True)  # Comentario cuando Contractual < 100%
+    # Se incrementa en cada escritura; es el ETag de la implementación (concurrencia optimista)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     # Columnas JSON que se pueden eliminar ya que no se usan
     contractual = Column(JSON, nullable=True)
     talento_humano = Column(JSON, nullable=True)
@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from pydantic import BaseModel
+from core.database import get_db
+from services.busqueda_implementaciones import MAX_RESULTADOS, buscar_implementaciones
+
+router = APIRouter(prefix="/search", tags=["Búsqueda"])
+
+
+class CoincidenciaOut(BaseModel):
+    ruta: str
+    seccion: str
+    campo: str
+    atributo: Optional[str] = None
+    entrega_id: Optional[int] = None
+    fragmento: str
+    rank: float
+
+
+class ResultadoBusquedaOut(BaseModel):
+    id: int
+    cliente: str
+    proceso: str
+    estado: Optional[str] = None
+    puntaje: float
+    total_coincidencias: int
+    coincidencias: List[CoincidenciaOut]
+
+
+class BusquedaOut(BaseModel):
+    q: str
+    total: int
+    resultados: List[ResultadoBusquedaOut]
+
+
+@router.get("/implementaciones", response_model=BusquedaOut)
+def buscar(
+    q: str = Query(
+        ...,
+        min_length=2,
+        description='Texto a buscar. Admite "frase exacta", OR y -palabra para excluir',
+    ),
+    limit: int = Query(20, ge=1, le=MAX_RESULTADOS),
+    db: Session = Depends(get_db),
+):
+    """
+    Búsqueda de texto completo en las secciones, subsecciones y entregas de
+    las implementaciones (sin distinguir tildes ni mayúsculas, con raíces en
+    español). Cada resultado incluye sus mejores coincidencias con la ruta del
+    campo (seccion.campo.atributo o entregas.{id}.campo) y un fragmento con
+    los términos resaltados en <b>.
+    """
+    resultados = buscar_implementaciones(db, q.strip(), limit)
+    return {"q": q, "total": len(resultados), "resultados": resultados}
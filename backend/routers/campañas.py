@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session, joinedload
-from typing import List
+from typing import List, Optional
 from schemas.campaña import CampañaCreate, CampañaUpdate, CampañaOut
-from app.models.campana import Campaña, TipoCampaña
+from app.models.campana import Campaña
 from app.models.cliente import Cliente
 from app.models.cliente_corporativo import ClienteCorporativo
 from app.models.historial_campana import HistorialCampaña
@@ -19,6 +20,11 @@ from app.schemas.productos_facturacion import (
 )
 from app.dependencies import get_db
 from core.security import get_current_user, UserInDB
+from crud.historial_campanas import (
+    listar_historial_campaña,
+    registrar_cambio_campaña,
+)
+from services import estadisticas_campanas, facturacion_campanas
 
 router = APIRouter(prefix="/campanas", tags=["Campañas"])
 
@@ -46,8 +52,7 @@ def crear_campaña(
 
     nueva_campaña = Campaña(**campaña.dict())
     db.add(nueva_campaña)
-    db.commit()
-    db.refresh(nueva_campaña)
+    db.flush()  # Asigna el id para el historial; se confirma todo junto
 
     # Registrar creación en historial
     registrar_cambio_campaña(
@@ -58,6 +63,9 @@ def crear_campaña(
         usuario_id=usuario.id if hasattr(usuario, "id") else None,
         observaciones=f"Campaña creada por {usuario.nombre if hasattr(usuario, 'nombre') else 'usuario'}",
     )
+    db.commit()
+    db.refresh(nueva_campaña)
+    estadisticas_campanas.invalidar()
 
     return nueva_campaña
 
@@ -80,28 +88,30 @@ def listar_campañas(
 def obtener_estadisticas(
     db: Session = Depends(get_db), usuario: UserInDB = Depends(get_current_user)
 ):
-    """Obtener estadísticas para los contadores superiores"""
-    total_clientes_corporativos = db.query(ClienteCorporativo).count()
-    total_contactos = db.query(Cliente).count()
-    total_campañas = db.query(Campaña).count()
-
-    # Contar por tipo de servicio con los nuevos tipos
-    sac_count = db.query(Campaña).filter(Campaña.tipo == TipoCampaña.SAC).count()
-    tmc_count = db.query(Campaña).filter(Campaña.tipo == TipoCampaña.TMC).count()
-    tvt_count = db.query(Campaña).filter(Campaña.tipo == TipoCampaña.TVT).count()
-    cbz_count = db.query(Campaña).filter(Campaña.tipo == TipoCampaña.CBZ).count()
-
-    return {
-        "total_clientes_corporativos": total_clientes_corporativos,
-        "total_contactos": total_contactos,
-        "total_campañas": total_campañas,
-        "por_servicio": {
-            "SAC": sac_count,
-            "TMC": tmc_count,
-            "TVT": tvt_count,
-            "CBZ": cbz_count,
-        },
-    }
+    """
+    Obtener estadísticas para los contadores superiores (una sola consulta,
+    en caché hasta la próxima escritura de campañas, contactos o clientes)
+    """
+    return estadisticas_campanas.obtener_estadisticas(db)
+
+
+@router.get("/facturacion/resumen")
+def obtener_resumen_facturacion(
+    meses: int = Query(12, ge=1, le=120, description="Horizonte de la proyección"),
+    crecimiento: float = Query(
+        0.0, gt=-1, le=1, description="Crecimiento mensual compuesto (0.02 = 2 %)"
+    ),
+    db: Session = Depends(get_db),
+    usuario: UserInDB = Depends(get_current_user),
+):
+    """
+    Ingreso mensual equivalente por campaña, cliente corporativo, tipo y
+    ejecutivo (la periodicidad se normaliza a meses), con su proyección a
+    `meses` meses
+    """
+    # El resumen ya es JSON (números y textos): se evita jsonable_encoder, que
+    # recorre de nuevo cada campaña
+    return JSONResponse(facturacion_campanas.obtener_resumen(db, meses, crecimiento))
 
 
 @router.get("/{campana_id}", response_model=CampañaOut)
@@ -169,9 +179,6 @@ def actualizar_campaña(
             }
         setattr(campaña, field, value)
 
-    db.commit()
-    db.refresh(campaña)
-
     # Registrar cambios en historial si hubo modificaciones
     if cambios_realizados:
         registrar_cambio_campaña(
@@ -182,6 +189,13 @@ def actualizar_campaña(
             usuario_id=usuario.id if hasattr(usuario, "id") else None,
             observaciones=f"Campaña actualizada por {usuario.nombre if hasattr(usuario, 'nombre') else 'usuario'}",
         )
+    db.commit()
+    db.refresh(campaña)
+    if "tipo" in cambios_realizados:
+        estadisticas_campanas.invalidar()
+    # El resumen de facturación agrupa por estos campos
+    if cambios_realizados.keys() & {"nombre", "tipo", "ejecutivo", "cliente_corporativo_id"}:
+        facturacion_campanas.invalidar()
 
     return campaña
 
@@ -199,6 +213,8 @@ def eliminar_campaña(
 
     db.delete(campaña)
     db.commit()
+    estadisticas_campanas.invalidar()
+    facturacion_campanas.invalidar()
 
     return {"message": "Campaña eliminada exitosamente"}
 
@@ -207,23 +223,40 @@ def eliminar_campaña(
 @router.get("/{campana_id}/historial", response_model=List[HistorialOut])
 def obtener_historial_campaña(
     campana_id: int,
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(
+        None, description="Valor de X-Next-Cursor de la página anterior"
+    ),
+    accion: Optional[str] = None,
+    usuario_id: Optional[int] = None,
     db: Session = Depends(get_db),
     usuario: UserInDB = Depends(get_current_user),
 ):
-    """Obtener el historial de cambios de una campaña"""
+    """
+    Obtener el historial de cambios de una campaña, del más reciente al más
+    antiguo. Si hay más páginas, el cursor de la siguiente viaja en la
+    cabecera X-Next-Cursor.
+    """
     # Verificar que la campaña existe
     campaña = db.query(Campaña).filter(Campaña.id == campana_id).first()
     if not campaña:
         raise HTTPException(status_code=404, detail="Campaña no encontrada")
 
-    # Obtener historial ordenado por fecha descendente
-    historial = (
-        db.query(HistorialCampaña)
-        .filter(HistorialCampaña.campaña_id == campana_id)
-        .order_by(HistorialCampaña.fecha.desc())
-        .all()
-    )
+    try:
+        historial, next_cursor = listar_historial_campaña(
+            db,
+            campana_id,
+            limit,
+            cursor=cursor,
+            accion=accion,
+            usuario_id=usuario_id,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return historial
 
 
@@ -256,275 +289,6 @@ def crear_entrada_historial(
     return nueva_entrada
 
 
-def registrar_cambio_campaña(
-    db: Session,
-    campaña_id: int,
-    accion: str,
-    cambios: dict = None,
-    usuario_id: int = None,
-    observaciones: str = None,
-):
-    """Función auxiliar para registrar cambios en el historial"""
-    # Generar mensaje personalizado según la acción
-    mensaje_legible = generar_mensaje_historial(accion, cambios, usuario_id, db)
-
-    import datetime
-    import enum
-    import json
-
-    def serializar_para_json(obj):
-        if isinstance(obj, (datetime.date, datetime.datetime)):
-            return obj.isoformat()
-        if isinstance(obj, enum.Enum):
-            return obj.value
-        raise TypeError(f"Type {type(obj)} not serializable")
-
-    cambios_json = None
-    if cambios is not None:
-        # Serializa el dict a string y luego lo vuelve a dict para que SQLAlchemy lo acepte como JSON serializable
-        cambios_json = json.loads(json.dumps(cambios, default=serializar_para_json))
-
-    entrada_historial = HistorialCampaña(
-        campaña_id=campaña_id,
-        usuario_id=usuario_id,
-        accion=accion,
-        cambios=cambios_json,
-        observaciones=mensaje_legible or observaciones,
-    )
-    db.add(entrada_historial)
-    db.commit()
-
-
-def generar_mensaje_historial(
-    accion: str, cambios: dict, usuario_id: int = None, db: Session = None
-) -> str:
-    """Generar mensaje legible para el historial"""
-    from app.models.usuario import Usuario
-
-    # Obtener el nombre del usuario de la base de datos
-    usuario_nombre = "Usuario"  # Valor por defecto
-    if usuario_id and db:
-        try:
-            usuario = db.query(Usuario).filter(Usuario.id == usuario_id).first()
-            if usuario:
-                # Evitar nombres duplicados
-                if usuario.nombre == usuario.apellido:
-                    usuario_nombre = usuario.nombre
-                else:
-                    usuario_nombre = f"{usuario.nombre} {usuario.apellido}".strip()
-        except Exception:
-            # Si hay error en la consulta, usar el valor por defecto
-            pass
-
-    if accion == "producto_agregado":
-        producto_servicio = cambios.get("producto_servicio", "producto")
-        cantidad = cambios.get("cantidad", 1)
-        tipo = cambios.get("tipo", "Producto")
-        proveedor = cambios.get("proveedor", "")
-
-        mensaje_base = f"{usuario_nombre} agregó {tipo.lower()}: {producto_servicio}"
-        if cantidad > 1:
-            mensaje_base += f" (cantidad: {cantidad})"
-        if proveedor:
-            mensaje_base += f" - Proveedor: {proveedor}"
-
-        return mensaje_base
-
-    elif accion == "producto_actualizado":
-        anterior = cambios.get("anterior", {})
-        nuevo = cambios.get("nuevo", {})
-
-        # Obtener el contexto del producto para ser más específico
-        producto_contexto = nuevo.get("producto_servicio") or anterior.get(
-            "producto_servicio", "producto"
-        )
-
-        # Mostrar todos los cambios de manera clara
-        cambios_texto = []
-
-        if anterior.get("producto_servicio") != nuevo.get("producto_servicio"):
-            cambios_texto.append(
-                f"nombre de '{anterior.get('producto_servicio', '')}' a '{nuevo.get('producto_servicio', '')}'"
-            )
-
-        if anterior.get("cantidad") != nuevo.get("cantidad"):
-            cambios_texto.append(
-                f"cantidad de {producto_contexto} de {anterior.get('cantidad', 0)} a {nuevo.get('cantidad', 0)} unidades"
-            )
-
-        if anterior.get("proveedor") != nuevo.get("proveedor"):
-            cambios_texto.append(
-                f"proveedor de {producto_contexto} de '{anterior.get('proveedor', '')}' a '{nuevo.get('proveedor', '')}'"
-            )
-
-        if anterior.get("tipo") != nuevo.get("tipo"):
-            cambios_texto.append(
-                f"tipo de {producto_contexto} de '{anterior.get('tipo', '')}' a '{nuevo.get('tipo', '')}'"
-            )
-
-        if anterior.get("propiedad") != nuevo.get("propiedad"):
-            cambios_texto.append(
-                f"propiedad de {producto_contexto} de '{anterior.get('propiedad', '')}' a '{nuevo.get('propiedad', '')}'"
-            )
-
-        if cambios_texto:
-            return f"{usuario_nombre} modificó {', '.join(cambios_texto)}"
-        else:
-            return f"{usuario_nombre} modificó {producto_contexto}"
-
-    elif accion == "producto_eliminado":
-        producto_servicio = cambios.get("producto_servicio", "producto")
-        cantidad = cambios.get("cantidad", 1)
-        tipo = cambios.get("tipo", "producto")
-
-        mensaje = f"{usuario_nombre} eliminó {tipo.lower()}: {producto_servicio}"
-        if cantidad > 1:
-            mensaje += f" (cantidad: {cantidad})"
-
-        return mensaje
-
-    elif accion == "facturacion_eliminada":
-        unidad = cambios.get("unidad", "unidad")
-        valor = cambios.get("valor", 0)
-
-        mensaje = f"{usuario_nombre} eliminó facturación: {unidad}"
-        if valor > 0:
-            mensaje += f" (valor: ${valor:,.0f})"
-
-        return mensaje
-
-    elif accion == "facturacion_agregada":
-        unidad = cambios.get("unidad", "unidad")
-        cantidad = cambios.get("cantidad", 1)
-        valor = cambios.get("valor", 0)
-        periodicidad = cambios.get("periodicidad", "")
-
-        mensaje = f"{usuario_nombre} agregó facturación: {unidad}"
-        if cantidad > 1:
-            mensaje += f" (cantidad: {cantidad})"
-        if valor > 0:
-            mensaje += f" - Valor: ${valor:,.0f}"
-        if periodicidad:
-            mensaje += f" - Periodicidad: {periodicidad}"
-
-        return mensaje
-
-    elif accion == "facturacion_actualizada":
-        anterior = cambios.get("anterior", {})
-        nuevo = cambios.get("nuevo", {})
-
-        # Obtener el contexto del producto/servicio para ser más específicos
-        unidad_contexto = nuevo.get("unidad") or anterior.get("unidad", "unidad")
-
-        # Mostrar todos los cambios de manera clara
-        cambios_texto = []
-
-        if anterior.get("unidad") != nuevo.get("unidad"):
-            cambios_texto.append(
-                f"unidad de facturación de '{anterior.get('unidad', '')}' a '{nuevo.get('unidad', '')}'"
-            )
-
-        if anterior.get("cantidad") != nuevo.get("cantidad"):
-            cambios_texto.append(
-                f"cantidad de {unidad_contexto} de {anterior.get('cantidad', 0)} a {nuevo.get('cantidad', 0)} unidades"
-            )
-
-        if anterior.get("valor") != nuevo.get("valor"):
-            cambios_texto.append(
-                f"valor de {unidad_contexto} de ${anterior.get('valor', 0):,.0f} a ${nuevo.get('valor', 0):,.0f}"
-            )
-
-        if anterior.get("periodicidad") != nuevo.get("periodicidad"):
-            cambios_texto.append(
-                f"periodicidad de {unidad_contexto} de '{anterior.get('periodicidad', '')}' a '{nuevo.get('periodicidad', '')}'"
-            )
-
-        if cambios_texto:
-            return f"{usuario_nombre} modificó {', '.join(cambios_texto)}"
-        else:
-            return f"{usuario_nombre} modificó facturación de {unidad_contexto}"
-
-    elif accion == "actualizada":
-        # Manejar actualizaciones de campaña con mensajes específicos
-        if not cambios:
-            return f"{usuario_nombre} actualizó la campaña"
-
-        cambios_texto = []
-        for campo, valores in cambios.items():
-            if (
-                isinstance(valores, dict)
-                and "anterior" in valores
-                and "nuevo" in valores
-            ):
-                anterior = valores["anterior"]
-                nuevo = valores["nuevo"]
-
-                # Traducir nombres de campos al español y manejar casos especiales
-                if campo == "nombre":
-                    cambios_texto.append(f"nombre de '{anterior}' a '{nuevo}'")
-                elif campo == "tipo":
-                    cambios_texto.append(f"tipo de campaña de '{anterior}' a '{nuevo}'")
-                elif campo == "ejecutivo":
-                    cambios_texto.append(f"ejecutivo de '{anterior}' a '{nuevo}'")
-                elif campo == "lider_de_campaña":
-                    cambios_texto.append(
-                        f"líder de campaña de '{anterior}' a '{nuevo}'"
-                    )
-                elif campo == "estado":
-                    cambios_texto.append(f"estado de '{anterior}' a '{nuevo}'")
-                elif campo == "fecha_de_produccion":
-                    anterior_fecha = anterior if anterior else "sin fecha"
-                    nuevo_fecha = nuevo if nuevo else "sin fecha"
-                    cambios_texto.append(
-                        f"fecha de producción de '{anterior_fecha}' a '{nuevo_fecha}'"
-                    )
-                elif campo == "cliente_corporativo_id":
-                    # Aquí podrías obtener el nombre del cliente en lugar del ID
-                    cambios_texto.append(
-                        f"cliente corporativo (ID: {anterior} → {nuevo})"
-                    )
-                elif campo == "contacto_id":
-                    # Aquí podrías obtener el nombre del contacto en lugar del ID
-                    cambios_texto.append(f"contacto (ID: {anterior} → {nuevo})")
-                elif campo == "presupuesto":
-                    anterior_presup = (
-                        f"${anterior:,.0f}" if anterior else "sin presupuesto"
-                    )
-                    nuevo_presup = f"${nuevo:,.0f}" if nuevo else "sin presupuesto"
-                    cambios_texto.append(
-                        f"presupuesto de {anterior_presup} a {nuevo_presup}"
-                    )
-                elif campo == "observaciones":
-                    anterior_obs = (
-                        anterior[:50] + "..."
-                        if anterior and len(anterior) > 50
-                        else anterior or "sin observaciones"
-                    )
-                    nuevo_obs = (
-                        nuevo[:50] + "..."
-                        if nuevo and len(nuevo) > 50
-                        else nuevo or "sin observaciones"
-                    )
-                    cambios_texto.append(
-                        f"observaciones de '{anterior_obs}' a '{nuevo_obs}'"
-                    )
-                else:
-                    # Para campos no específicos, usar nombre genérico
-                    campo_esp = campo.replace("_", " ")
-                    cambios_texto.append(f"{campo_esp} de '{anterior}' a '{nuevo}'")
-
-        if cambios_texto:
-            if len(cambios_texto) == 1:
-                return f"{usuario_nombre} actualizó {cambios_texto[0]} de la campaña"
-            else:
-                return f"{usuario_nombre} actualizó: {', '.join(cambios_texto)}"
-        else:
-            return f"{usuario_nombre} actualizó la campaña"
-
-    else:
-        return f"{usuario_nombre} realizó acción {accion}"
-
-
 # ==================== ENDPOINTS DE PRODUCTOS ====================
 
 
@@ -567,8 +331,6 @@ def crear_producto_campaña(
     )
 
     db.add(db_producto)
-    db.commit()
-    db.refresh(db_producto)
 
     # Registrar en historial
     registrar_cambio_campaña(
@@ -584,6 +346,8 @@ def crear_producto_campaña(
             "cantidad": producto.cantidad,
         },
     )
+    db.commit()
+    db.refresh(db_producto)
 
     return db_producto
 
@@ -624,9 +388,6 @@ def actualizar_producto_campaña(
     db_producto.propiedad = producto.propiedad
     db_producto.cantidad = producto.cantidad
 
-    db.commit()
-    db.refresh(db_producto)
-
     # Registrar en historial
     registrar_cambio_campaña(
         db=db,
@@ -644,6 +405,8 @@ def actualizar_producto_campaña(
             },
         },
     )
+    db.commit()
+    db.refresh(db_producto)
 
     return db_producto
 
@@ -677,7 +440,6 @@ def eliminar_producto_campaña(
     }
 
     db.delete(db_producto)
-    db.commit()
 
     # Registrar en historial
     registrar_cambio_campaña(
@@ -687,6 +449,7 @@ def eliminar_producto_campaña(
         accion="producto_eliminado",
         cambios=producto_info,
     )
+    db.commit()
 
     return {"message": "Producto eliminado correctamente"}
 
@@ -734,8 +497,6 @@ def crear_facturacion_campaña(
     )
 
     db.add(db_facturacion)
-    db.commit()
-    db.refresh(db_facturacion)
 
     # Registrar en historial
     registrar_cambio_campaña(
@@ -750,6 +511,9 @@ def crear_facturacion_campaña(
             "periodicidad": facturacion.periodicidad,
         },
     )
+    db.commit()
+    db.refresh(db_facturacion)
+    facturacion_campanas.invalidar()
 
     return db_facturacion
 
@@ -791,9 +555,6 @@ def actualizar_facturacion_campaña(
     db_facturacion.valor = facturacion.valor
     db_facturacion.periodicidad = facturacion.periodicidad
 
-    db.commit()
-    db.refresh(db_facturacion)
-
     # Registrar en historial
     registrar_cambio_campaña(
         db=db,
@@ -810,6 +571,9 @@ def actualizar_facturacion_campaña(
             },
         },
     )
+    db.commit()
+    db.refresh(db_facturacion)
+    facturacion_campanas.invalidar()
 
     return db_facturacion
 
@@ -845,7 +609,6 @@ def eliminar_facturacion_campaña(
     }
 
     db.delete(db_facturacion)
-    db.commit()
 
     # Registrar en historial
     registrar_cambio_campaña(
@@ -855,5 +618,7 @@ def eliminar_facturacion_campaña(
         accion="facturacion_eliminada",
         cambios=facturacion_info,
     )
+    db.commit()
+    facturacion_campanas.invalidar()
 
     return {"message": "Unidad de facturación eliminada correctamente"}
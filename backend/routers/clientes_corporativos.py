@@ -8,6 +8,7 @@ from schemas.cliente_corporativo import (
     ClienteCorporativoUpdate,
 )
 import crud.cliente_corporativo as crud_cliente_corp
+from services import estadisticas_campanas, facturacion_campanas
 
 router = APIRouter(prefix="/clientes-corporativos", tags=["clientes-corporativos"])
 
@@ -38,7 +39,9 @@ def crear_cliente_corporativo(
     cliente: ClienteCorporativoCreate, db: Session = Depends(get_db)
 ):
     """Crear un nuevo cliente corporativo"""
-    return crud_cliente_corp.create_cliente_corporativo(db=db, cliente=cliente)
+    nuevo = crud_cliente_corp.create_cliente_corporativo(db=db, cliente=cliente)
+    estadisticas_campanas.invalidar()
+    return nuevo
 
 
 @router.put("/{cliente_id}", response_model=ClienteCorporativo)
@@ -56,6 +59,8 @@ def actualizar_cliente_corporativo(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Cliente corporativo no encontrado",
         )
+    # El resumen de facturación muestra el nombre del cliente
+    facturacion_campanas.invalidar()
     return cliente
 
 
@@ -68,6 +73,9 @@ def eliminar_cliente_corporativo(cliente_id: int, db: Session = Depends(get_db))
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Cliente corporativo no encontrado",
         )
+    estadisticas_campanas.invalidar()
+    # El resumen de facturación agrupa por cliente corporativo
+    facturacion_campanas.invalidar()
     return {"message": "Cliente corporativo eliminado exitosamente"}
 
 
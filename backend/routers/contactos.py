@@ -6,6 +6,7 @@ from app.models.cliente import Cliente
 from app.models.cliente_corporativo import ClienteCorporativo
 from app.dependencies import get_db
 from core.security import get_current_user, UserInDB
+from services import estadisticas_campanas
 
 router = APIRouter(prefix="/contactos", tags=["Contactos"])
 
@@ -30,6 +31,7 @@ def crear_contacto(
     db.add(nuevo_contacto)
     db.commit()
     db.refresh(nuevo_contacto)
+    estadisticas_campanas.invalidar()
     return nuevo_contacto
 
 
@@ -107,6 +109,7 @@ def eliminar_contacto(
 
     db.delete(contacto)
     db.commit()
+    estadisticas_campanas.invalidar()
     return {"message": "Contacto eliminado exitosamente"}
 
 
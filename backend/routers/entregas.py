@@ -1,17 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List, Optional
 from datetime import datetime
 
-from core.database import get_db
+from core.database import get_async_db
+from crud import entregas as crud_entregas
 from models.project_entregaImplementaciones import ProjectEntregaImplementaciones
 from models.project_implementaciones_clienteimple import (
     ProjectImplementacionesClienteImple,
 )
+from services import cache_pdf
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/entregas", tags=["entregas"])
 
+# Los endpoints usan la sesión asíncrona (psycopg 3): mientras esperan a la
+# base de datos el event loop sigue atendiendo otras peticiones.
+
 
 # Schemas de Pydantic
 class EntregaCreate(BaseModel):
@@ -76,17 +84,50 @@ class EntregaResponse(BaseModel):
         from_attributes = True
 
 
+class EntregaResumen(BaseModel):
+    id: int
+    implementacion_id: int
+    cliente: Optional[str] = None
+    proceso: Optional[str] = None
+    fecha_entrega: datetime
+    estado_entrega: str
+    campos_completos: int
+    campos_totales: int
+    completitud: float  # Porcentaje de campos de texto llenos
+
+
+class EntregasResumenPagina(BaseModel):
+    items: List[EntregaResumen]
+    next_cursor: Optional[int] = None
+
+
+async def _cargar_entrega(
+    db: AsyncSession, entrega_id: int
+) -> Optional[ProjectEntregaImplementaciones]:
+    """
+    Entrega con su implementación ya cargada (en async no hay carga perezosa
+    de relaciones). populate_existing relee también la que ya está en sesión.
+    """
+    resultado = await db.execute(
+        select(ProjectEntregaImplementaciones)
+        .options(selectinload(ProjectEntregaImplementaciones.implementacion))
+        .where(ProjectEntregaImplementaciones.id == entrega_id)
+        .execution_options(populate_existing=True)
+    )
+    return resultado.scalar_one_or_none()
+
+
 @router.post("/", response_model=EntregaResponse, status_code=status.HTTP_201_CREATED)
-async def crear_entrega(entrega: EntregaCreate, db: Session = Depends(get_db)):
+async def crear_entrega(
+    entrega: EntregaCreate, db: AsyncSession = Depends(get_async_db)
+):
     """
     Crear una nueva entrega de implementación
     """
     try:
         # Verificar que la implementación existe
-        implementacion = (
-            db.query(ProjectImplementacionesClienteImple)
-            .filter(ProjectImplementacionesClienteImple.id == entrega.implementacion_id)
-            .first()
+        implementacion = await db.get(
+            ProjectImplementacionesClienteImple, entrega.implementacion_id
         )
 
         if not implementacion:
@@ -161,15 +202,17 @@ async def crear_entrega(entrega: EntregaCreate, db: Session = Depends(get_db)):
 
         # Guardar en la base de datos
         db.add(nueva_entrega)
-        db.commit()
-        db.refresh(nueva_entrega)
+        await db.commit()
+        await run_in_threadpool(
+            cache_pdf.invalidar_implementacion, nueva_entrega.implementacion_id
+        )
 
-        return nueva_entrega
+        return await _cargar_entrega(db, nueva_entrega.id)
 
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al crear la entrega: {str(e)}",
@@ -178,32 +221,57 @@ async def crear_entrega(entrega: EntregaCreate, db: Session = Depends(get_db)):
 
 @router.get("/", response_model=List[EntregaResponse])
 async def obtener_entregas(
-    implementacion_id: Optional[int] = None, db: Session = Depends(get_db)
+    implementacion_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Obtener todas las entregas o filtrar por implementación
     """
-    query = db.query(ProjectEntregaImplementaciones)
+    query = select(ProjectEntregaImplementaciones).options(
+        selectinload(ProjectEntregaImplementaciones.implementacion)
+    )
 
     if implementacion_id:
-        query = query.filter(
+        query = query.where(
             ProjectEntregaImplementaciones.implementacion_id == implementacion_id
         )
 
-    entregas = query.all()
-    return entregas
+    resultado = await db.execute(query)
+    return resultado.scalars().all()
+
+
+@router.get("/resumen", response_model=EntregasResumenPagina)
+async def listar_resumen_entregas(
+    implementacion_id: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[int] = Query(None, description="ID de la última entrega recibida"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Listado liviano y paginado (keyset, de la más reciente a la más antigua)
+    de entregas con su completitud, sin los campos de texto. El detalle
+    completo de cada entrega se obtiene con GET /entregas/{entrega_id}.
+    """
+    try:
+        items, next_cursor = await db.run_sync(
+            crud_entregas.listar_resumen_entregas,
+            limit=limit,
+            cursor=cursor,
+            implementacion_id=implementacion_id,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
 
 
 @router.get("/{entrega_id}", response_model=EntregaResponse)
-async def obtener_entrega(entrega_id: int, db: Session = Depends(get_db)):
+async def obtener_entrega(
+    entrega_id: int, db: AsyncSession = Depends(get_async_db)
+):
     """
     Obtener una entrega específica por ID
     """
-    entrega = (
-        db.query(ProjectEntregaImplementaciones)
-        .filter(ProjectEntregaImplementaciones.id == entrega_id)
-        .first()
-    )
+    entrega = await _cargar_entrega(db, entrega_id)
 
     if not entrega:
         raise HTTPException(
@@ -216,18 +284,14 @@ async def obtener_entrega(entrega_id: int, db: Session = Depends(get_db)):
 
 @router.put("/{entrega_id}", response_model=EntregaResponse)
 async def actualizar_entrega(
-    entrega_id: int, entrega: EntregaCreate, db: Session = Depends(get_db)
+    entrega_id: int, entrega: EntregaCreate, db: AsyncSession = Depends(get_async_db)
 ):
     """
     Actualizar una entrega existente
     """
     try:
         # Buscar la entrega existente
-        entrega_existente = (
-            db.query(ProjectEntregaImplementaciones)
-            .filter(ProjectEntregaImplementaciones.id == entrega_id)
-            .first()
-        )
+        entrega_existente = await db.get(ProjectEntregaImplementaciones, entrega_id)
 
         if not entrega_existente:
             raise HTTPException(
@@ -236,10 +300,8 @@ async def actualizar_entrega(
             )
 
         # Verificar que la implementación existe
-        implementacion = (
-            db.query(ProjectImplementacionesClienteImple)
-            .filter(ProjectImplementacionesClienteImple.id == entrega.implementacion_id)
-            .first()
+        implementacion = await db.get(
+            ProjectImplementacionesClienteImple, entrega.implementacion_id
         )
 
         if not implementacion:
@@ -249,6 +311,7 @@ async def actualizar_entrega(
             )
 
         # Actualizar los campos básicos
+        implementacion_anterior = entrega_existente.implementacion_id
         entrega_existente.implementacion_id = entrega.implementacion_id
         if entrega.fecha_entrega:
             entrega_existente.fecha_entrega = datetime.fromisoformat(
@@ -310,15 +373,18 @@ async def actualizar_entrega(
             )
 
         # Guardar cambios
-        db.commit()
-        db.refresh(entrega_existente)
+        await db.commit()
+        await run_in_threadpool(
+            cache_pdf.invalidar_implementaciones,
+            {implementacion_anterior, entrega_existente.implementacion_id},
+        )
 
-        return entrega_existente
+        return await _cargar_entrega(db, entrega_id)
 
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al actualizar la entrega: {str(e)}",
@@ -326,15 +392,13 @@ async def actualizar_entrega(
 
 
 @router.delete("/{entrega_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def eliminar_entrega(entrega_id: int, db: Session = Depends(get_db)):
+async def eliminar_entrega(
+    entrega_id: int, db: AsyncSession = Depends(get_async_db)
+):
     """
     Eliminar una entrega
     """
-    entrega = (
-        db.query(ProjectEntregaImplementaciones)
-        .filter(ProjectEntregaImplementaciones.id == entrega_id)
-        .first()
-    )
+    entrega = await db.get(ProjectEntregaImplementaciones, entrega_id)
 
     if not entrega:
         raise HTTPException(
@@ -342,6 +406,7 @@ async def eliminar_entrega(entrega_id: int, db: Session = Depends(get_db)):
             detail=f"Entrega con ID {entrega_id} no encontrada",
         )
 
-    db.delete(entrega)
-    db.commit()
+    await db.delete(entrega)
+    await db.commit()
+    await run_in_threadpool(cache_pdf.invalidar_implementacion, entrega.implementacion_id)
     return None
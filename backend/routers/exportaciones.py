@@ -0,0 +1,121 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import Literal, Optional
+from datetime import datetime
+from pydantic import BaseModel
+import os
+from core.database import get_db
+from models.project_export_jobs import ProjectExportJob
+from models.project_implementaciones_clienteimple import (
+    ProjectImplementacionesClienteImple,
+)
+from services import exportaciones
+
+router = APIRouter(prefix="/exports", tags=["Exportaciones"])
+
+
+class ExportacionCreate(BaseModel):
+    tipo: Literal["excel", "pdf"]
+    implementacion_id: Optional[int] = None  # Requerido para tipo "pdf"
+
+
+class ExportacionOut(BaseModel):
+    id: int
+    tipo: str
+    implementacion_id: Optional[int] = None
+    estado: str
+    intentos: int
+    error: Optional[str] = None
+    archivo_nombre: Optional[str] = None
+    tamano: Optional[int] = None
+    creado_en: datetime
+    iniciado_en: Optional[datetime] = None
+    finalizado_en: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+def _obtener_job(db: Session, job_id: int) -> ProjectExportJob:
+    job = db.query(ProjectExportJob).filter_by(id=job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Exportación no encontrada")
+    return job
+
+
+@router.post("/", response_model=ExportacionOut, status_code=202)
+def crear_exportacion(data: ExportacionCreate, db: Session = Depends(get_db)):
+    """
+    Encola una exportación (Excel de implementaciones o PDF de una implementación).
+    La genera el worker de exportaciones; consultar el estado con GET /exports/{id}.
+    """
+    if data.tipo == "pdf":
+        if data.implementacion_id is None:
+            raise HTTPException(
+                status_code=400,
+                detail="implementacion_id es requerido para exportaciones PDF",
+            )
+        existe = (
+            db.query(ProjectImplementacionesClienteImple.id)
+            .filter_by(id=data.implementacion_id)
+            .first()
+        )
+        if not existe:
+            raise HTTPException(status_code=404, detail="Implementación no encontrada")
+
+    job = exportaciones.encolar_exportacion(db, data.tipo, data.implementacion_id)
+    print(f"📥 Exportación {job.id} ({job.tipo}) encolada")
+    return job
+
+
+@router.get("/{job_id}", response_model=ExportacionOut)
+def obtener_exportacion(job_id: int, db: Session = Depends(get_db)):
+    """Estado de una exportación"""
+    return _obtener_job(db, job_id)
+
+
+@router.get("/{job_id}/descargar")
+def descargar_exportacion(job_id: int, request: Request, db: Session = Depends(get_db)):
+    """
+    Descarga el archivo generado. Soporta la cabecera Range (un único rango)
+    para reanudar descargas interrumpidas.
+    """
+    job = _obtener_job(db, job_id)
+    if job.estado != exportaciones.ESTADO_COMPLETADO:
+        raise HTTPException(
+            status_code=409,
+            detail=f"La exportación no está lista (estado: {job.estado})",
+        )
+    if not job.archivo_ruta or not os.path.exists(job.archivo_ruta):
+        raise HTTPException(status_code=410, detail="El archivo de la exportación ya no existe")
+
+    tamano = os.path.getsize(job.archivo_ruta)
+    headers = {
+        "Content-Disposition": f'attachment; filename="{job.archivo_nombre}"',
+        "Accept-Ranges": "bytes",
+    }
+
+    try:
+        rango = exportaciones.parsear_rango(request.headers.get("range"), tamano)
+    except ValueError:
+        raise HTTPException(
+            status_code=416,
+            detail="Rango no satisfacible",
+            headers={"Content-Range": f"bytes */{tamano}"},
+        )
+
+    if rango is None:
+        inicio, fin, status_code = 0, tamano - 1, 200
+    else:
+        inicio, fin = rango
+        status_code = 206
+        headers["Content-Range"] = f"bytes {inicio}-{fin}/{tamano}"
+    headers["Content-Length"] = str(fin - inicio + 1)
+
+    return StreamingResponse(
+        exportaciones.iterar_rango(job.archivo_ruta, inicio, fin),
+        status_code=status_code,
+        media_type=job.media_type,
+        headers=headers,
+    )
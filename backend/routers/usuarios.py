@@ -6,6 +6,7 @@ from schemas.usuario import UsuarioCreate, UsuarioOut, UsuarioUpdate
 from app.models.usuario import Usuario
 from app.dependencies import get_db, solo_admin, get_current_user
 from core.security import hash_password
+from crud.historial_campanas import cache_nombres
 
 router = APIRouter(prefix="/usuarios", tags=["Usuarios"])
 
@@ -110,6 +111,8 @@ def actualizar_usuario(
 
     db.commit()
     db.refresh(usuario)
+    # El historial de campañas muestra el nombre desde esta caché
+    cache_nombres.invalidar(usuario_id)
     return usuario
 
 
@@ -122,3 +125,4 @@ def eliminar_usuario(
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     db.delete(usuario)
     db.commit()
+    cache_nombres.invalidar(usuario_id)
@@ -0,0 +1,250 @@
+"""
+Búsqueda de texto completo en las implementaciones y sus entregas.
+
+Cada tabla buscable (las 4 de secciones, las 4 de subsecciones y las
+entregas) tiene una columna generada `busqueda` (tsvector de sus columnas de
+texto con la configuración es_unaccent: español + unaccent) con índice GIN,
+ver la migración e4b8a1c3d6f2. PostgreSQL la recalcula en cada INSERT/UPDATE,
+así que los endpoints de escritura no tienen que hacer nada.
+
+La consulta se hace en dos pasos:
+1. Con los índices se encuentran las filas que coinciden, se suman sus
+   rankings por implementación y se toman las `limite` mejores.
+2. Solo para esas implementaciones se evalúa cada columna por separado para
+   saber qué campo coincidió, su ranking y el fragmento resaltado (HTML
+   escapado, con <b> en los términos encontrados).
+"""
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from crud.implementaciones import (
+    ATRIBUTOS,
+    MODELOS_SECCION,
+    MODELOS_SUBSECCION,
+    REGISTRO_CAMPOS,
+    SECCIONES,
+)
+from models.project_entregaImplementaciones import ProjectEntregaImplementaciones
+from models.project_implementacion_subseccion_personalizada import (
+    ProjectImplementacionSubseccionPersonalizada,
+)
+
+CONFIGURACION = "es_unaccent"
+
+# Atributos de texto libre de los campos de sección y subsecciones
+ATRIBUTOS_TEXTO = ("seguimiento", "responsable", "notas")
+
+MAX_RESULTADOS = 100
+MAX_COINCIDENCIAS_POR_RESULTADO = 5
+OPCIONES_FRAGMENTO = "StartSel=<b>, StopSel=</b>, MaxWords=20, MinWords=8, MaxFragments=1"
+
+
+def _literal(valor: str) -> str:
+    return "'" + valor.replace("'", "''") + "'"
+
+
+def _columnas_seccion(seccion: str) -> List[Tuple[str, str, str]]:
+    """(campo, atributo, columna) de texto de una tabla de sección"""
+    return [
+        (campo.campo, atributo, campo.columnas[ATRIBUTOS.index(atributo)])
+        for campo in REGISTRO_CAMPOS[seccion]
+        for atributo in ATRIBUTOS_TEXTO
+    ]
+
+
+COLUMNAS_SUBSECCION = ["nombre_subsesion", *ATRIBUTOS_TEXTO]
+
+COLUMNAS_ENTREGA = [
+    columna.key
+    for columna in ProjectEntregaImplementaciones.__table__.columns
+    if columna.type.python_type is str and columna.key != "estado_entrega"
+]
+
+
+def columnas_indexadas() -> Dict[str, List[str]]:
+    """Tabla -> columnas de texto que forman su columna busqueda"""
+    tablas = {}
+    for seccion in SECCIONES:
+        tablas[MODELOS_SECCION[seccion].__tablename__] = [
+            columna for _, _, columna in _columnas_seccion(seccion)
+        ]
+    for modelo in set(MODELOS_SUBSECCION.values()):
+        tablas[modelo.__tablename__] = COLUMNAS_SUBSECCION
+    tablas[ProjectEntregaImplementaciones.__tablename__] = COLUMNAS_ENTREGA
+    return tablas
+
+
+def _consulta_seccion(seccion: str) -> str:
+    tabla = MODELOS_SECCION[seccion].__tablename__
+    campos = _columnas_seccion(seccion)
+    valores = ", ".join(
+        f"({_literal(campo)}, {_literal(atributo)}, t.{columna})"
+        for campo, atributo, columna in campos
+    )
+    return f"""
+        SELECT t.cliente_implementacion_id AS implementacion_id, NULL::integer AS entrega_id,
+               {_literal(seccion)}::text AS seccion, c.campo, c.atributo, c.valor
+        FROM "{tabla}" t
+        CROSS JOIN LATERAL (VALUES {valores}) AS c(campo, atributo, valor)
+        WHERE t.busqueda @@ (SELECT consulta FROM q)
+          AND t.cliente_implementacion_id IN (SELECT implementacion_id FROM resultados)
+    """
+
+
+def _consulta_subseccion(modelo, seccion: str) -> str:
+    tabla = modelo.__tablename__
+    filtro = ""
+    if modelo is ProjectImplementacionSubseccionPersonalizada:
+        filtro = f"AND t.seccion = {_literal(seccion)}"
+    valores = ", ".join(
+        f"({_literal(atributo)}, t.{atributo})" for atributo in ATRIBUTOS_TEXTO
+    )
+    return f"""
+        SELECT t.cliente_implementacion_id AS implementacion_id, NULL::integer AS entrega_id,
+               {_literal(seccion)}::text AS seccion, t.nombre_subsesion AS campo, c.atributo,
+               c.valor
+        FROM "{tabla}" t
+        CROSS JOIN LATERAL (
+            VALUES ('nombre', t.nombre_subsesion), {valores}
+        ) AS c(atributo, valor)
+        WHERE t.busqueda @@ (SELECT consulta FROM q) {filtro}
+          AND t.cliente_implementacion_id IN (SELECT implementacion_id FROM resultados)
+    """
+
+
+def _consulta_entregas() -> str:
+    tabla = ProjectEntregaImplementaciones.__tablename__
+    valores = ", ".join(
+        f"({_literal(columna)}, t.{columna})" for columna in COLUMNAS_ENTREGA
+    )
+    return f"""
+        SELECT t.implementacion_id, t.id AS entrega_id, 'entregas'::text AS seccion,
+               c.campo, NULL::text AS atributo, c.valor
+        FROM "{tabla}" t
+        CROSS JOIN LATERAL (VALUES {valores}) AS c(campo, valor)
+        WHERE t.busqueda @@ (SELECT consulta FROM q)
+          AND t.implementacion_id IN (SELECT implementacion_id FROM resultados)
+    """
+
+
+def _filas_coincidentes() -> str:
+    """(implementacion_id, rank) de cada fila que coincide, usando los índices"""
+    entregas = ProjectEntregaImplementaciones.__tablename__
+    fuentes = [
+        (tabla, "implementacion_id" if tabla == entregas else "cliente_implementacion_id")
+        for tabla in columnas_indexadas()
+    ]
+    consultas = [
+        f"""
+        SELECT t.{columna_id} AS implementacion_id, ts_rank(t.busqueda, q.consulta) AS rank
+        FROM "{tabla}" t, q
+        WHERE t.busqueda @@ q.consulta
+        """
+        for tabla, columna_id in fuentes
+    ]
+    return "\nUNION ALL\n".join(consultas)
+
+
+def _construir_sql_busqueda() -> str:
+    fuentes = [_consulta_seccion(seccion) for seccion in SECCIONES]
+    fuentes += [
+        _consulta_subseccion(MODELOS_SUBSECCION[seccion], seccion) for seccion in SECCIONES
+    ]
+    fuentes.append(_consulta_entregas())
+    union = "\nUNION ALL\n".join(fuentes)
+    return f"""
+        WITH q AS (
+            SELECT websearch_to_tsquery('{CONFIGURACION}'::regconfig, :q) AS consulta
+        ),
+        filas_coincidentes AS ({_filas_coincidentes()}),
+        resultados AS (
+            SELECT implementacion_id, sum(rank) AS puntaje
+            FROM filas_coincidentes
+            GROUP BY implementacion_id
+            ORDER BY puntaje DESC, implementacion_id
+            LIMIT :limite
+        ),
+        filas AS ({union}),
+        coincidencias AS (
+            SELECT f.*, ts_rank(to_tsvector('{CONFIGURACION}'::regconfig, f.valor), q.consulta) AS rank
+            FROM filas f, q
+            WHERE f.valor <> ''
+              AND to_tsvector('{CONFIGURACION}'::regconfig, f.valor) @@ q.consulta
+        ),
+        totales AS (
+            SELECT implementacion_id, count(*) AS total_coincidencias
+            FROM coincidencias
+            GROUP BY implementacion_id
+        ),
+        mejores AS (
+            SELECT c.*, row_number() OVER (
+                PARTITION BY c.implementacion_id ORDER BY c.rank DESC
+            ) AS orden
+            FROM coincidencias c
+        )
+        SELECT r.implementacion_id, r.puntaje, t.total_coincidencias,
+               i.cliente, i.proceso, i.estado,
+               m.entrega_id, m.seccion, m.campo, m.atributo, m.rank,
+               ts_headline(
+                   '{CONFIGURACION}'::regconfig,
+                   replace(replace(replace(m.valor, '&', '&amp;'), '<', '&lt;'), '>', '&gt;'),
+                   q.consulta,
+                   '{OPCIONES_FRAGMENTO}'
+               ) AS fragmento
+        FROM resultados r
+        JOIN project_implementaciones_clienteimple i ON i.id = r.implementacion_id
+        JOIN totales t ON t.implementacion_id = r.implementacion_id
+        JOIN mejores m ON m.implementacion_id = r.implementacion_id
+                      AND m.orden <= {MAX_COINCIDENCIAS_POR_RESULTADO}
+        CROSS JOIN q
+        ORDER BY r.puntaje DESC, r.implementacion_id, m.rank DESC
+    """
+
+
+# Se arma una sola vez al importar el módulo
+SQL_BUSQUEDA = text(_construir_sql_busqueda())
+
+
+def _ruta(fila) -> str:
+    if fila.seccion == "entregas":
+        return f"entregas.{fila.entrega_id}.{fila.campo}"
+    return f"{fila.seccion}.{fila.campo}.{fila.atributo}"
+
+
+def buscar_implementaciones(db: Session, q: str, limite: int = 20) -> List[Dict[str, Any]]:
+    """
+    Busca `q` (sintaxis de websearch_to_tsquery: "frase exacta", OR, -excluir)
+    en los textos de las implementaciones y sus entregas.
+
+    Returns:
+        Implementaciones ordenadas por relevancia, cada una con sus mejores
+        coincidencias: ruta (seccion.campo.atributo o entregas.id.campo),
+        fragmento resaltado y ranking
+    """
+    resultados: Dict[int, Dict[str, Any]] = {}
+    for fila in db.execute(SQL_BUSQUEDA, {"q": q, "limite": limite}):
+        resultado = resultados.get(fila.implementacion_id)
+        if resultado is None:
+            resultado = resultados[fila.implementacion_id] = {
+                "id": fila.implementacion_id,
+                "cliente": fila.cliente,
+                "proceso": fila.proceso,
+                "estado": fila.estado,
+                "puntaje": round(float(fila.puntaje), 4),
+                "total_coincidencias": fila.total_coincidencias,
+                "coincidencias": [],
+            }
+        resultado["coincidencias"].append(
+            {
+                "ruta": _ruta(fila),
+                "seccion": fila.seccion,
+                "campo": fila.campo,
+                "atributo": fila.atributo,
+                "entrega_id": fila.entrega_id,
+                "fragmento": fila.fragmento,
+                "rank": round(float(fila.rank), 4),
+            }
+        )
+    return list(resultados.values())
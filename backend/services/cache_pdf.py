@@ -0,0 +1,185 @@
+"""
+Caché en disco de los PDF de entrega ya renderizados.
+
+Cada archivo se nombra {implementacion_id}_{entrega_id}_{huella}.pdf, donde la
+huella es un hash de todos los datos que aparecen en el PDF. Si los datos no
+cambian se reutilizan los bytes sin volver a ejecutar xhtml2pdf, y la huella
+sirve además como ETag para responder 304 al navegador.
+
+El tamaño total se limita a PDF_CACHE_MAX_BYTES expulsando los archivos usados
+hace más tiempo (LRU por mtime, que se actualiza en cada acierto). Al guardar
+en disco la caché se comparte entre los workers de gunicorn.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from core.config import PDF_CACHE_DIR, PDF_CACHE_MAX_BYTES
+from services import pdf_implementaciones
+
+# Cambiar al modificar la plantilla del PDF para descartar lo ya generado
+VERSION_PLANTILLA = "2"
+
+
+def huella_pdf(imp, entrega) -> str:
+    """
+    Hash de los datos que se imprimen en el PDF. Incluye la fecha del día
+    porque el formato imprime la fecha actual.
+    """
+    return huella_pdf_datos(
+        imp,
+        {
+            columna.key: getattr(entrega, columna.key)
+            for columna in entrega.__table__.columns
+        },
+    )
+
+
+def huella_pdf_datos(imp, datos_entrega: Dict[str, Any]) -> str:
+    """Igual que huella_pdf a partir de las columnas de la entrega en un dict"""
+    datos = {
+        "plantilla": VERSION_PLANTILLA,
+        "fecha": datetime.now().strftime("%d/%m/%Y"),
+        "cliente": imp.cliente,
+        "proceso": imp.proceso,
+        "entrega": datos_entrega,
+    }
+    serializado = json.dumps(datos, sort_keys=True, default=str)
+    return hashlib.sha256(serializado.encode("utf-8")).hexdigest()[:32]
+
+
+def etag_coincide(if_none_match: Optional[str], etag: str) -> bool:
+    """Compara la cabecera If-None-Match con el ETag (admite lista y *)"""
+    if not if_none_match:
+        return False
+    candidatos = [valor.strip() for valor in if_none_match.split(",")]
+    return "*" in candidatos or etag in candidatos or f"W/{etag}" in candidatos
+
+
+class CachePDF:
+    def __init__(self, directorio: str, max_bytes: int):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+
+    def _ruta(self, implementacion_id: int, entrega_id: int, huella: str) -> str:
+        return os.path.join(
+            self.directorio, f"{implementacion_id}_{entrega_id}_{huella}.pdf"
+        )
+
+    def obtener(
+        self, implementacion_id: int, entrega_id: int, huella: str
+    ) -> Optional[bytes]:
+        ruta = self._ruta(implementacion_id, entrega_id, huella)
+        try:
+            with open(ruta, "rb") as f:
+                contenido = f.read()
+            # Marcar como usado recientemente para el LRU
+            os.utime(ruta)
+            return contenido
+        except FileNotFoundError:
+            return None
+
+    def guardar(
+        self, implementacion_id: int, entrega_id: int, huella: str, contenido: bytes
+    ):
+        if len(contenido) > self.max_bytes:
+            return
+        os.makedirs(self.directorio, exist_ok=True)
+        # Escritura atómica: otro worker nunca ve un archivo a medias
+        descriptor, temporal = tempfile.mkstemp(dir=self.directorio, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as f:
+                f.write(contenido)
+            os.replace(temporal, self._ruta(implementacion_id, entrega_id, huella))
+        except Exception:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            raise
+        self._expulsar()
+
+    def _archivos(self):
+        try:
+            with os.scandir(self.directorio) as entradas:
+                for entrada in entradas:
+                    if entrada.is_file() and entrada.name.endswith(".pdf"):
+                        yield entrada
+        except FileNotFoundError:
+            return
+
+    def _expulsar(self):
+        """Elimina los archivos menos usados hasta quedar dentro del presupuesto"""
+        archivos = []
+        total = 0
+        for entrada in self._archivos():
+            try:
+                info = entrada.stat()
+            except FileNotFoundError:
+                continue
+            archivos.append((info.st_mtime, info.st_size, entrada.path))
+            total += info.st_size
+        if total <= self.max_bytes:
+            return
+
+        archivos.sort()
+        for _, tamano, ruta in archivos:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(ruta)
+            except FileNotFoundError:
+                pass
+            total -= tamano
+
+    def invalidar(self, implementacion_id: int):
+        """Elimina todos los PDF en caché de una implementación"""
+        self.invalidar_varias([implementacion_id])
+
+    def invalidar_varias(self, implementacion_ids: Iterable[int]):
+        """Elimina los PDF en caché de varias implementaciones recorriendo el directorio una vez"""
+        ids = {str(id_) for id_ in implementacion_ids}
+        if not ids:
+            return
+        for entrada in self._archivos():
+            if entrada.name.split("_", 1)[0] in ids:
+                try:
+                    os.remove(entrada.path)
+                except FileNotFoundError:
+                    pass
+
+
+cache_pdf = CachePDF(PDF_CACHE_DIR, PDF_CACHE_MAX_BYTES)
+
+
+def obtener_pdf(imp, entrega, huella: Optional[str] = None) -> Tuple[bytes, str]:
+    """
+    Devuelve el PDF de la entrega desde la caché o renderizándolo.
+
+    Returns:
+        (bytes del PDF, huella)
+    """
+    huella = huella or huella_pdf(imp, entrega)
+    contenido = cache_pdf.obtener(imp.id, entrega.id, huella)
+    if contenido is None:
+        contenido = pdf_implementaciones.renderizar_pdf(imp, entrega)
+        try:
+            cache_pdf.guardar(imp.id, entrega.id, huella, contenido)
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar el PDF en caché: {e}")
+    return contenido, huella
+
+
+def invalidar_implementacion(implementacion_id: int):
+    try:
+        cache_pdf.invalidar(implementacion_id)
+    except OSError as e:
+        print(f"⚠️ No se pudo invalidar la caché de PDF: {e}")
+
+
+def invalidar_implementaciones(implementacion_ids: Iterable[int]):
+    try:
+        cache_pdf.invalidar_varias(implementacion_ids)
+    except OSError as e:
+        print(f"⚠️ No se pudo invalidar la caché de PDF: {e}")
@@ -0,0 +1,181 @@
+"""
+Comparación de las entregas de una implementación.
+
+Las columnas de las entregas se comparan dentro de PostgreSQL (se despliegan
+con un LATERAL VALUES en filas campo/valor), así que solo salen de la base de
+datos los campos que cambiaron. Los textos vacíos y los NULL se consideran
+iguales: el formulario guarda "" en los campos de las secciones enviadas y
+deja NULL los demás.
+
+- comparar_entregas: los valores anterior/nuevo de cada campo modificado
+  entre dos entregas (por defecto la última contra la anterior).
+- linea_tiempo_entregas: para cada entrega, qué campos cambiaron respecto de
+  la anterior (solo los nombres, sin los textos), con una función de ventana
+  lag() por campo en una sola consulta.
+"""
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from crud.entregas import CAMPOS_ENTREGA
+from models.project_entregaImplementaciones import ProjectEntregaImplementaciones
+from services.pdf_implementaciones import SECCIONES_ENTREGA
+
+CAMPOS_COMPARADOS = ("estado_entrega", *CAMPOS_ENTREGA)
+
+# Sección y etiqueta de cada campo tal como aparecen en el PDF de entrega
+_ETIQUETAS = {
+    columna: (seccion, etiqueta)
+    for seccion, filas in SECCIONES_ENTREGA
+    for etiqueta, columna in filas
+}
+_ETIQUETAS["estado_entrega"] = (None, "Estado de la entrega")
+# Se captura en el formulario pero el PDF no lo imprime
+_ETIQUETAS["entrega_resguardo"] = ("TECNOLOGIA", "Entrega y resguardo de grabaciones")
+
+_TABLA = ProjectEntregaImplementaciones.__tablename__
+
+
+def _valores(*alias: str) -> str:
+    """Filas (orden, campo, valor de cada alias) del LATERAL VALUES"""
+    return ", ".join(
+        f"({orden}, '{campo}', " + ", ".join(f"{a}.{campo}" for a in alias) + ")"
+        for orden, campo in enumerate(CAMPOS_COMPARADOS)
+    )
+
+
+SQL_ENTREGAS = text(
+    f"""
+    SELECT id, fecha_entrega, estado_entrega,
+           lag(id) OVER (ORDER BY fecha_entrega, id) AS anterior_id
+    FROM "{_TABLA}"
+    WHERE implementacion_id = :implementacion_id
+    ORDER BY fecha_entrega, id
+    """
+)
+
+SQL_COMPARACION = text(
+    f"""
+    SELECT c.campo, c.anterior, c.nuevo
+    FROM "{_TABLA}" a
+    JOIN "{_TABLA}" b ON b.id = :hasta
+    CROSS JOIN LATERAL (VALUES {_valores("a", "b")}) AS c(orden, campo, anterior, nuevo)
+    WHERE a.id = :desde
+      AND coalesce(c.anterior, '') <> coalesce(c.nuevo, '')
+    ORDER BY c.orden
+    """
+)
+
+SQL_LINEA_TIEMPO = text(
+    f"""
+    WITH valores AS (
+        SELECT t.id, t.fecha_entrega, t.estado_entrega, c.orden, c.campo,
+               coalesce(c.valor, '') AS valor,
+               lag(coalesce(c.valor, '')) OVER (
+                   PARTITION BY c.campo ORDER BY t.fecha_entrega, t.id
+               ) AS valor_anterior,
+               lag(t.id) OVER (
+                   PARTITION BY c.campo ORDER BY t.fecha_entrega, t.id
+               ) AS anterior_id
+        FROM "{_TABLA}" t
+        CROSS JOIN LATERAL (VALUES {_valores("t")}) AS c(orden, campo, valor)
+        WHERE t.implementacion_id = :implementacion_id
+    )
+    SELECT id, fecha_entrega, estado_entrega, max(anterior_id) AS anterior_id,
+           array_remove(
+               array_agg(
+                   CASE WHEN valor <> valor_anterior THEN campo END ORDER BY orden
+               ),
+               NULL
+           ) AS campos_modificados
+    FROM valores
+    GROUP BY id, fecha_entrega, estado_entrega
+    ORDER BY fecha_entrega, id
+    """
+)
+
+
+class EntregaNoEncontrada(LookupError):
+    """La entrega pedida no existe o no pertenece a la implementación"""
+
+
+def _referencia(fila) -> Dict[str, Any]:
+    return {
+        "id": fila.id,
+        "fecha_entrega": fila.fecha_entrega,
+        "estado_entrega": fila.estado_entrega,
+    }
+
+
+def comparar_entregas(
+    db: Session,
+    implementacion_id: int,
+    desde: Optional[int] = None,
+    hasta: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Compara dos entregas de la implementación campo por campo. Sin `hasta`
+    se usa la última entrega y sin `desde` la inmediatamente anterior a
+    `hasta` (por fecha_entrega).
+
+    Raises:
+        EntregaNoEncontrada: si alguna entrega no existe en la implementación
+            o no hay una entrega anterior con la que comparar
+
+    Returns:
+        desde, hasta (id, fecha y estado) y la lista de cambios con
+        seccion, etiqueta, anterior y nuevo
+    """
+    filas = db.execute(SQL_ENTREGAS, {"implementacion_id": implementacion_id})
+    entregas = {fila.id: fila for fila in filas}
+    if not entregas:
+        raise EntregaNoEncontrada("No hay entregas registradas para esta implementación")
+
+    if hasta is None:
+        hasta = next(reversed(entregas))
+    if hasta not in entregas:
+        raise EntregaNoEncontrada(f"La entrega {hasta} no pertenece a la implementación")
+    if desde is None:
+        desde = entregas[hasta].anterior_id
+        if desde is None:
+            raise EntregaNoEncontrada(
+                f"La entrega {hasta} es la primera: no hay entrega anterior para comparar"
+            )
+    if desde not in entregas:
+        raise EntregaNoEncontrada(f"La entrega {desde} no pertenece a la implementación")
+
+    cambios = []
+    for fila in db.execute(SQL_COMPARACION, {"desde": desde, "hasta": hasta}):
+        seccion, etiqueta = _ETIQUETAS.get(fila.campo, (None, fila.campo))
+        cambios.append(
+            {
+                "campo": fila.campo,
+                "seccion": seccion,
+                "etiqueta": etiqueta,
+                "anterior": fila.anterior,
+                "nuevo": fila.nuevo,
+            }
+        )
+    return {
+        "desde": _referencia(entregas[desde]),
+        "hasta": _referencia(entregas[hasta]),
+        "cambios": cambios,
+    }
+
+
+def linea_tiempo_entregas(db: Session, implementacion_id: int) -> List[Dict[str, Any]]:
+    """
+    Entregas de la implementación de la más antigua a la más reciente, cada
+    una con los campos que cambiaron respecto de la anterior (la primera no
+    tiene anterior y su lista va vacía).
+    """
+    return [
+        {
+            **_referencia(fila),
+            "anterior_id": fila.anterior_id,
+            "campos_modificados": list(fila.campos_modificados),
+            "total_campos_modificados": len(fila.campos_modificados),
+        }
+        for fila in db.execute(SQL_LINEA_TIEMPO, {"implementacion_id": implementacion_id})
+    ]
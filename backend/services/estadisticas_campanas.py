@@ -0,0 +1,109 @@
+"""
+Estadísticas de los contadores superiores del tablero de campañas.
+
+Todos los conteos salen de una sola consulta: clientes corporativos y
+contactos como subconsultas escalares, y campañas con GROUP BY tipo. Los
+valores de TipoCampaña se recorren desde el enum, así que un tipo nuevo
+aparece sin cambiar código (con 0 si todavía no tiene campañas).
+
+El resultado se guarda en memoria del proceso y se invalida desde los
+endpoints que crean, modifican o eliminan campañas, contactos y clientes
+corporativos. Como cada worker de gunicorn tiene su propia copia, el valor
+además expira a los ESTADISTICAS_CACHE_TTL segundos para acotar lo
+desactualizado que puede quedar un worker que no recibió la escritura.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import func, literal, select, true
+from sqlalchemy.orm import Session
+
+from app.models.campana import Campaña, TipoCampaña
+from app.models.cliente import Cliente
+from app.models.cliente_corporativo import ClienteCorporativo
+from core.config import ESTADISTICAS_CACHE_TTL
+
+
+def _construir_consulta():
+    por_tipo = (
+        select(Campaña.tipo, func.count().label("total"))
+        .group_by(Campaña.tipo)
+        .subquery()
+    )
+    # Fila base para que la consulta devuelva los totales aunque no haya campañas
+    base = select(literal(1).label("uno")).subquery()
+    return select(
+        select(func.count())
+        .select_from(ClienteCorporativo)
+        .scalar_subquery()
+        .label("clientes_corporativos"),
+        select(func.count()).select_from(Cliente).scalar_subquery().label("contactos"),
+        por_tipo.c.tipo,
+        por_tipo.c.total,
+    ).select_from(base.outerjoin(por_tipo, true()))
+
+
+CONSULTA_ESTADISTICAS = _construir_consulta()
+
+
+def calcular_estadisticas(db: Session) -> Dict[str, Any]:
+    """Calcula las estadísticas con una sola consulta (sin caché)"""
+    filas = db.execute(CONSULTA_ESTADISTICAS).all()
+    por_servicio = {tipo.value: 0 for tipo in TipoCampaña}
+    for fila in filas:
+        if fila.tipo is not None:
+            por_servicio[fila.tipo.value] = fila.total
+    return {
+        "total_clientes_corporativos": filas[0].clientes_corporativos,
+        "total_contactos": filas[0].contactos,
+        "total_campañas": sum(por_servicio.values()),
+        "por_servicio": por_servicio,
+    }
+
+
+class CacheEstadisticas:
+    """
+    Último resultado calculado, válido hasta que se invalida o expira.
+
+    Si se invalida mientras otra petición está calculando, ese resultado no
+    se guarda (podría no incluir la escritura que provocó la invalidación).
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._valor: Optional[Dict[str, Any]] = None
+        self._expira = 0.0
+        self._generacion = 0
+
+    def obtener(self, calcular: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        with self._lock:
+            if self._valor is not None and time.monotonic() < self._expira:
+                return self._valor
+            generacion = self._generacion
+
+        valor = calcular()
+        with self._lock:
+            if generacion == self._generacion:
+                self._valor = valor
+                self._expira = time.monotonic() + self.ttl
+        return valor
+
+    def invalidar(self):
+        with self._lock:
+            self._generacion += 1
+            self._valor = None
+
+
+cache_estadisticas = CacheEstadisticas(ESTADISTICAS_CACHE_TTL)
+
+
+def obtener_estadisticas(db: Session) -> Dict[str, Any]:
+    """Estadísticas del tablero; sin consultas si están en caché"""
+    return cache_estadisticas.obtener(lambda: calcular_estadisticas(db))
+
+
+def invalidar():
+    """Descarta las estadísticas en caché tras una escritura"""
+    cache_estadisticas.invalidar()
@@ -0,0 +1,257 @@
+"""
+Exportación a Excel de implementaciones con memoria constante.
+
+Las implementaciones se recorren por lotes (paginación keyset por id) y cada
+tabla de sección/subsección se consulta una vez por lote. Las filas se escriben
+con el modo constant_memory de xlsxwriter en un archivo temporal que luego se
+envía por partes con StreamingResponse.
+"""
+import os
+import tempfile
+from typing import Dict, Iterator, List, Tuple
+
+import xlsxwriter
+from sqlalchemy.orm import Session
+
+from crud.implementaciones import (
+    ATRIBUTOS,
+    CODECS,
+    MODELOS_SECCION,
+    MODELOS_SUBSECCION,
+    REGISTRO_CAMPOS,
+    SECCIONES,
+)
+from models.project_implementaciones_clienteimple import (
+    ProjectImplementacionesClienteImple,
+)
+from models.project_implementacion_subseccion_personalizada import (
+    ProjectImplementacionSubseccionPersonalizada,
+)
+
+MEDIA_TYPE_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+TAMANO_LOTE = 500
+TAMANO_CHUNK = 64 * 1024
+
+COLUMNAS_BASICAS = ["ID", "Cliente", "Proceso", "Estado General"]
+
+PREFIJOS_SECCION = {
+    "contractual": "CONTRACTUAL",
+    "talento_humano": "TALENTO HUMANO",
+    "procesos": "PROCESOS",
+    "tecnologia": "TECNOLOGÍA",
+}
+
+ETIQUETAS_ATRIBUTOS = {
+    "seguimiento": "Seguimiento",
+    "estado": "Estado",
+    "responsable": "Responsable",
+    "notas": "Notas",
+}
+
+
+def _encabezado(seccion: str, nombre: str, atributo: str) -> str:
+    return f"{PREFIJOS_SECCION[seccion]} - {nombre} ({ETIQUETAS_ATRIBUTOS[atributo]})"
+
+
+# Encabezados de los campos predefinidos de cada sección, en el orden de CODECS[seccion].columnas
+_ENCABEZADOS_PREDEFINIDOS = {
+    seccion: tuple(
+        _encabezado(seccion, campo.etiqueta, atributo)
+        for campo in REGISTRO_CAMPOS[seccion]
+        for atributo in ATRIBUTOS
+    )
+    for seccion in SECCIONES
+}
+
+
+def _consulta_subsecciones(db: Session, seccion: str):
+    modelo_sub = MODELOS_SUBSECCION[seccion]
+    consulta = db.query(modelo_sub)
+    if modelo_sub is ProjectImplementacionSubseccionPersonalizada:
+        consulta = consulta.filter(modelo_sub.seccion == seccion)
+    return consulta
+
+
+def calcular_columnas(db: Session) -> List[str]:
+    """
+    Calcula los encabezados del Excel antes de escribir las filas, con el mismo
+    orden que la versión basada en DataFrame: columnas básicas y luego, por
+    sección, todas sus columnas ordenadas alfabéticamente.
+
+    Los campos predefinidos aparecen si alguna implementación tiene registro en
+    la sección y las subsecciones personalizadas se obtienen con un DISTINCT.
+    """
+    columnas = list(COLUMNAS_BASICAS)
+    for seccion in SECCIONES:
+        modelo = MODELOS_SECCION[seccion]
+        cols_seccion = set()
+        if db.query(modelo.id).first() is not None:
+            cols_seccion.update(_ENCABEZADOS_PREDEFINIDOS[seccion])
+
+        modelo_sub = MODELOS_SUBSECCION[seccion]
+        nombres = (
+            _consulta_subsecciones(db, seccion)
+            .with_entities(modelo_sub.nombre_subsesion)
+            .distinct()
+        )
+        for (nombre,) in nombres:
+            for atributo in ATRIBUTOS:
+                cols_seccion.add(_encabezado(seccion, nombre, atributo))
+
+        columnas.extend(sorted(cols_seccion))
+    return columnas
+
+
+def _filas_lote(
+    db: Session, implementaciones: list, indice: Dict[str, int]
+) -> Iterator[list]:
+    """Genera las filas de un lote de implementaciones con 8 consultas en total."""
+    ids = [imp.id for imp in implementaciones]
+    filas = {}
+    for imp in implementaciones:
+        fila = [None] * len(indice)
+        fila[0] = imp.id
+        fila[1] = imp.cliente
+        fila[2] = imp.proceso
+        fila[3] = imp.estado or ""
+        filas[imp.id] = fila
+
+    for seccion in SECCIONES:
+        modelo = MODELOS_SECCION[seccion]
+        codec = CODECS[seccion]
+        posiciones = [indice[encabezado] for encabezado in _ENCABEZADOS_PREDEFINIDOS[seccion]]
+        vistos = set()
+        registros = (
+            db.query(modelo)
+            .filter(modelo.cliente_implementacion_id.in_(ids))
+            .order_by(modelo.id)
+        )
+        for registro in registros:
+            if registro.cliente_implementacion_id in vistos:
+                continue
+            vistos.add(registro.cliente_implementacion_id)
+            fila = filas[registro.cliente_implementacion_id]
+            for posicion, valor in zip(posiciones, codec.valores(registro)):
+                fila[posicion] = valor or ""
+
+        modelo_sub = MODELOS_SUBSECCION[seccion]
+        subsecciones = (
+            _consulta_subsecciones(db, seccion)
+            .filter(modelo_sub.cliente_implementacion_id.in_(ids))
+            .order_by(modelo_sub.id)
+        )
+        for subseccion in subsecciones:
+            fila = filas[subseccion.cliente_implementacion_id]
+            for atributo in ATRIBUTOS:
+                posicion = indice[
+                    _encabezado(seccion, subseccion.nombre_subsesion, atributo)
+                ]
+                fila[posicion] = getattr(subseccion, atributo) or ""
+
+    for imp in implementaciones:
+        yield filas[imp.id]
+
+
+def escribir_excel(db: Session, destino) -> Tuple[int, int]:
+    """
+    Escribe el Excel de implementaciones en `destino` (ruta o archivo).
+
+    Returns:
+        (total de implementaciones, total de columnas)
+    """
+    columnas = calcular_columnas(db)
+    indice = {columna: posicion for posicion, columna in enumerate(columnas)}
+    anchos = [len(columna) for columna in columnas]
+
+    workbook = xlsxwriter.Workbook(destino, {"constant_memory": True})
+    try:
+        worksheet = workbook.add_worksheet("Implementaciones")
+        header_format = workbook.add_format(
+            {
+                "bold": True,
+                "bg_color": "#4F46E5",
+                "font_color": "white",
+                "border": 1,
+                "align": "center",
+                "valign": "vcenter",
+            }
+        )
+        worksheet.write_row(0, 0, columnas, header_format)
+
+        fila_excel = 1
+        ultimo_id = None
+        while True:
+            consulta = db.query(ProjectImplementacionesClienteImple)
+            if ultimo_id is not None:
+                consulta = consulta.filter(
+                    ProjectImplementacionesClienteImple.id > ultimo_id
+                )
+            lote = (
+                consulta.order_by(ProjectImplementacionesClienteImple.id)
+                .limit(TAMANO_LOTE)
+                .all()
+            )
+            if not lote:
+                break
+            ultimo_id = lote[-1].id
+
+            for fila in _filas_lote(db, lote, indice):
+                for posicion, valor in enumerate(fila):
+                    if valor is None:
+                        continue
+                    worksheet.write(fila_excel, posicion, valor)
+                    largo = len(str(valor))
+                    if largo > anchos[posicion]:
+                        anchos[posicion] = largo
+                fila_excel += 1
+
+            # Liberar los objetos del lote ya escrito
+            db.expunge_all()
+
+        # Ajustar ancho de columnas (se aplica al cerrar el workbook)
+        for posicion, ancho in enumerate(anchos):
+            worksheet.set_column(posicion, posicion, min(ancho + 2, 50))
+    finally:
+        workbook.close()
+
+    return fila_excel - 1, len(columnas)
+
+
+def generar_excel_temporal(db: Session) -> Tuple[str, int, int]:
+    """
+    Genera el Excel en un archivo temporal en disco.
+
+    Returns:
+        (ruta del archivo, total de implementaciones, total de columnas)
+    """
+    descriptor, ruta = tempfile.mkstemp(prefix="implementaciones_", suffix=".xlsx")
+    os.close(descriptor)
+    try:
+        total, total_columnas = escribir_excel(db, ruta)
+    except Exception:
+        os.remove(ruta)
+        raise
+    return ruta, total, total_columnas
+
+
+def iterar_archivo(ruta: str) -> Iterator[bytes]:
+    """Lee el archivo por partes para StreamingResponse."""
+    with open(ruta, "rb") as f:
+        while True:
+            chunk = f.read(TAMANO_CHUNK)
+            if not chunk:
+                break
+            yield chunk
+
+
+def eliminar_archivo(ruta: str):
+    """
+    Elimina el archivo temporal. Se usa como BackgroundTask de la respuesta:
+    corre al terminar el envío aunque el cliente se desconecte (incluso antes
+    de leer el primer chunk, cuando el generador nunca llega a ejecutarse).
+    """
+    try:
+        os.remove(ruta)
+    except FileNotFoundError:
+        pass
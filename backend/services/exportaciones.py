@@ -0,0 +1,503 @@
+"""
+Cola de exportaciones respaldada por PostgreSQL.
+
+La API solo inserta un registro en project_export_jobs y responde con su id.
+El worker (export_worker.py) reclama trabajos pendientes con
+SELECT ... FOR UPDATE SKIP LOCKED, de modo que varias instancias pueden
+consumir la misma cola sin tomar dos veces el mismo trabajo, y ejecuta la
+generación en un pool de procesos para no bloquear el bucle de reclamo.
+Mientras procesa un trabajo el worker renueva su lease (lease_hasta); solo
+los trabajos con el lease vencido se devuelven a la cola. Cada ejecución se
+identifica por (worker, intentos) y solo ella puede registrar su resultado.
+El archivo generado queda en EXPORTS_DIR y se descarga con soporte de Range.
+Los trabajos terminados y sus archivos se borran pasadas
+EXPORTS_RETENCION_HORAS horas.
+"""
+import os
+import re
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.orm import Session
+
+from core.config import EXPORTS_DIR, EXPORTS_RETENCION_HORAS
+from core.database import SessionLocal, engine
+from models.project_export_jobs import ProjectExportJob
+from models.project_implementaciones_clienteimple import (
+    ProjectImplementacionesClienteImple,
+)
+from services import cache_pdf, excel_implementaciones, pdf_implementaciones
+
+TIPOS = ("excel", "pdf")
+
+ESTADO_PENDIENTE = "pendiente"
+ESTADO_EN_PROCESO = "en_proceso"
+ESTADO_COMPLETADO = "completado"
+ESTADO_ERROR = "error"
+
+MAX_INTENTOS = 3
+# Un trabajo en proceso cuyo lease venció se considera abandonado (worker
+# caído o colgado). El worker renueva el lease cada RENOVACION_LEASE segundos.
+DURACION_LEASE = timedelta(minutes=2)
+RENOVACION_LEASE = 30
+# Trabajos en proceso sin lease (reclamados antes de existir la columna)
+TIMEOUT_TRABAJO = timedelta(minutes=15)
+INTERVALO_SONDEO = 1.0
+# Segundos entre recuperaciones de trabajos abandonados y limpiezas
+INTERVALO_MANTENIMIENTO = 60
+RETENCION_EXPORTACIONES = timedelta(hours=EXPORTS_RETENCION_HORAS)
+# Trabajos vencidos que se borran por limpieza
+LOTE_LIMPIEZA = 500
+
+TAMANO_CHUNK = excel_implementaciones.TAMANO_CHUNK
+
+
+class ErrorExportacion(Exception):
+    """Error esperado al generar una exportación (se guarda en el trabajo)"""
+
+
+def encolar_exportacion(
+    db: Session, tipo: str, implementacion_id: Optional[int] = None
+) -> ProjectExportJob:
+    job = ProjectExportJob(
+        tipo=tipo,
+        implementacion_id=implementacion_id,
+        estado=ESTADO_PENDIENTE,
+        intentos=0,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def reclamar_trabajo(db: Session, worker: str) -> Optional[Tuple[int, int]]:
+    """
+    Toma el trabajo pendiente más antiguo, lo marca en_proceso y le da un
+    lease de DURACION_LEASE.
+
+    FOR UPDATE SKIP LOCKED hace que otros workers ignoren la fila mientras
+    esta transacción la tiene bloqueada, en lugar de esperarla.
+
+    Returns:
+        (id, intento) del trabajo reclamado o None si la cola está vacía
+    """
+    job = (
+        db.query(ProjectExportJob)
+        .filter(ProjectExportJob.estado == ESTADO_PENDIENTE)
+        .order_by(ProjectExportJob.id)
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+    if not job:
+        db.rollback()
+        return None
+
+    job.estado = ESTADO_EN_PROCESO
+    job.intentos = (job.intentos or 0) + 1
+    job.worker = worker
+    job.iniciado_en = datetime.now()
+    job.lease_hasta = job.iniciado_en + DURACION_LEASE
+    job.error = None
+    db.commit()
+    return job.id, job.intentos
+
+
+def renovar_leases(db: Session, worker: str, ejecuciones: Iterable[Tuple[int, int]]) -> int:
+    """
+    Extiende el lease de los trabajos (id, intento) que este worker tiene en
+    proceso. Los que ya fueron devueltos a la cola no se tocan.
+
+    Returns:
+        Número de trabajos renovados
+    """
+    ejecuciones = list(ejecuciones)
+    if not ejecuciones:
+        return 0
+    renovados = (
+        db.query(ProjectExportJob)
+        .filter(
+            tuple_(ProjectExportJob.id, ProjectExportJob.intentos).in_(ejecuciones),
+            ProjectExportJob.worker == worker,
+            ProjectExportJob.estado == ESTADO_EN_PROCESO,
+        )
+        .update(
+            {ProjectExportJob.lease_hasta: datetime.now() + DURACION_LEASE},
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return renovados
+
+
+def recuperar_trabajos_abandonados(db: Session) -> int:
+    """
+    Devuelve a la cola los trabajos en_proceso cuyo lease venció (el worker
+    se reinició o dejó de renovarlo). Tras MAX_INTENTOS se marcan como error.
+
+    Returns:
+        Número de trabajos recuperados o descartados
+    """
+    ahora = datetime.now()
+    abandonados = (
+        db.query(ProjectExportJob)
+        .filter(
+            ProjectExportJob.estado == ESTADO_EN_PROCESO,
+            or_(
+                ProjectExportJob.lease_hasta < ahora,
+                and_(
+                    ProjectExportJob.lease_hasta.is_(None),
+                    ProjectExportJob.iniciado_en < ahora - TIMEOUT_TRABAJO,
+                ),
+            ),
+        )
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    for job in abandonados:
+        if job.intentos >= MAX_INTENTOS:
+            job.estado = ESTADO_ERROR
+            job.error = "El trabajo superó el número máximo de intentos"
+            job.finalizado_en = datetime.now()
+        else:
+            job.estado = ESTADO_PENDIENTE
+        job.lease_hasta = None
+    db.commit()
+    return len(abandonados)
+
+
+def limpiar_exportaciones_antiguas(db: Session) -> Tuple[int, int]:
+    """
+    Borra los trabajos completados o con error hace más de
+    RETENCION_EXPORTACIONES y los archivos de EXPORTS_DIR de esa antigüedad
+    que ya no pertenecen a ningún trabajo (incluye los de trabajos que
+    fallaron a mitad de la generación).
+
+    Returns:
+        (trabajos borrados, archivos borrados)
+    """
+    limite = datetime.now() - RETENCION_EXPORTACIONES
+    vencidos = [
+        job_id
+        for (job_id,) in db.query(ProjectExportJob.id)
+        .filter(
+            ProjectExportJob.estado.in_((ESTADO_COMPLETADO, ESTADO_ERROR)),
+            ProjectExportJob.finalizado_en < limite,
+        )
+        .order_by(ProjectExportJob.id)
+        .limit(LOTE_LIMPIEZA)
+        .with_for_update(skip_locked=True)
+    ]
+    if vencidos:
+        db.query(ProjectExportJob).filter(ProjectExportJob.id.in_(vencidos)).delete(
+            synchronize_session=False
+        )
+    db.commit()
+
+    if not os.path.isdir(EXPORTS_DIR):
+        return len(vencidos), 0
+    antiguos = [
+        entrada.path
+        for entrada in os.scandir(EXPORTS_DIR)
+        if entrada.name.startswith("export_")
+        and entrada.is_file()
+        and entrada.stat().st_mtime < limite.timestamp()
+    ]
+    en_uso = set()
+    if antiguos:
+        en_uso = {
+            ruta
+            for (ruta,) in db.query(ProjectExportJob.archivo_ruta).filter(
+                ProjectExportJob.archivo_ruta.in_(antiguos)
+            )
+        }
+        db.rollback()  # no dejar la transacción de la consulta abierta
+
+    archivos = 0
+    for ruta in antiguos:
+        if ruta in en_uso:
+            continue
+        try:
+            os.remove(ruta)
+            archivos += 1
+        except OSError as e:
+            print(f"⚠️ No se pudo borrar la exportación {ruta}: {e}")
+    return len(vencidos), archivos
+
+
+def _ruta_artefacto(job_id: int, intento: int, extension: str) -> str:
+    """Un archivo por intento: una ejecución abandonada no pisa el de la siguiente"""
+    os.makedirs(EXPORTS_DIR, exist_ok=True)
+    return os.path.join(EXPORTS_DIR, f"export_{job_id}_{intento}.{extension}")
+
+
+def _generar_excel(db: Session, job: ProjectExportJob, intento: int) -> Dict[str, Any]:
+    ruta = _ruta_artefacto(job.id, intento, "xlsx")
+    total, total_columnas = excel_implementaciones.escribir_excel(db, ruta)
+    print(f"📊 Exportación {job.id}: {total} implementaciones, {total_columnas} columnas")
+    fecha_actual = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return {
+        "archivo_ruta": ruta,
+        "archivo_nombre": f"implementaciones_completo_{fecha_actual}.xlsx",
+        "media_type": excel_implementaciones.MEDIA_TYPE_XLSX,
+    }
+
+
+def _generar_pdf(db: Session, job: ProjectExportJob, intento: int) -> Dict[str, Any]:
+    imp = (
+        db.query(ProjectImplementacionesClienteImple)
+        .filter_by(id=job.implementacion_id)
+        .first()
+    )
+    if not imp:
+        raise ErrorExportacion("Implementación no encontrada")
+
+    entrega = pdf_implementaciones.obtener_ultima_entrega(db, imp.id)
+    if not entrega:
+        raise ErrorExportacion("No hay entregas registradas para esta implementación")
+
+    contenido, _ = cache_pdf.obtener_pdf(imp, entrega)
+    ruta = _ruta_artefacto(job.id, intento, "pdf")
+    with open(ruta, "wb") as f:
+        f.write(contenido)
+    return {
+        "archivo_ruta": ruta,
+        "archivo_nombre": pdf_implementaciones.nombre_archivo_pdf(imp),
+        "media_type": pdf_implementaciones.MEDIA_TYPE_PDF,
+    }
+
+
+GENERADORES = {
+    "excel": _generar_excel,
+    "pdf": _generar_pdf,
+}
+
+
+def _inicializar_proceso():
+    # Los procesos hijos no deben reutilizar las conexiones heredadas del padre
+    engine.dispose(close=False)
+    pdf_implementaciones.precargar_recursos()
+
+
+def ejecutar_trabajo(job_id: int, intento: int) -> Dict[str, Any]:
+    """
+    Genera el artefacto de un trabajo. Se ejecuta dentro del pool de procesos
+    con su propia sesión de base de datos.
+
+    Returns:
+        Datos del artefacto (ruta, nombre, media_type, tamaño)
+    """
+    db = SessionLocal()
+    try:
+        job = db.query(ProjectExportJob).filter_by(id=job_id).first()
+        if not job:
+            raise ErrorExportacion(f"Trabajo {job_id} no encontrado")
+        resultado = GENERADORES[job.tipo](db, job, intento)
+        resultado["tamano"] = os.path.getsize(resultado["archivo_ruta"])
+        return resultado
+    finally:
+        db.close()
+
+
+def finalizar_trabajo(
+    db: Session,
+    job_id: int,
+    intento: int,
+    worker: str,
+    resultado: Optional[Dict[str, Any]] = None,
+    error: Optional[str] = None,
+    reintentar: bool = False,
+) -> bool:
+    """
+    Registra el resultado de una ejecución de un trabajo. Con error y
+    reintentar=True el trabajo vuelve a la cola mientras no supere
+    MAX_INTENTOS. Si el trabajo ya no pertenece a esta ejecución (su lease
+    venció y se volvió a reclamar) el resultado se descarta.
+
+    Returns:
+        True si se registró el resultado
+    """
+    job = (
+        db.query(ProjectExportJob)
+        .filter(
+            ProjectExportJob.id == job_id,
+            ProjectExportJob.intentos == intento,
+            ProjectExportJob.worker == worker,
+            ProjectExportJob.estado == ESTADO_EN_PROCESO,
+        )
+        .with_for_update()
+        .first()
+    )
+    if not job:
+        db.rollback()
+        print(f"⚠️ Trabajo {job_id} (intento {intento}) ya no pertenece a este worker")
+        if resultado:
+            try:
+                os.remove(resultado["archivo_ruta"])
+            except OSError:
+                pass
+        return False
+    if error is None:
+        job.estado = ESTADO_COMPLETADO
+        job.archivo_ruta = resultado["archivo_ruta"]
+        job.archivo_nombre = resultado["archivo_nombre"]
+        job.media_type = resultado["media_type"]
+        job.tamano = resultado["tamano"]
+    elif reintentar and job.intentos < MAX_INTENTOS:
+        job.estado = ESTADO_PENDIENTE
+        job.error = error
+    else:
+        job.estado = ESTADO_ERROR
+        job.error = error
+    if job.estado != ESTADO_PENDIENTE:
+        job.finalizado_en = datetime.now()
+    job.lease_hasta = None
+    db.commit()
+    return True
+
+
+def _crear_pool(procesos: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_proceso)
+
+
+def _reemplazar_pool(pool: ProcessPoolExecutor, procesos: int) -> ProcessPoolExecutor:
+    """Un proceso del pool murió (BrokenProcessPool): se descarta y se crea otro"""
+    print("⚠️ El pool de procesos se interrumpió, se crea uno nuevo")
+    pool.shutdown(wait=False, cancel_futures=True)
+    return _crear_pool(procesos)
+
+
+def ejecutar_worker(procesos: int):
+    """
+    Bucle principal del worker: reclama trabajos mientras haya procesos libres
+    y registra el resultado de cada uno al terminar. Si un proceso del pool
+    muere, sus trabajos vuelven a la cola y el pool se reemplaza.
+    """
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    print(f"🚀 Worker de exportaciones {worker} iniciado con {procesos} procesos")
+
+    db = SessionLocal()
+    en_curso = {}
+    ultimo_mantenimiento = 0.0
+    ultima_renovacion = time.monotonic()
+    pool = _crear_pool(procesos)
+    try:
+        while True:
+            if time.monotonic() - ultimo_mantenimiento > INTERVALO_MANTENIMIENTO:
+                recuperados = recuperar_trabajos_abandonados(db)
+                if recuperados:
+                    print(f"♻️ {recuperados} trabajos abandonados devueltos a la cola")
+                trabajos, archivos = limpiar_exportaciones_antiguas(db)
+                if trabajos or archivos:
+                    print(f"🧹 {trabajos} trabajos y {archivos} archivos de exportación borrados")
+                ultimo_mantenimiento = time.monotonic()
+
+            if time.monotonic() - ultima_renovacion > RENOVACION_LEASE:
+                renovar_leases(db, worker, en_curso.values())
+                ultima_renovacion = time.monotonic()
+
+            while len(en_curso) < procesos:
+                ejecucion = reclamar_trabajo(db, worker)
+                if ejecucion is None:
+                    break
+                job_id, intento = ejecucion
+                print(f"📥 Trabajo {job_id} reclamado (intento {intento})")
+                try:
+                    en_curso[pool.submit(ejecutar_trabajo, job_id, intento)] = ejecucion
+                except BrokenProcessPool as e:
+                    finalizar_trabajo(
+                        db, job_id, intento, worker,
+                        error=f"BrokenProcessPool: {e}", reintentar=True,
+                    )
+                    pool = _reemplazar_pool(pool, procesos)
+
+            if not en_curso:
+                time.sleep(INTERVALO_SONDEO)
+                continue
+
+            terminados, _ = wait(
+                en_curso, timeout=INTERVALO_SONDEO, return_when=FIRST_COMPLETED
+            )
+            pool_roto = False
+            for futuro in terminados:
+                job_id, intento = en_curso.pop(futuro)
+                try:
+                    resultado = futuro.result()
+                except ErrorExportacion as e:
+                    print(f"❌ Trabajo {job_id} falló: {e}")
+                    finalizar_trabajo(db, job_id, intento, worker, error=str(e))
+                except Exception as e:
+                    # Error inesperado (o murió un proceso del pool): se reintenta
+                    pool_roto = pool_roto or isinstance(e, BrokenProcessPool)
+                    error = f"{type(e).__name__}: {e}"
+                    print(f"❌ Trabajo {job_id} falló: {error}")
+                    finalizar_trabajo(
+                        db, job_id, intento, worker, error=error, reintentar=True
+                    )
+                else:
+                    if finalizar_trabajo(db, job_id, intento, worker, resultado=resultado):
+                        print(f"✅ Trabajo {job_id} completado")
+            if pool_roto:
+                pool = _reemplazar_pool(pool, procesos)
+    finally:
+        pool.shutdown()
+        db.close()
+
+
+# ============================================================================
+# DESCARGA CON SOPORTE DE RANGE
+# ============================================================================
+
+_PATRON_RANGO = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parsear_rango(cabecera: Optional[str], tamano: int) -> Optional[Tuple[int, int]]:
+    """
+    Interpreta una cabecera Range de un único rango ("bytes=inicio-fin",
+    "bytes=inicio-" o "bytes=-sufijo").
+
+    Returns:
+        (inicio, fin) inclusivos, o None si no hay cabecera o tiene varios rangos
+        (en ese caso se envía el archivo completo)
+
+    Raises:
+        ValueError: si el rango no es satisfacible
+    """
+    if not cabecera:
+        return None
+    coincidencia = _PATRON_RANGO.match(cabecera.strip())
+    if not coincidencia:
+        return None
+    inicio, fin = coincidencia.groups()
+    if not inicio and not fin:
+        return None
+
+    if not inicio:
+        sufijo = int(fin)
+        if sufijo == 0:
+            raise ValueError("Rango no satisfacible")
+        return max(tamano - sufijo, 0), tamano - 1
+
+    inicio = int(inicio)
+    fin = int(fin) if fin else tamano - 1
+    if inicio >= tamano or fin < inicio:
+        raise ValueError("Rango no satisfacible")
+    return inicio, min(fin, tamano - 1)
+
+
+def iterar_rango(ruta: str, inicio: int, fin: int) -> Iterator[bytes]:
+    """Lee los bytes [inicio, fin] del archivo por partes"""
+    restante = fin - inicio + 1
+    with open(ruta, "rb") as f:
+        f.seek(inicio)
+        while restante > 0:
+            chunk = f.read(min(TAMANO_CHUNK, restante))
+            if not chunk:
+                break
+            restante -= len(chunk)
+            yield chunk
@@ -0,0 +1,191 @@
+"""
+Resumen de facturación de las campañas.
+
+La periodicidad de cada concepto de facturación es texto libre ("Mensual",
+"Anual", "Por evento"...). Se normaliza dentro de PostgreSQL (minúsculas, sin
+tildes, por prefijo) a un factor mensual: el monto de un concepto es valor por
+cantidad y su equivalente mensual es monto por factor. Los conceptos que no
+se repiten (pago único, por evento) se suman aparte como no recurrentes y las
+periodicidades que no se reconocen se informan para corregirlas.
+
+Los totales por campaña, cliente corporativo, tipo y ejecutivo salen de una
+sola consulta con GROUPING SETS. El resultado se guarda en caché hasta la
+próxima escritura de facturación o de campañas (o FACTURACION_CACHE_TTL
+segundos). La proyección a N meses con crecimiento compuesto se calcula al
+responder, con NumPy sobre todos los grupos a la vez.
+"""
+from typing import Any, Dict
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from core.config import FACTURACION_CACHE_TTL
+from services.estadisticas_campanas import CacheEstadisticas
+
+# (prefijo de la periodicidad normalizada, factor mensual). Factor 0: no recurrente
+PERIODICIDADES = (
+    ("diari", 365 / 12),
+    ("por dia", 365 / 12),
+    ("semanal", 52 / 12),
+    ("quincenal", 2),
+    ("mensual", 1),
+    ("por mes", 1),
+    ("bimestral", 1 / 2),
+    ("trimestral", 1 / 3),
+    ("cuatrimestral", 1 / 4),
+    ("semestral", 1 / 6),
+    ("anual", 1 / 12),
+    ("por año", 1 / 12),
+    ("unic", 0),
+    ("una vez", 0),
+    ("por evento", 0),
+    ("puntual", 0),
+)
+
+DIMENSIONES = ("campaña", "cliente_corporativo", "tipo", "ejecutivo")
+
+
+def _factor_mensual() -> str:
+    normalizada = "translate(lower(trim(periodicidad)), 'áéíóúü', 'aeiouu')"
+    casos = " ".join(
+        f"WHEN {normalizada} LIKE '{prefijo}%' THEN CAST({factor!r} AS float8)"
+        for prefijo, factor in PERIODICIDADES
+    )
+    return f"CASE {casos} END"
+
+
+# La periodicidad se normaliza una vez por valor distinto (son pocos), no por
+# fila; los conceptos se suman primero por campaña (clave entera) y los
+# GROUPING SETS trabajan sobre esas filas
+SQL_RESUMEN = text(
+    f"""
+    WITH factores AS (
+        SELECT periodicidad, {_factor_mensual()} AS factor
+        FROM (SELECT DISTINCT periodicidad FROM facturacion_campanas) p
+    ),
+    por_campana AS (
+        SELECT f."campaña_id" AS campana_id,
+               sum(f.valor * f.cantidad * fa.factor) FILTER (WHERE fa.factor > 0) AS mensual,
+               sum(f.valor * f.cantidad) FILTER (WHERE fa.factor = 0) AS no_recurrente,
+               sum(f.valor * f.cantidad) FILTER (WHERE fa.factor IS NULL) AS sin_normalizar,
+               count(*) AS conceptos
+        FROM facturacion_campanas f
+        JOIN factores fa ON fa.periodicidad = f.periodicidad
+        GROUP BY f."campaña_id"
+    )
+    SELECT CASE
+               WHEN grouping(c.id) = 0 THEN 'campaña'
+               WHEN grouping(cc.id) = 0 THEN 'cliente_corporativo'
+               WHEN grouping(c.tipo) = 0 THEN 'tipo'
+               WHEN grouping(c.ejecutivo) = 0 THEN 'ejecutivo'
+               ELSE 'total'
+           END AS dimension,
+           c.id AS campana_id, c.nombre AS campana, cc.id AS cliente_id,
+           cc.nombre AS cliente, c.tipo::text AS tipo, c.ejecutivo,
+           coalesce(sum(p.mensual), 0) AS mensual,
+           coalesce(sum(p.no_recurrente), 0) AS no_recurrente,
+           coalesce(sum(p.sin_normalizar), 0) AS sin_normalizar,
+           CAST(coalesce(sum(p.conceptos), 0) AS integer) AS conceptos,
+           (SELECT array_agg(periodicidad ORDER BY periodicidad)
+            FROM factores WHERE factor IS NULL) AS periodicidades_sin_normalizar
+    FROM por_campana p
+    JOIN campanas_campanas c ON c.id = p.campana_id
+    JOIN campanas_clientes_corporativos cc ON cc.id = c.cliente_corporativo_id
+    GROUP BY GROUPING SETS (
+        (c.id, c.nombre, cc.id, cc.nombre, c.tipo, c.ejecutivo),
+        (cc.id, cc.nombre),
+        (c.tipo),
+        (c.ejecutivo),
+        ()
+    )
+    ORDER BY mensual DESC
+    """
+)
+
+
+def _claves(fila) -> Dict[str, Any]:
+    if fila.dimension == "campaña":
+        return {
+            "id": fila.campana_id,
+            "nombre": fila.campana,
+            "cliente_corporativo": fila.cliente,
+            "tipo": fila.tipo,
+            "ejecutivo": fila.ejecutivo,
+        }
+    if fila.dimension == "cliente_corporativo":
+        return {"id": fila.cliente_id, "nombre": fila.cliente}
+    if fila.dimension == "tipo":
+        return {"tipo": fila.tipo}
+    if fila.dimension == "ejecutivo":
+        return {"ejecutivo": fila.ejecutivo}
+    return {}
+
+
+def calcular_resumen(db: Session) -> Dict[str, Any]:
+    """Totales por dimensión con una sola consulta (sin caché ni proyección)"""
+    # El conjunto vacío () siempre devuelve la fila del total, aun sin facturación
+    resumen = {dimension: [] for dimension in DIMENSIONES}
+    for fila in db.execute(SQL_RESUMEN):
+        valores = {
+            **_claves(fila),
+            "mensual": fila.mensual,
+            "no_recurrente": fila.no_recurrente,
+            "sin_normalizar": fila.sin_normalizar,
+            "conceptos": fila.conceptos,
+        }
+        if fila.dimension == "total":
+            valores["periodicidades_sin_normalizar"] = fila.periodicidades_sin_normalizar or []
+            resumen["total"] = valores
+        else:
+            resumen[fila.dimension].append(valores)
+    return resumen
+
+
+cache_resumen = CacheEstadisticas(FACTURACION_CACHE_TTL)
+
+
+def _redondear(grupo: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        clave: round(valor, 2) if isinstance(valor, float) else valor
+        for clave, valor in grupo.items()
+    }
+
+
+def proyectar(resumen: Dict[str, Any], meses: int, crecimiento: float) -> Dict[str, Any]:
+    """
+    Agrega a cada grupo su ingreso anual equivalente y el acumulado de los
+    próximos `meses` meses con crecimiento mensual compuesto, más la serie
+    mes a mes del total.
+    """
+    grupos = [
+        (dimension, grupo) for dimension in DIMENSIONES for grupo in resumen[dimension]
+    ]
+    grupos.append(("total", resumen["total"]))
+    mensual = np.array([grupo["mensual"] for _, grupo in grupos], dtype=float)
+    factores = (1 + crecimiento) ** np.arange(meses)
+    anual = mensual * 12
+    proyeccion = mensual * factores.sum()
+
+    resultado = {"meses_proyeccion": meses, "crecimiento_mensual": crecimiento}
+    resultado.update({dimension: [] for dimension in DIMENSIONES})
+    for (dimension, grupo), anual_grupo, proyeccion_grupo in zip(grupos, anual, proyeccion):
+        grupo = _redondear(
+            {**grupo, "anual": float(anual_grupo), "proyeccion": float(proyeccion_grupo)}
+        )
+        if dimension == "total":
+            resultado["total"] = grupo
+        else:
+            resultado[dimension].append(grupo)
+    resultado["proyeccion_mensual_total"] = np.round(mensual[-1] * factores, 2).tolist()
+    return resultado
+
+
+def obtener_resumen(db: Session, meses: int = 12, crecimiento: float = 0.0) -> Dict[str, Any]:
+    """Resumen de facturación con proyección; la agregación sale de la caché si está"""
+    return proyectar(cache_resumen.obtener(lambda: calcular_resumen(db)), meses, crecimiento)
+
+
+def invalidar():
+    """Descarta el resumen en caché tras una escritura de facturación o campañas"""
+    cache_resumen.invalidar()
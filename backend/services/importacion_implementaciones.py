@@ -0,0 +1,291 @@
+"""
+Importación de implementaciones desde un Excel (xlsx) o CSV con el mismo
+formato que genera /implementaciones/descargar_excel.
+
+El archivo se recorre fila por fila (openpyxl en modo read_only o csv), cada
+fila se valida contra el registro de campos y las longitudes de las columnas
+de los modelos, y las filas válidas se insertan por lotes con
+crear_implementaciones (un INSERT multi-fila por tabla y lote). Las filas con
+errores se reportan con su número de fila y no se importan.
+"""
+import codecs
+import csv
+import io
+import re
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from openpyxl import load_workbook
+from sqlalchemy.orm import Session
+
+from crud import historial_implementaciones
+from crud import implementaciones as crud_implementaciones
+from crud.implementaciones import (
+    ATRIBUTOS,
+    MODELOS_SECCION,
+    MODELOS_SUBSECCION,
+    REGISTRO_CAMPOS,
+    SECCIONES,
+)
+from services.excel_implementaciones import (
+    ETIQUETAS_ATRIBUTOS,
+    PREFIJOS_SECCION,
+)
+
+FORMATOS = (".xlsx", ".csv")
+TAMANO_LOTE = 500
+MAX_ERRORES_REPORTADOS = 1000
+
+# Columnas básicas del Excel -> campo de la implementación (ID se ignora: se asigna uno nuevo)
+COLUMNAS_BASICAS = {
+    "ID": None,
+    "Cliente": "cliente",
+    "Proceso": "proceso",
+    "Estado General": "estado",
+}
+
+_PATRON_ENCABEZADO = re.compile(r"^(?P<prefijo>.+?) - (?P<nombre>.+) \((?P<atributo>[^()]+)\)$")
+
+_SECCION_POR_PREFIJO = {prefijo: seccion for seccion, prefijo in PREFIJOS_SECCION.items()}
+_ATRIBUTO_POR_ETIQUETA = {etiqueta: atributo for atributo, etiqueta in ETIQUETAS_ATRIBUTOS.items()}
+_CAMPO_POR_ETIQUETA = {
+    seccion: {campo.etiqueta: campo for campo in campos}
+    for seccion, campos in REGISTRO_CAMPOS.items()
+}
+
+# Longitud máxima de nombre_subsesion más restrictiva entre las tablas de subsecciones
+_LONGITUD_NOMBRE_SUBSECCION = min(
+    (
+        modelo.__table__.c.nombre_subsesion.type.length
+        for modelo in MODELOS_SUBSECCION.values()
+        if modelo.__table__.c.nombre_subsesion.type.length
+    ),
+    default=None,
+)
+
+
+class ErrorImportacion(ValueError):
+    """El archivo no se puede importar (formato o encabezados no válidos)"""
+
+
+def _longitud(modelo, columna: str) -> Optional[int]:
+    return getattr(modelo.__table__.c[columna].type, "length", None)
+
+
+def interpretar_encabezados(encabezados: List[Any]) -> List[Optional[Tuple]]:
+    """
+    Asocia cada columna del archivo a su destino:
+    ("basico", campo), ("seccion", seccion, campo, atributo, longitud máxima)
+    o None si la columna se ignora.
+
+    Los encabezados de secciones cuyo nombre no es un campo predefinido son
+    subsecciones personalizadas, igual que en la exportación.
+
+    Raises:
+        ErrorImportacion: si faltan Cliente/Proceso o hay encabezados desconocidos
+    """
+    destinos: List[Optional[Tuple]] = []
+    desconocidos = []
+    for encabezado in encabezados:
+        texto = str(encabezado).strip() if encabezado is not None else ""
+        if not texto or (texto in COLUMNAS_BASICAS and COLUMNAS_BASICAS[texto] is None):
+            destinos.append(None)
+            continue
+        if texto in COLUMNAS_BASICAS:
+            destinos.append(("basico", COLUMNAS_BASICAS[texto]))
+            continue
+
+        coincidencia = _PATRON_ENCABEZADO.match(texto)
+        seccion = coincidencia and _SECCION_POR_PREFIJO.get(coincidencia["prefijo"])
+        atributo = coincidencia and _ATRIBUTO_POR_ETIQUETA.get(coincidencia["atributo"])
+        if not seccion or not atributo:
+            desconocidos.append(texto)
+            destinos.append(None)
+            continue
+
+        campo = _CAMPO_POR_ETIQUETA[seccion].get(coincidencia["nombre"])
+        if campo and not campo.legado:
+            nombre = campo.campo
+            columna = campo.columnas[ATRIBUTOS.index(atributo)]
+            longitud = _longitud(MODELOS_SECCION[seccion], columna)
+        else:
+            # Subsección personalizada (los campos legados también se guardan así)
+            nombre = campo.campo if campo else coincidencia["nombre"]
+            longitud = _longitud(MODELOS_SUBSECCION[seccion], atributo)
+        destinos.append(("seccion", seccion, nombre, atributo, longitud))
+
+    if desconocidos:
+        raise ErrorImportacion(
+            f"Encabezados no reconocidos: {', '.join(desconocidos[:20])}"
+        )
+    campos_basicos = {destino[1] for destino in destinos if destino and destino[0] == "basico"}
+    faltantes = [c for c in ("Cliente", "Proceso") if COLUMNAS_BASICAS[c] not in campos_basicos]
+    if faltantes:
+        raise ErrorImportacion(f"Faltan las columnas obligatorias: {', '.join(faltantes)}")
+    return destinos
+
+
+def _texto(valor: Any) -> str:
+    """Convierte el valor de una celda al texto que se guarda"""
+    if valor is None:
+        return ""
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    if isinstance(valor, datetime) and valor.time() == datetime.min.time():
+        return valor.date().isoformat()
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    return str(valor).strip()
+
+
+def construir_documento(
+    fila: Tuple[Any, ...], destinos: List[Optional[Tuple]]
+) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    """
+    Convierte una fila en el documento que recibe crear_implementaciones.
+
+    Returns:
+        (documento, errores). Si la fila está vacía se devuelve (None, []).
+    """
+    documento: Dict[str, Any] = {"estado": None, **{seccion: {} for seccion in SECCIONES}}
+    errores = []
+    vacia = True
+    for valor, destino in zip(fila, destinos):
+        if destino is None:
+            continue
+        texto = _texto(valor)
+        if texto:
+            vacia = False
+        if destino[0] == "basico":
+            documento[destino[1]] = texto or None
+            continue
+
+        _, seccion, nombre, atributo, longitud = destino
+        if not texto:
+            continue
+        if longitud and len(texto) > longitud:
+            errores.append(
+                f"{PREFIJOS_SECCION[seccion]} - {nombre} ({ETIQUETAS_ATRIBUTOS[atributo]}): "
+                f"supera {longitud} caracteres"
+            )
+        documento[seccion].setdefault(nombre, {})[atributo] = texto
+
+    if vacia:
+        return None, []
+    for campo in ("cliente", "proceso"):
+        if not documento.get(campo):
+            errores.append(f"El campo {campo} es obligatorio")
+    for seccion in SECCIONES:
+        for nombre in documento[seccion]:
+            if _LONGITUD_NOMBRE_SUBSECCION and len(nombre) > _LONGITUD_NOMBRE_SUBSECCION:
+                errores.append(f"Nombre de subsección demasiado largo: {nombre[:50]}...")
+    return documento, errores
+
+
+def _filas_xlsx(archivo) -> Iterator[Tuple[Any, ...]]:
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        yield from libro.worksheets[0].iter_rows(values_only=True)
+    finally:
+        libro.close()
+
+
+def _filas_csv(archivo) -> Iterator[Tuple[Any, ...]]:
+    texto = codecs.getreader("utf-8-sig")(archivo)
+    try:
+        primera = texto.readline()
+        # Excel en configuración regional española guarda los CSV con ";"
+        delimitador = ";" if primera.count(";") > primera.count(",") else ","
+        yield from csv.reader(io.StringIO(primera), delimiter=delimitador)
+        yield from csv.reader(texto, delimiter=delimitador)
+    except UnicodeDecodeError:
+        raise ErrorImportacion("El CSV debe estar codificado en UTF-8")
+
+
+def leer_filas(archivo, nombre_archivo: str) -> Iterator[Tuple[Any, ...]]:
+    """
+    Recorre las filas del archivo (encabezados incluidos) sin cargarlo entero.
+
+    Raises:
+        ErrorImportacion: si la extensión no es xlsx ni csv
+    """
+    extension = "." + nombre_archivo.rsplit(".", 1)[-1].lower() if "." in nombre_archivo else ""
+    if extension == ".xlsx":
+        return _filas_xlsx(archivo)
+    if extension == ".csv":
+        return _filas_csv(archivo)
+    raise ErrorImportacion(
+        f"Formato no soportado: {nombre_archivo}. Formatos permitidos: {', '.join(FORMATOS)}"
+    )
+
+
+def _crear_lote(
+    db: Session, lote: List[Dict[str, Any]], usuario_id: Optional[int]
+) -> List[int]:
+    ids = crud_implementaciones.crear_implementaciones(db, lote)
+    historial_implementaciones.registrar_creaciones(db, ids, lote, usuario_id)
+    return ids
+
+
+def importar_implementaciones(
+    db: Session,
+    archivo,
+    nombre_archivo: str,
+    solo_validar: bool = False,
+    usuario_id: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Valida e importa las implementaciones del archivo. Las filas válidas se
+    insertan por lotes de TAMANO_LOTE; no hace commit (todo el archivo se
+    confirma en una sola transacción).
+
+    Raises:
+        ErrorImportacion: si el archivo no tiene el formato esperado
+
+    Returns:
+        Resumen con total de filas, ids creados y errores por fila
+    """
+    filas = leer_filas(archivo, nombre_archivo)
+    try:
+        encabezados = next(filas)
+    except StopIteration:
+        raise ErrorImportacion("El archivo está vacío")
+    except Exception as e:
+        raise ErrorImportacion(f"No se pudo leer el archivo: {e}")
+    destinos = interpretar_encabezados(list(encabezados))
+
+    total = 0
+    ids: List[int] = []
+    errores: List[Dict[str, Any]] = []
+    total_errores = 0
+    lote: List[Dict[str, Any]] = []
+
+    # Las filas de datos empiezan en la 2 (la 1 son los encabezados)
+    for numero, fila in enumerate(filas, start=2):
+        documento, errores_fila = construir_documento(fila, destinos)
+        if documento is None:
+            continue
+        total += 1
+        if errores_fila:
+            total_errores += 1
+            if len(errores) < MAX_ERRORES_REPORTADOS:
+                errores.append({"fila": numero, "errores": errores_fila})
+            continue
+        if solo_validar:
+            continue
+        lote.append(documento)
+        if len(lote) >= TAMANO_LOTE:
+            ids.extend(_crear_lote(db, lote, usuario_id))
+            lote = []
+
+    if lote:
+        ids.extend(_crear_lote(db, lote, usuario_id))
+
+    return {
+        "total_filas": total,
+        "validas": total - total_errores,
+        "importadas": len(ids),
+        "filas_con_error": total_errores,
+        "ids": ids,
+        "errores": errores,
+    }
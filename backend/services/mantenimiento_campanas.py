@@ -0,0 +1,196 @@
+"""
+Tareas de mantenimiento de los datos de campañas.
+
+Cada tarea es un INSERT ... SELECT o un DELETE dentro de PostgreSQL (las filas
+no pasan por Python) y se ejecuta por lotes de rangos de id con un commit por
+lote, así que no mantiene una transacción abierta durante toda la tarea y
+se puede interrumpir y volver a ejecutar: los lotes ya confirmados no se
+repiten (las condiciones NOT EXISTS / duplicados excluyen lo ya hecho).
+
+- generar_historial_inicial: entrada "creada" para las campañas sin historial
+  (ni vigente ni archivado).
+- limpiar_huerfanos: productos y facturación cuya campaña ya no existe (bases
+  en las que las tablas se crearon sin la clave foránea).
+- compactar_historial: borra del historial las actualizaciones sin cambios
+  reales (anterior igual a nuevo en todos los campos) y las entradas
+  duplicadas en el mismo segundo (doble envío del formulario).
+"""
+import time
+from typing import Callable, Iterator, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from services.particiones_historial import asegurar_archivo
+
+OBSERVACIONES_INICIAL = (
+    "Entrada de historial generada automáticamente para campaña existente"
+)
+
+SQL_HISTORIAL_INICIAL = text(
+    """
+    INSERT INTO historial_campanas
+        ("campaña_id", usuario_id, accion, cambios, fecha, observaciones)
+    SELECT c.id, NULL, 'creada',
+           json_build_object(
+               'nombre', c.nombre,
+               'tipo', c.tipo::text,
+               'estado', 'Creación inicial'
+           ),
+           c.fecha_de_produccion::timestamp,
+           :observaciones
+    FROM campanas_campanas c
+    WHERE c.id BETWEEN :desde AND :hasta
+      AND NOT EXISTS (
+          SELECT 1 FROM historial_campanas h WHERE h."campaña_id" = c.id
+      )
+      AND NOT EXISTS (
+          SELECT 1 FROM historial_campanas_archivo a WHERE a."campaña_id" = c.id
+      )
+    """
+)
+
+SQL_HUERFANOS = {
+    tabla: text(
+        f"""
+        DELETE FROM {tabla} t
+        WHERE t.id BETWEEN :desde AND :hasta
+          AND NOT EXISTS (
+              SELECT 1 FROM campanas_campanas c WHERE c.id = t."campaña_id"
+          )
+        """
+    )
+    for tabla in ("productos_campanas", "facturacion_campanas")
+}
+
+# Actualizaciones cuyo "anterior" y "nuevo" coinciden: las de campaña guardan
+# {campo: {anterior, nuevo}} y las de productos y facturación {anterior, nuevo}
+SQL_ACTUALIZACIONES_VACIAS = text(
+    """
+    DELETE FROM historial_campanas h
+    WHERE h."campaña_id" BETWEEN :desde AND :hasta
+      AND (
+          (h.accion = 'actualizada'
+           AND json_typeof(h.cambios) = 'object'
+           AND NOT EXISTS (
+               SELECT 1 FROM jsonb_each(h.cambios::jsonb) c
+               WHERE jsonb_typeof(c.value) <> 'object'
+                  OR c.value -> 'anterior' IS DISTINCT FROM c.value -> 'nuevo'
+           ))
+          OR
+          (h.accion IN ('producto_actualizado', 'facturacion_actualizada')
+           AND h.cambios::jsonb -> 'anterior' = h.cambios::jsonb -> 'nuevo')
+      )
+    """
+)
+
+# Entradas iguales en el mismo segundo: se conserva la de menor id
+SQL_DUPLICADOS = text(
+    """
+    DELETE FROM historial_campanas h
+    USING (
+        SELECT id, fecha,
+               row_number() OVER (
+                   PARTITION BY "campaña_id", accion, usuario_id,
+                                cambios::jsonb, observaciones,
+                                date_trunc('second', fecha)
+                   ORDER BY id
+               ) AS orden
+        FROM historial_campanas
+        WHERE "campaña_id" BETWEEN :desde AND :hasta
+    ) d
+    WHERE d.orden > 1 AND h.id = d.id AND h.fecha = d.fecha
+    """
+)
+
+
+def _rangos(db: Session, tabla: str, columna: str, lote: int) -> Iterator[Tuple[int, int]]:
+    """Rangos [desde, hasta] de lote valores entre el mínimo y el máximo de la columna"""
+    minimo, maximo = db.execute(
+        text(f'SELECT min("{columna}"), max("{columna}") FROM {tabla}')
+    ).one()
+    db.rollback()  # no dejar la transacción de la consulta abierta
+    if minimo is None:
+        return
+    for desde in range(minimo, maximo + 1, lote):
+        yield desde, min(desde + lote - 1, maximo)
+
+
+def _por_lotes(
+    db: Session,
+    nombre: str,
+    tabla: str,
+    columna: str,
+    sentencias,
+    lote: int,
+    reportar: Callable[[str], None],
+) -> int:
+    """
+    Ejecuta las sentencias para cada rango de ids, con un commit por lote, y
+    reporta el avance. Devuelve el total de filas afectadas.
+    """
+    inicio = time.perf_counter()
+    rangos = list(_rangos(db, tabla, columna, lote))
+    total = 0
+    for numero, (desde, hasta) in enumerate(rangos, start=1):
+        try:
+            for sentencia, parametros in sentencias:
+                resultado = db.execute(sentencia, {**parametros, "desde": desde, "hasta": hasta})
+                total += resultado.rowcount
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        reportar(
+            f"🔄 {nombre}: lote {numero}/{len(rangos)} "
+            f"({columna} {desde}-{hasta}), {total} filas"
+        )
+    reportar(f"✅ {nombre}: {total} filas en {time.perf_counter() - inicio:.1f} s")
+    return total
+
+
+def generar_historial_inicial(
+    db: Session, lote: int, reportar: Callable[[str], None] = print
+) -> int:
+    """Crea la entrada "creada" de cada campaña que no tiene historial"""
+    # En bases creadas con create_all el archivo aún no existe
+    asegurar_archivo(db)
+    db.commit()
+    return _por_lotes(
+        db,
+        "Historial inicial",
+        "campanas_campanas",
+        "id",
+        [(SQL_HISTORIAL_INICIAL, {"observaciones": OBSERVACIONES_INICIAL})],
+        lote,
+        reportar,
+    )
+
+
+def limpiar_huerfanos(
+    db: Session, lote: int, reportar: Callable[[str], None] = print
+) -> int:
+    """Borra productos y facturación de campañas que ya no existen"""
+    return sum(
+        _por_lotes(db, f"Huérfanos {tabla}", tabla, "id", [(sentencia, {})], lote, reportar)
+        for tabla, sentencia in SQL_HUERFANOS.items()
+    )
+
+
+def compactar_historial(
+    db: Session, lote: int, reportar: Callable[[str], None] = print
+) -> int:
+    """
+    Borra las actualizaciones sin cambios y las entradas duplicadas del
+    historial vigente (el archivo no se modifica). Los lotes son rangos de
+    campaña_id, que resuelve el índice ix_historial_campanas_campana_fecha.
+    """
+    return _por_lotes(
+        db,
+        "Compactación del historial",
+        "historial_campanas",
+        "campaña_id",
+        [(SQL_ACTUALIZACIONES_VACIAS, {}), (SQL_DUPLICADOS, {})],
+        lote,
+        reportar,
+    )
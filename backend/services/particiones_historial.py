@@ -0,0 +1,194 @@
+"""
+Particiones mensuales del historial de campañas y archivo de las antiguas.
+
+historial_campanas está particionada por rango de fecha: una partición por
+mes (historial_campanas_AAAA_MM) y historial_campanas_default para las fechas
+que todavía no tienen la suya. Las lecturas del historial reciente solo
+recorren las particiones de los últimos meses, así que su costo no crece con
+la tabla.
+
+- crear_particiones: crea las particiones de los próximos meses. Si la
+  partición por defecto ya recibió filas de ese mes, se mueven a la nueva.
+- archivar_particiones: las particiones con más de retencion_meses de
+  antigüedad se separan de historial_campanas y se adjuntan a
+  historial_campanas_archivo (DETACH/ATTACH: no se copian filas).
+
+Las dos operaciones toman un advisory lock de transacción, así que dos
+ejecuciones simultáneas no se pisan, y son idempotentes.
+"""
+import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+TABLA = "historial_campanas"
+ARCHIVO = "historial_campanas_archivo"
+DEFAULT = f"{TABLA}_default"
+
+# Clave del advisory lock que serializa el mantenimiento de particiones
+LOCK_PARTICIONES = 72016
+
+SQL_PARTICIONES = text(
+    """
+    SELECT hija.relname AS nombre
+    FROM pg_inherits i
+    JOIN pg_class padre ON padre.oid = i.inhparent
+    JOIN pg_class hija ON hija.oid = i.inhrelid
+    WHERE padre.relname = :tabla
+    """
+)
+
+
+def inicio_mes(fecha: datetime.date) -> datetime.date:
+    return datetime.date(fecha.year, fecha.month, 1)
+
+
+def sumar_meses(mes: datetime.date, meses: int) -> datetime.date:
+    total = mes.year * 12 + mes.month - 1 + meses
+    return datetime.date(total // 12, total % 12 + 1, 1)
+
+
+def nombre_particion(tabla: str, mes: datetime.date) -> str:
+    return f"{tabla}_{mes:%Y_%m}"
+
+
+def _particiones_mensuales(db: Session, tabla: str) -> Dict[datetime.date, str]:
+    """Mes de inicio -> nombre de cada partición mensual de la tabla"""
+    particiones = {}
+    for (nombre,) in db.execute(SQL_PARTICIONES, {"tabla": tabla}):
+        sufijo = nombre[len(tabla) + 1 :]
+        try:
+            mes = datetime.datetime.strptime(sufijo, "%Y_%m").date()
+        except ValueError:
+            continue  # partición por defecto
+        particiones[mes] = nombre
+    return particiones
+
+
+def _bloquear(db: Session):
+    db.execute(text("SELECT pg_advisory_xact_lock(:clave)"), {"clave": LOCK_PARTICIONES})
+
+
+def crear_particiones(
+    db: Session, meses_adelante: int = 3, hoy: Optional[datetime.date] = None
+) -> List[str]:
+    """
+    Crea las particiones mensuales que falten desde el mes actual hasta
+    meses_adelante meses después (sin commit).
+
+    Returns:
+        Nombres de las particiones creadas
+    """
+    _bloquear(db)
+    existentes = _particiones_mensuales(db, TABLA)
+    mes_actual = inicio_mes(hoy or datetime.date.today())
+
+    creadas = []
+    for desplazamiento in range(meses_adelante + 1):
+        mes = sumar_meses(mes_actual, desplazamiento)
+        if mes in existentes:
+            continue
+        nombre = nombre_particion(TABLA, mes)
+        rango = {"desde": mes, "hasta": sumar_meses(mes, 1)}
+        filtro = "fecha >= :desde AND fecha < :hasta"
+
+        # Con filas de ese mes en la partición por defecto no se puede crear
+        # la nueva: se apartan, se crea la partición y se vuelven a insertar
+        hay_filas = db.execute(
+            text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT} WHERE {filtro})"), rango
+        ).scalar()
+        if hay_filas:
+            db.execute(
+                text(
+                    f"CREATE TEMP TABLE historial_por_mover ON COMMIT DROP AS "
+                    f"SELECT * FROM {DEFAULT} WHERE {filtro}"
+                ),
+                rango,
+            )
+            db.execute(text(f"DELETE FROM {DEFAULT} WHERE {filtro}"), rango)
+
+        db.execute(
+            text(
+                f"CREATE TABLE {nombre} PARTITION OF {TABLA} "
+                f"FOR VALUES FROM ('{rango['desde']}') TO ('{rango['hasta']}')"
+            )
+        )
+        if hay_filas:
+            db.execute(text(f"INSERT INTO {TABLA} SELECT * FROM historial_por_mover"))
+            db.execute(text("DROP TABLE historial_por_mover"))
+        creadas.append(nombre)
+    return creadas
+
+
+def asegurar_archivo(db: Session):
+    """Crea la tabla de archivo si no existe (la crea la migración)"""
+    db.execute(
+        text(
+            f"""
+            CREATE TABLE IF NOT EXISTS {ARCHIVO} (
+                LIKE {TABLA} INCLUDING DEFAULTS,
+                PRIMARY KEY (id, fecha)
+            ) PARTITION BY RANGE (fecha)
+            """
+        )
+    )
+    db.execute(
+        text(
+            f'CREATE INDEX IF NOT EXISTS ix_{ARCHIVO}_campana_fecha '
+            f'ON {ARCHIVO} ("campaña_id", fecha, id)'
+        )
+    )
+    db.execute(
+        text(f"CREATE TABLE IF NOT EXISTS {ARCHIVO}_default PARTITION OF {ARCHIVO} DEFAULT")
+    )
+
+
+def archivar_particiones(
+    db: Session, retencion_meses: int, hoy: Optional[datetime.date] = None
+) -> List[str]:
+    """
+    Mueve a historial_campanas_archivo las particiones mensuales anteriores a
+    los últimos retencion_meses meses (sin commit). Las filas viejas que
+    hayan quedado en la partición por defecto se copian al archivo.
+
+    Returns:
+        Nombres (en el archivo) de las particiones archivadas
+    """
+    _bloquear(db)
+    asegurar_archivo(db)
+    limite = sumar_meses(inicio_mes(hoy or datetime.date.today()), -retencion_meses)
+
+    archivadas = []
+    for mes, nombre in sorted(_particiones_mensuales(db, TABLA).items()):
+        if mes >= limite:
+            continue
+        hasta = sumar_meses(mes, 1)
+        db.execute(text(f"ALTER TABLE {TABLA} DETACH PARTITION {nombre}"))
+        # El archivo conserva el historial de campañas ya eliminadas
+        claves_foraneas = db.execute(
+            text(
+                "SELECT conname FROM pg_constraint "
+                "WHERE conrelid = CAST(:tabla AS regclass) AND contype = 'f'"
+            ),
+            {"tabla": nombre},
+        ).scalars().all()
+        for restriccion in claves_foraneas:
+            db.execute(text(f'ALTER TABLE {nombre} DROP CONSTRAINT "{restriccion}"'))
+
+        nuevo_nombre = nombre_particion(ARCHIVO, mes)
+        db.execute(text(f"ALTER TABLE {nombre} RENAME TO {nuevo_nombre}"))
+        db.execute(
+            text(
+                f"ALTER TABLE {ARCHIVO} ATTACH PARTITION {nuevo_nombre} "
+                f"FOR VALUES FROM ('{mes}') TO ('{hasta}')"
+            )
+        )
+        archivadas.append(nuevo_nombre)
+
+    rango = {"limite": limite}
+    db.execute(
+        text(f"INSERT INTO {ARCHIVO} SELECT * FROM {DEFAULT} WHERE fecha < :limite"), rango
+    )
+    db.execute(text(f"DELETE FROM {DEFAULT} WHERE fecha < :limite"), rango)
+    return archivadas
@@ -0,0 +1,219 @@
+"""
+Generación del PDF "Formato Entrega Campañas" de una implementación a partir
+de su última entrega. Lo usan el endpoint /implementaciones/{id}/descargar_pdf
+y el worker de exportaciones.
+
+Los recursos estáticos (logo en base64, plantillas Jinja2 compiladas y hoja de
+estilos) se cargan una sola vez por proceso con precargar_recursos(), que se
+llama al iniciar la aplicación y cada proceso del worker. El HTML usa clases en
+lugar de estilos en línea: el CSS se pasa a xhtml2pdf como default_css ya
+concatenado y no se repite en cada celda. xhtml2pdf vuelve a interpretar ese
+CSS en cada render (sus reglas @page configuran cada documento): lo que se
+reutiliza es la lectura de archivos y la compilación de las plantillas.
+"""
+import base64
+import io
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from markupsafe import Markup
+from PIL import Image
+from sqlalchemy.orm import Session
+from xhtml2pdf import pisa
+from xhtml2pdf.default import DEFAULT_CSS
+
+from core.config import BASE_DIR
+from models.project_entregaImplementaciones import ProjectEntregaImplementaciones
+
+MEDIA_TYPE_PDF = "application/pdf"
+
+TEMPLATES_DIR = BASE_DIR / "templates" / "pdf"
+LOGO_PATH = BASE_DIR / "static" / "img" / "logo-andesbpo.png"
+
+# Filas de la tabla de datos: (concepto, columna de la entrega) por proceso
+SECCIONES_ENTREGA = (
+    (
+        "CONTRACTUAL",
+        (
+            ("Contrato", "contrato"),
+            ("Acuerdos de Niveles de Servicio", "acuerdo_niveles_servicio"),
+            ("Pólizas", "polizas"),
+            ("Penalidades", "penalidades"),
+            ("Alcance del Servicio", "alcance_servicio"),
+            ("Unidades de Facturación", "unidades_facturacion"),
+            ("Acuerdo de Pago", "acuerdo_pago"),
+            ("Incremento", "incremento"),
+        ),
+    ),
+    (
+        "TECNOLOGIA",
+        (
+            (
+                "Mapa de Aplicativos a utilizarse (Nombres, alcances, requerimientos técnicos, funcionalidades)",
+                "mapa_aplicativos",
+            ),
+            ("Internet", "internet"),
+            ("Telefonía", "telefonia"),
+            ("Whatsapp", "whatsapp"),
+            ("Integraciones", "integraciones"),
+            ("VPN", "vpn"),
+            ("Diseño del IVR", "diseno_ivr"),
+            (
+                "Transferencia de llamadas entre empresas: Lineas Telefónicas, Volumen de Llamadas",
+                "transferencia_llamadas",
+            ),
+            (
+                "Correos Electrónicos (Condiciones de Uso, capacidades)",
+                "correos_electronicos",
+            ),
+            ("Línea 018000", "linea_018000"),
+            ("Línea de Entrada", "linea_entrada"),
+            ("SMS (Caracteristicas)", "sms"),
+            (
+                "Requisitos Grabación de llamada, entrega y resguardo de las mismas",
+                "requisitos_grabacion",
+            ),
+            ("Encuestas de satisfacción", "encuesta_satisfaccion"),
+        ),
+    ),
+    (
+        "PROCESOS",
+        (
+            ("Listado Reportes Esperados", "listado_reportes"),
+            ("Proceso Monitoreo y Calidad Andes BPO", "proceso_monitoreo_calidad"),
+        ),
+    ),
+)
+
+
+class ErrorGeneracionPDF(Exception):
+    """pisa.CreatePDF terminó con errores"""
+
+
+def obtener_ultima_entrega(
+    db: Session, implementacion_id: int
+) -> Optional[ProjectEntregaImplementaciones]:
+    """Devuelve la ÚLTIMA entrega (por fecha_entrega) de una implementación"""
+    return (
+        db.query(ProjectEntregaImplementaciones)
+        .filter_by(implementacion_id=implementacion_id)
+        .order_by(ProjectEntregaImplementaciones.fecha_entrega.desc())
+        .first()
+    )
+
+
+def _celda(valor):
+    """Las celdas vacías llevan &nbsp; para que la fila conserve su altura"""
+    if not valor:
+        return Markup("&nbsp;")
+    return str(valor)
+
+
+class RecursosPDF:
+    """Recursos compartidos por todos los renders de un proceso"""
+
+    def __init__(self):
+        self.logo = self._cargar_logo()
+        with open(TEMPLATES_DIR / "estilos.css", encoding="utf-8") as f:
+            # CSS por defecto de xhtml2pdf + estilos de los reportes
+            self.css = DEFAULT_CSS + "\n" + f.read()
+
+        entorno = Environment(
+            loader=FileSystemLoader(str(TEMPLATES_DIR)),
+            autoescape=select_autoescape(["html"]),
+            trim_blocks=True,
+            lstrip_blocks=True,
+            auto_reload=False,
+        )
+        entorno.filters["celda"] = _celda
+        self.plantilla_entrega = entorno.get_template("entrega.html")
+
+    @staticmethod
+    def _cargar_logo() -> str:
+        """
+        Logo en base64 listo para usar como src de <img>. Se aplana sobre fondo
+        blanco (sin canal alfa) para que reportlab no tenga que generar la
+        máscara de transparencia en cada PDF.
+        """
+        try:
+            with Image.open(LOGO_PATH) as imagen:
+                fondo = Image.new("RGB", imagen.size, (255, 255, 255))
+                fondo.paste(imagen, mask=imagen.convert("RGBA").split()[3])
+            buffer = io.BytesIO()
+            fondo.save(buffer, format="PNG", optimize=True)
+            return "data:image/png;base64," + base64.b64encode(
+                buffer.getvalue()
+            ).decode("utf-8")
+        except Exception as e:
+            print(f"⚠️ No se pudo cargar el logo: {e}")
+            return ""
+
+
+@lru_cache(maxsize=1)
+def precargar_recursos() -> RecursosPDF:
+    """Carga los recursos la primera vez y los reutiliza en adelante"""
+    return RecursosPDF()
+
+
+def safe_text(text) -> str:
+    """Sanitiza texto para usarlo fuera de las plantillas (p. ej. nombres de archivo)"""
+    if not text:
+        return "&nbsp;"
+    return str(text).replace('"', "'").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def nombre_archivo_pdf(imp) -> str:
+    fecha_actual = datetime.now().strftime("%d/%m/%Y")
+    cliente = safe_text(imp.cliente) if imp.cliente else "&nbsp;"
+    return f"entrega_{cliente.replace(' ', '_').replace('&nbsp;', '')}_{fecha_actual.replace('/', '-')}.pdf"
+
+
+def construir_html(imp, entrega) -> str:
+    """HTML del formato de entrega con los datos de la implementación y la entrega"""
+    recursos = precargar_recursos()
+    fecha_actual = datetime.now().strftime("%d/%m/%Y")
+
+    return recursos.plantilla_entrega.render(
+        logo=recursos.logo,
+        informacion=(
+            ("NOMBRE DEL CLIENTE", imp.cliente),
+            ("TIPO DE SERVICIO", imp.proceso),
+            ("FECHA DE INICIO SERVICIO", fecha_actual),
+            ("FECHA DE ENTREGA", fecha_actual),
+        ),
+        secciones=[
+            {
+                "nombre": nombre,
+                "filas": [
+                    (concepto, getattr(entrega, columna))
+                    for concepto, columna in filas
+                ],
+            }
+            for nombre, filas in SECCIONES_ENTREGA
+        ],
+    )
+
+
+def renderizar_pdf(imp, entrega) -> bytes:
+    """
+    Genera el PDF de una implementación con xhtml2pdf.
+
+    Raises:
+        ErrorGeneracionPDF: si pisa reporta errores
+    """
+    recursos = precargar_recursos()
+    html_content = construir_html(imp, entrega)
+
+    pdf_buffer = io.BytesIO()
+    pisa_status = pisa.CreatePDF(
+        html_content, dest=pdf_buffer, default_css=recursos.css, encoding="utf-8"
+    )
+
+    if pisa_status.err:
+        print(f"❌ Error en pisa.CreatePDF: {pisa_status.err}")
+        print("Errores de pisa:", pisa_status.log)
+        raise ErrorGeneracionPDF("Error al generar PDF")
+
+    return pdf_buffer.getvalue()
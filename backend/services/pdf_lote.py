@@ -0,0 +1,267 @@
+"""
+Descarga en lote de PDFs de entrega como un ZIP que se envía por partes.
+
+Los datos de todas las implementaciones se leen antes de empezar a responder
+(la sesión de base de datos se cierra al devolver la respuesta). Los PDF que no
+están en la caché se renderizan en un pool de procesos con tantos procesos como
+núcleos tiene la máquina, y cada PDF se agrega al ZIP en cuanto termina, sin
+esperar a los demás. Solo hay MAX_EN_VUELO renders enviados al pool a la vez
+(se envían más a medida que terminan), así que en memoria nunca hay más de
+esos PDF pendientes de escribir. Las implementaciones sin entrega, o cuyo PDF falla, se
+reportan en manifiesto.json dentro del mismo ZIP.
+"""
+import json
+import multiprocessing
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models.project_entregaImplementaciones import ProjectEntregaImplementaciones
+from models.project_implementaciones_clienteimple import (
+    ProjectImplementacionesClienteImple,
+)
+from services import cache_pdf, pdf_implementaciones
+
+MAX_IMPLEMENTACIONES = 500
+PROCESOS = int(os.getenv("PDF_BATCH_PROCESOS", 0)) or os.cpu_count() or 1
+# Renders enviados al pool y no escritos todavía en el ZIP, por petición
+MAX_EN_VUELO = 2 * PROCESOS
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _inicializar_proceso():
+    pdf_implementaciones.precargar_recursos()
+
+
+def _obtener_pool() -> ProcessPoolExecutor:
+    """Pool compartido por todas las peticiones del worker (se crea al primer uso)"""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=PROCESOS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_inicializar_proceso,
+        )
+    return _pool
+
+
+def _descartar_pool():
+    """Un proceso del pool murió (BrokenProcessPool): se crea otro en el próximo uso"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _renderizar(imp: Dict[str, Any], entrega: Dict[str, Any]) -> bytes:
+    """Se ejecuta en el pool: recibe diccionarios para no enviar objetos ORM"""
+    return pdf_implementaciones.renderizar_pdf(
+        SimpleNamespace(**imp), SimpleNamespace(**entrega)
+    )
+
+
+def _enviar(item: Dict[str, Any]) -> Future:
+    """Envía el render al pool; si el pool quedó roto se envía a uno nuevo"""
+    try:
+        return _obtener_pool().submit(_renderizar, item["imp"], item["entrega"])
+    except BrokenProcessPool:
+        _descartar_pool()
+        return _obtener_pool().submit(_renderizar, item["imp"], item["entrega"])
+
+
+def cargar_lote(
+    db: Session,
+    ids: Optional[List[int]] = None,
+    estado: Optional[str] = None,
+    cliente: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Carga las implementaciones del lote con su última entrega (2 consultas).
+
+    Returns:
+        Lista de {"id", "imp", "entrega", "error"} en el orden de los ids
+        solicitados (o por id si se usó un filtro)
+    """
+    ids = list(dict.fromkeys(ids)) if ids else None
+    consulta = db.query(ProjectImplementacionesClienteImple)
+    if ids:
+        consulta = consulta.filter(ProjectImplementacionesClienteImple.id.in_(ids))
+    if estado:
+        consulta = consulta.filter(ProjectImplementacionesClienteImple.estado == estado)
+    if cliente:
+        consulta = consulta.filter(
+            ProjectImplementacionesClienteImple.cliente.ilike(f"%{cliente}%")
+        )
+    implementaciones = {
+        imp.id: imp
+        for imp in consulta.order_by(ProjectImplementacionesClienteImple.id)
+        .limit(MAX_IMPLEMENTACIONES + 1)
+        .all()
+    }
+    if len(implementaciones) > MAX_IMPLEMENTACIONES:
+        raise ValueError(
+            f"El lote supera el máximo de {MAX_IMPLEMENTACIONES} implementaciones"
+        )
+
+    # Última entrega de cada implementación con una función de ventana
+    orden = (
+        func.row_number()
+        .over(
+            partition_by=ProjectEntregaImplementaciones.implementacion_id,
+            order_by=ProjectEntregaImplementaciones.fecha_entrega.desc(),
+        )
+        .label("orden")
+    )
+    subconsulta = (
+        db.query(ProjectEntregaImplementaciones.id, orden)
+        .filter(
+            ProjectEntregaImplementaciones.implementacion_id.in_(
+                list(implementaciones)
+            )
+        )
+        .subquery()
+    )
+    entregas = {
+        entrega.implementacion_id: entrega
+        for entrega in db.query(ProjectEntregaImplementaciones)
+        .join(subconsulta, subconsulta.c.id == ProjectEntregaImplementaciones.id)
+        .filter(subconsulta.c.orden == 1)
+    }
+
+    lote = []
+    for id_ in ids or list(implementaciones):
+        imp = implementaciones.get(id_)
+        item = {"id": id_, "imp": None, "entrega": None, "error": None}
+        if not imp:
+            item["error"] = "Implementación no encontrada"
+        elif id_ not in entregas:
+            item["error"] = "No hay entregas registradas para esta implementación"
+        else:
+            entrega = entregas[id_]
+            item["imp"] = {"id": imp.id, "cliente": imp.cliente, "proceso": imp.proceso}
+            item["entrega"] = {
+                columna.key: getattr(entrega, columna.key)
+                for columna in entrega.__table__.columns
+            }
+        lote.append(item)
+    return lote
+
+
+class _SalidaZip:
+    """Destino de escritura sin seek: acumula lo escrito hasta que se consume"""
+
+    def __init__(self):
+        self._partes = []
+
+    def write(self, datos: bytes) -> int:
+        self._partes.append(bytes(datos))
+        return len(datos)
+
+    def flush(self):
+        pass
+
+    def consumir(self) -> bytes:
+        datos = b"".join(self._partes)
+        self._partes = []
+        return datos
+
+
+def iterar_zip(lote: List[Dict[str, Any]]) -> Iterator[bytes]:
+    """
+    Genera el ZIP por partes. Los PDF se agregan en el orden en que terminan.
+    """
+    salida = _SalidaZip()
+    manifiesto = []
+    futuros = {}
+    pendientes = deque()
+
+    with zipfile.ZipFile(salida, mode="w", compression=zipfile.ZIP_DEFLATED) as archivo:
+
+        def agregar(item, contenido: bytes):
+            imp = SimpleNamespace(**item["imp"])
+            nombre = f"{imp.id}_{pdf_implementaciones.nombre_archivo_pdf(imp)}"
+            archivo.writestr(nombre, contenido)
+            manifiesto.append({"id": item["id"], "estado": "ok", "archivo": nombre})
+
+        try:
+            for item in lote:
+                if item["error"]:
+                    manifiesto.append(
+                        {"id": item["id"], "estado": "error", "error": item["error"]}
+                    )
+                    continue
+
+                item["huella"] = cache_pdf.huella_pdf_datos(
+                    SimpleNamespace(**item["imp"]), item["entrega"]
+                )
+                contenido = cache_pdf.cache_pdf.obtener(
+                    item["id"], item["entrega"]["id"], item["huella"]
+                )
+                if contenido is not None:
+                    agregar(item, contenido)
+                    yield salida.consumir()
+                    continue
+
+                if len(futuros) < MAX_EN_VUELO:
+                    futuros[_enviar(item)] = item
+                else:
+                    pendientes.append(item)
+
+            while futuros:
+                terminados, _ = wait(futuros, return_when=FIRST_COMPLETED)
+                for futuro in terminados:
+                    # Se suelta el futuro para que su PDF no quede en memoria
+                    item = futuros.pop(futuro)
+                    try:
+                        contenido = futuro.result()
+                    except Exception as e:
+                        if isinstance(e, BrokenProcessPool):
+                            _descartar_pool()
+                        print(f"❌ Error generando PDF de implementación {item['id']}: {e}")
+                        manifiesto.append(
+                            {"id": item["id"], "estado": "error", "error": str(e)}
+                        )
+                        continue
+
+                    try:
+                        cache_pdf.cache_pdf.guardar(
+                            item["id"], item["entrega"]["id"], item["huella"], contenido
+                        )
+                    except OSError as e:
+                        print(f"⚠️ No se pudo guardar el PDF en caché: {e}")
+                    agregar(item, contenido)
+                    del contenido
+                    yield salida.consumir()
+
+                while pendientes and len(futuros) < MAX_EN_VUELO:
+                    item = pendientes.popleft()
+                    futuros[_enviar(item)] = item
+        finally:
+            # Si el cliente cierra la conexión no se siguen renderizando PDFs
+            for futuro in futuros:
+                futuro.cancel()
+
+        archivo.writestr(
+            "manifiesto.json",
+            json.dumps(
+                {
+                    "generado": datetime.now().isoformat(timespec="seconds"),
+                    "total": len(lote),
+                    "exitosos": sum(1 for m in manifiesto if m["estado"] == "ok"),
+                    "errores": sum(1 for m in manifiesto if m["estado"] == "error"),
+                    "items": manifiesto,
+                },
+                ensure_ascii=False,
+                indent=2,
+            ),
+        )
+    yield salida.consumir()
@@ -39,6 +39,9 @@ const Campañas = () => {
   const [modalAdministrar, setModalAdministrar] = useState(false);
   const [modalHistorial, setModalHistorial] = useState(false);
   const [historial, setHistorial] = useState([]);
+  // Cursor de la siguiente página del historial (cabecera X-Next-Cursor)
+  const [cursorHistorial, setCursorHistorial] = useState(null);
+  const [cargandoHistorial, setCargandoHistorial] = useState(false);
   const [campañaSeleccionada, setCampañaSeleccionada] = useState(null);
   const [filtroHistorial, setFiltroHistorial] = useState('');
   
@@ -624,8 +627,10 @@ const Campañas = () => {
       const config = { headers: { Authorization: `Bearer ${token}` } };
       const res = await axiosInstance.get(`/campanas/${campaña.id}/historial`, config);
       setHistorial(Array.isArray(res.data) ? res.data : []);
+      setCursorHistorial(res.headers['x-next-cursor'] || null);
     } catch (error) {
       setHistorial([]);
+      setCursorHistorial(null);
       toast.error('No se pudo cargar el historial', error);
     }
     setModalHistorial(true);
@@ -639,12 +644,33 @@ const Campañas = () => {
       const config = { headers: { Authorization: `Bearer ${token}` } };
       const res = await axiosInstance.get(`/campanas/${campañaSeleccionada.id}/historial`, config);
       setHistorial(Array.isArray(res.data) ? res.data : []);
+      setCursorHistorial(res.headers['x-next-cursor'] || null);
     } catch (error) {
       console.log('Error actualizando historial:', error);
       // No mostrar error al usuario ya que es una actualización silenciosa
     }
   };
 
+  // El historial llega por páginas: agrega la siguiente a las ya cargadas
+  const cargarMasHistorial = async () => {
+    if (!campañaSeleccionada?.id || !cursorHistorial) return;
+    setCargandoHistorial(true);
+    try {
+      const token = localStorage.getItem('token') || sessionStorage.getItem('token');
+      const config = {
+        headers: { Authorization: `Bearer ${token}` },
+        params: { cursor: cursorHistorial },
+      };
+      const res = await axiosInstance.get(`/campanas/${campañaSeleccionada.id}/historial`, config);
+      setHistorial(prev => [...prev, ...(Array.isArray(res.data) ? res.data : [])]);
+      setCursorHistorial(res.headers['x-next-cursor'] || null);
+    } catch (error) {
+      toast.error('No se pudo cargar más historial', error);
+    } finally {
+      setCargandoHistorial(false);
+    }
+  };
+
   // Nuevas funciones para los modales independientes
   const handleAbrirProductos = async (campaña) => {
     setCampañaSeleccionada(campaña);
@@ -899,6 +925,18 @@ const Campañas = () => {
               );
             })()
           )}
+
+          {cursorHistorial && (
+            <div className="flex justify-center pt-2">
+              <button
+                onClick={cargarMasHistorial}
+                disabled={cargandoHistorial}
+                className="px-4 py-2 text-sm font-medium text-blue-700 bg-blue-50 rounded-lg hover:bg-blue-100 transition-colors disabled:opacity-50"
+              >
+                {cargandoHistorial ? 'Cargando...' : 'Cargar historial anterior'}
+              </button>
+            </div>
+          )}
         </div>
       </Modal>
 